@@ -3,10 +3,35 @@ Questerix Content Engine
 AI-powered curriculum generation from source documents.
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 __version__ = "0.1.0"
 
-from .parsers.document_parser import DocumentParser
-from .generators.question_generator import QuestionGenerator
-from .validators.question_schema import QuestionSchema
+# Public names resolve on first access, so `import src` loads no submodules.
+# The CLI still imports the generator (and pydantic) up front; only provider
+# SDKs and document backends are deferred until used (see utils/lazy.py).
+_LAZY_ATTRS = {
+    "DocumentParser": ".parsers.document_parser",
+    "QuestionGenerator": ".generators.question_generator",
+    "QuestionSchema": ".validators.question_schema",
+}
+
+if TYPE_CHECKING:
+    from .parsers.document_parser import DocumentParser
+    from .generators.question_generator import QuestionGenerator
+    from .validators.question_schema import QuestionSchema
 
 __all__ = ["DocumentParser", "QuestionGenerator", "QuestionSchema"]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
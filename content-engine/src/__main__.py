@@ -3,9 +3,11 @@ CLI entry point for content-engine.
 """
 
 import sys
+import signal
 import argparse
 import logging
 import json
+import threading
 from pathlib import Path
 
 # Add parent directory to path
@@ -13,7 +15,17 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.parsers.document_parser import DocumentParser
 from src.generators.question_generator import QuestionGenerator
-from src.validators.question_schema import DifficultyLevel
+from src.generators.router import ROUTING_STRATEGIES, RouterGenerator
+from src.pipeline import build_output_data, build_output_metadata, parse_distribution, run_pipeline
+from src.batch import STATE_FILENAME, BatchRunner, BatchState, load_jobs
+from src.publish import DATABASE_URL_ENV, DEFAULT_BATCH_SIZE, QuestionPublisher
+from src.worker import DEFAULT_QUEUE_PATH, JOB_KINDS, JobQueue, Worker, make_http_server
+from src.utils.cache import ExtractionCache, GenerationCache
+from src.utils.chunking import SemanticChunker, TextChunker
+from src.utils.dedup import DEDUP_MODES, DedupIndex
+from src.utils.metrics import PipelineMetrics, collect as collect_metrics, timed
+from src.utils.output import JsonlQuestionWriter
+from src.utils.rate_limiter import DEFAULT_LIMITS, configure_rate_limit
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,31 +34,223 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def parse_distribution(dist_str: str) -> dict:
-    """Parse difficulty distribution from CLI string."""
-    # Format: "easy:10,medium:20,hard:10"
-    distribution = {}
+def build_parser(args) -> DocumentParser:
+    """Create the document parser for a CLI run."""
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(Path(args.cache_dir) / "extraction" if args.cache_dir else None)
     
-    try:
-        for pair in dist_str.split(','):
-            level, count = pair.split(':')
-            level = level.strip().lower()
-            count = int(count.strip())
-            
-            if level not in ['easy', 'medium', 'hard']:
-                raise ValueError(f"Invalid difficulty level: {level}")
-            
-            distribution[DifficultyLevel(level)] = count
+    return DocumentParser(workers=args.workers, cache=cache, refresh_cache=args.refresh)
+
+
+def build_generator(args) -> QuestionGenerator:
+    """Create the generator for a CLI run, applying any quota overrides."""
+    cache = None
+    if not args.no_cache:
+        cache = GenerationCache(Path(args.cache_dir) / "generation" if args.cache_dir else None)
+    
+    dedup = None
+    if args.dedup or args.dedup_index:
+        index_path = args.dedup_index or (Path(args.cache_dir) / "dedup.sqlite3" if args.cache_dir else None)
+        dedup = DedupIndex(index_path, threshold=args.dedup_threshold)
+    
+    options = dict(
+        temperature=args.temperature,
+        cache=cache,
+        refresh_cache=args.refresh,
+        stream=args.stream,
+        dedup=dedup,
+        dedup_mode=args.dedup_mode
+    )
+    
+    if args.fallback_model:
+        generator = RouterGenerator(
+            models=[args.model, *args.fallback_model],
+            strategy=args.route,
+            hedge=args.hedge or args.hedge_after is not None,
+            hedge_after=args.hedge_after,
+            **options
+        )
+        targets = [backend.generator for backend in generator.backends]
+    else:
+        generator = QuestionGenerator(model=args.model, **options)
+        targets = [generator]
+    
+    if args.rpm or args.tpm:
+        for target in targets:
+            default_rpm, default_tpm = DEFAULT_LIMITS[target.provider]
+            target.rate_limiter = configure_rate_limit(
+                target.provider,
+                target.model,
+                requests_per_minute=args.rpm or default_rpm,
+                tokens_per_minute=args.tpm or default_tpm
+            )
+    
+    return generator
+
+
+def build_chunker(args, generator: QuestionGenerator):
+    """
+    Chunker for --chunked/--sections runs, otherwise None.
+    Chunks are sized with the generator's token counter; --chunk-tokens 0
+    packs each chunk to the model's context window.
+    """
+    if not (args.chunked or args.sections):
+        return None
+    
+    max_tokens = args.chunk_tokens
+    if max_tokens == 0:
+        max_tokens = generator.source_token_budget(
+            parse_distribution(args.difficulty) if args.difficulty else None,
+            args.instructions
+        )
+        logger.info(f"Packing chunks to {max_tokens} tokens ({generator.model} context window)")
+    
+    chunker_class = SemanticChunker if args.sections else TextChunker
+    return chunker_class(
+        max_tokens=max_tokens,
+        overlap_tokens=args.chunk_overlap,
+        token_counter=generator.token_counter
+    )
+
+
+def run_generation(generator, text: str, args, on_question=None, collect: bool = True):
+    """Generate questions single-shot or chunked depending on CLI flags."""
+    distribution = parse_distribution(args.difficulty)
+    
+    if args.chunked or args.sections:
+        return generator.generate_chunked(
+            text=text,
+            skill_id=args.skill_id,
+            difficulty_distribution=distribution,
+            custom_instructions=args.instructions,
+            chunker=build_chunker(args, generator),
+            on_question=on_question,
+            collect=collect
+        )
+    
+    return generator.generate(
+        text=text,
+        skill_id=args.skill_id,
+        difficulty_distribution=distribution,
+        custom_instructions=args.instructions,
+        on_question=on_question
+    )
+
+
+def run_with_output(args, run, describe=dict):
+    """
+    Run generation and write its results in the requested format.
+    
+    Stage timings and counters for the run are recorded in the output
+    metadata and, with --metrics, written to a separate file.
+    
+    Args:
+        args: Parsed CLI arguments (format, output, metrics)
+        run: Callable(on_question, collect) -> GenerationResponse
+        describe: Callable returning extra metadata, evaluated after the run
         
-        return distribution
+    Returns:
+        The GenerationResponse from `run`
+    """
+    with collect_metrics(PipelineMetrics()) as metrics:
+        if args.format == 'jsonl':
+            # Questions are written as they arrive, so nothing is held in memory
+            handle = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+            try:
+                writer = JsonlQuestionWriter(handle)
+                response = run(writer.write_question, False)
+                writer.write_metadata(build_output_metadata(response, **describe(), metrics=metrics.summary()))
+            finally:
+                if args.output:
+                    handle.close()
+        else:
+            response = run(None, True)
+            output_data = build_output_data(response, **describe(), metrics=metrics.summary())
+            
+            with timed("output_write"):
+                if args.output:
+                    Path(args.output).write_text(json.dumps(output_data, indent=2), encoding='utf-8')
+                else:
+                    print(json.dumps(output_data, indent=2))
     
-    except Exception as e:
-        raise ValueError(f"Invalid distribution format: {e}")
+    write_metrics(args, metrics)
+    return response
+
+
+def write_metrics(args, metrics: PipelineMetrics):
+    """Write run metrics to --metrics, if given, and log a one-line summary."""
+    summary = metrics.summary()
+    slowest = sorted(summary["stages"].items(), key=lambda item: item[1]["total_ms"], reverse=True)[:3]
+    if slowest:
+        logger.info("Slowest stages: " + ", ".join(f"{name} {stage['total_ms']:.0f}ms" for name, stage in slowest))
+    
+    if args.metrics:
+        metrics.write(args.metrics)
+        logger.info(f"Saved metrics to: {args.metrics}")
+
+
+def add_chunking_arguments(subparser):
+    """Register chunked-generation options on a subcommand."""
+    subparser.add_argument('--chunked', action='store_true',
+                           help='Generate over the whole document in token-budgeted chunks')
+    subparser.add_argument('--chunk-tokens', type=int, default=2000,
+                           help='Max tokens per chunk (0 = fill the model context window)')
+    subparser.add_argument('--chunk-overlap', type=int, default=200, help='Tokens shared between consecutive chunks')
+    subparser.add_argument('--sections', action='store_true',
+                           help='Chunk along headings and paragraphs and title each chunk (implies --chunked)')
+
+
+def add_worker_arguments(subparser):
+    """Register parallel extraction options on a subcommand."""
+    subparser.add_argument('--workers', type=int, default=1,
+                           help='Processes for PDF page extraction (0 = all CPU cores)')
+
+
+def add_cache_arguments(subparser):
+    """Register response-cache options on a subcommand."""
+    subparser.add_argument('--no-cache', action='store_true', help='Disable the extraction and generation caches')
+    subparser.add_argument('--refresh', action='store_true', help='Ignore cached responses and overwrite them')
+    subparser.add_argument('--cache-dir', help='Cache directory (default: $CONTENT_ENGINE_CACHE_DIR or ~/.cache)')
+
+
+def add_rate_limit_arguments(subparser):
+    """Register provider quota options on a subcommand."""
+    subparser.add_argument('--rpm', type=float, help='Provider requests/min quota (default: per-provider)')
+    subparser.add_argument('--tpm', type=float, help='Provider tokens/min quota (default: per-provider)')
+
+
+def add_routing_arguments(subparser):
+    """Register multi-provider routing options on a subcommand."""
+    subparser.add_argument('--fallback-model', action='append', metavar='MODEL',
+                           help='Route across --model and this model (repeatable), failing over between them')
+    subparser.add_argument('--route', choices=ROUTING_STRATEGIES, default='health',
+                           help='With --fallback-model: prefer the healthiest or the cheapest backend')
+    subparser.add_argument('--hedge', action='store_true',
+                           help='Duplicate calls slower than the backend p95 latency to the next backend')
+    subparser.add_argument('--hedge-after', type=float, help='Hedge after this many seconds (implies --hedge)')
+
+
+def add_metrics_arguments(subparser):
+    """Register stage metrics options on a subcommand."""
+    subparser.add_argument('--metrics', metavar='PATH',
+                           help='Write per-stage timings and counters (.prom: Prometheus text, otherwise JSON)')
+
+
+def add_dedup_arguments(subparser):
+    """Register near-duplicate detection options on a subcommand."""
+    subparser.add_argument('--dedup', action='store_true',
+                           help='Drop questions that nearly duplicate earlier ones for the same skill')
+    subparser.add_argument('--dedup-index', help='Dedup index file (implies --dedup; default: in the cache directory)')
+    subparser.add_argument('--dedup-mode', choices=DEDUP_MODES, default='drop',
+                           help='drop near-duplicates, or flag them with duplicate_of')
+    subparser.add_argument('--dedup-threshold', type=float, default=0.8,
+                           help='Similarity (0-1) at which questions count as duplicates')
 
 
 def cmd_extract(args):
     """Extract text from a document."""
-    parser = DocumentParser()
+    parser = build_parser(args)
     
     try:
         text = parser.parse(args.input)
@@ -64,10 +268,7 @@ def cmd_extract(args):
 
 def cmd_generate(args):
     """Generate questions from text."""
-    generator = QuestionGenerator(
-        model=args.model,
-        temperature=args.temperature
-    )
+    generator = build_generator(args)
     
     try:
         # Read source text
@@ -76,33 +277,15 @@ def cmd_generate(args):
         else:
             text = Path(args.input).read_text(encoding='utf-8')
         
-        # Parse distribution
-        distribution = parse_distribution(args.difficulty)
-        
-        # Generate
-        response = generator.generate(
-            text=text,
-            skill_id=args.skill_id,
-            difficulty_distribution=distribution,
-            custom_instructions=args.instructions
+        # Generate and output
+        response = run_with_output(
+            args,
+            lambda on_question, collect: run_generation(generator, text, args, on_question, collect),
+            describe=lambda: {"skill_id": args.skill_id}
         )
         
-        # Output
-        output_data = {
-            "metadata": {
-                "model": response.model_used,
-                "total_generated": response.total_generated,
-                "generation_time_ms": response.generation_time_ms,
-                "token_count": response.token_count
-            },
-            "questions": [q.model_dump() for q in response.questions]
-        }
-        
         if args.output:
-            Path(args.output).write_text(json.dumps(output_data, indent=2), encoding='utf-8')
             logger.info(f"Saved {response.total_generated} questions to: {args.output}")
-        else:
-            print(json.dumps(output_data, indent=2))
     
     except Exception as e:
         logger.error(f"Generation failed: {e}")
@@ -111,51 +294,179 @@ def cmd_generate(args):
 
 def cmd_pipeline(args):
     """Full pipeline: extract + generate."""
-    parser = DocumentParser()
-    generator = QuestionGenerator(
-        model=args.model,
-        temperature=args.temperature
-    )
+    parser = build_parser(args)
+    generator = build_generator(args)
     
     try:
-        # Step 1: Extract
-        logger.info("Step 1: Extracting text...")
-        text = parser.parse(args.input)
-        logger.info(f"Extracted {len(text)} characters")
-        
-        # Step 2: Generate
-        logger.info("Step 2: Generating questions...")
-        distribution = parse_distribution(args.difficulty)
-        
-        response = generator.generate(
-            text=text,
-            skill_id=args.skill_id,
-            difficulty_distribution=distribution,
-            custom_instructions=args.instructions
-        )
-        
-        # Output
-        output_data = {
-            "metadata": {
+        response = run_with_output(
+            args,
+            lambda on_question, collect: run_pipeline(
+                parser,
+                generator,
+                args.input,
+                skill_id=args.skill_id,
+                difficulty_distribution=parse_distribution(args.difficulty),
+                custom_instructions=args.instructions,
+                chunker=build_chunker(args, generator),
+                on_question=on_question,
+                collect=collect
+            ),
+            describe=lambda: {
                 "source_file": args.input,
-                "model": response.model_used,
-                "total_generated": response.total_generated,
-                "generation_time_ms": response.generation_time_ms
-            },
-            "questions": [q.model_dump() for q in response.questions]
-        }
+                "skill_id": args.skill_id,
+                "source_metadata": parser.get_metadata(args.input, parser.cache)
+            }
+        )
         
         if args.output:
-            Path(args.output).write_text(json.dumps(output_data, indent=2), encoding='utf-8')
             logger.info(f"✓ Pipeline complete! {response.total_generated} questions saved to: {args.output}")
-        else:
-            print(json.dumps(output_data, indent=2))
     
     except Exception as e:
         logger.error(f"Pipeline failed: {e}")
         sys.exit(1)
 
 
+def cmd_batch(args):
+    """Run the pipeline over a directory or manifest of documents."""
+    try:
+        jobs = load_jobs(
+            args.source,
+            output_dir=args.output_dir,
+            skill_id=args.skill_id,
+            difficulty=args.difficulty,
+            instructions=args.instructions
+        )
+    except Exception as e:
+        logger.error(f"Could not load batch jobs: {e}")
+        sys.exit(1)
+    
+    if not jobs:
+        logger.error(f"No supported documents found in: {args.source}")
+        sys.exit(1)
+    
+    parser = build_parser(args)
+    generator = build_generator(args)
+    state = BatchState(args.state or str(Path(args.output_dir) / STATE_FILENAME))
+    
+    runner = BatchRunner(
+        parser,
+        generator,
+        state,
+        concurrency=args.concurrency,
+        chunker=build_chunker(args, generator)
+    )
+    
+    logger.info(f"Starting batch of {len(jobs)} documents (concurrency {args.concurrency})")
+    with collect_metrics(PipelineMetrics()) as metrics:
+        summary = runner.run(jobs)
+    write_metrics(args, metrics)
+    logger.info(
+        f"Batch finished: {summary['completed']} completed, "
+        f"{summary['skipped']} skipped, {summary['failed']} failed"
+    )
+    
+    if summary["failed"]:
+        sys.exit(1)
+
+
+def cmd_worker(args):
+    """Serve queued jobs with a warm parser and generator until stopped."""
+    parser = build_parser(args)
+    generator = build_generator(args)
+    queue = JobQueue(args.queue)
+    
+    if args.requeue_running:
+        requeued = queue.requeue_running()
+        if requeued:
+            logger.info(f"Requeued {requeued} jobs left running by a previous worker")
+    
+    worker = Worker(
+        parser,
+        generator,
+        queue,
+        concurrency=args.concurrency,
+        chunker=build_chunker(args, generator)
+    )
+    
+    # Finish running jobs on Ctrl-C / SIGTERM instead of abandoning them
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: worker.stop())
+    
+    server = None
+    if args.http:
+        host, _, port = args.http.rpartition(':')
+        server = make_http_server(worker, host or '127.0.0.1', int(port))
+        threading.Thread(target=server.serve_forever, name="http", daemon=True).start()
+        logger.info(f"Accepting jobs on http://{host or '127.0.0.1'}:{port}/jobs")
+    
+    logger.info(f"Worker serving {queue.path} (concurrency {args.concurrency})")
+    try:
+        with collect_metrics(PipelineMetrics()) as metrics:
+            stats = worker.serve(drain=args.drain)
+    finally:
+        if server is not None:
+            server.shutdown()
+        queue.close()
+    
+    write_metrics(args, metrics)
+    logger.info(f"Worker stopped: {stats['completed']} completed, {stats['failed']} failed")
+
+
+def cmd_submit(args):
+    """Queue a job for a worker, optionally waiting for its result."""
+    params = {"input": str(Path(args.input).resolve())}
+    if args.output:
+        params["output"] = str(Path(args.output).resolve())
+    if args.kind != 'extract':
+        if not (args.skill_id and args.difficulty):
+            logger.error(f"{args.kind} jobs require --skill-id and --difficulty")
+            sys.exit(1)
+        params.update(skill_id=args.skill_id, difficulty=args.difficulty, instructions=args.instructions)
+    
+    queue = JobQueue(args.queue)
+    try:
+        job_id = queue.submit(args.kind, params)
+        if not args.wait:
+            print(json.dumps({"id": job_id}))
+            return
+        
+        job = queue.wait(job_id, timeout=args.timeout)
+        print(json.dumps(job, indent=2))
+        if job["status"] == "failed":
+            sys.exit(1)
+    
+    except Exception as e:
+        logger.error(f"Submit failed: {e}")
+        sys.exit(1)
+    
+    finally:
+        queue.close()
+
+
+def cmd_publish(args):
+    """Upsert generated questions into the Supabase questions table."""
+    try:
+        with QuestionPublisher(
+            database_url=args.database_url,
+            skill_id=args.skill_id,
+            app_id=args.app_id,
+            batch_size=args.batch_size
+        ) as publisher:
+            for path in args.inputs:
+                publisher.publish_file(path)
+                logger.info(f"Published questions from: {path}")
+        
+        stats = publisher.stats
+        logger.info(
+            f"✓ Publish complete: {stats['inserted']} inserted, "
+            f"{stats['updated']} updated, {stats['unchanged']} unchanged"
+        )
+    
+    except Exception as e:
+        logger.error(f"Publish failed: {e}")
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Questerix Content Engine - AI-powered curriculum generation"
@@ -167,6 +478,8 @@ def main():
     extract_parser = subparsers.add_parser('extract', help='Extract text from document')
     extract_parser.add_argument('input', help='Input file path')
     extract_parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    add_worker_arguments(extract_parser)
+    add_cache_arguments(extract_parser)
     extract_parser.set_defaults(func=cmd_extract)
     
     # Generate command
@@ -176,8 +489,17 @@ def main():
     generate_parser.add_argument('--difficulty', required=True, help='Distribution (e.g., easy:10,medium:20,hard:10)')
     generate_parser.add_argument('--model', default='gemini-1.5-flash', help='AI model to use')
     generate_parser.add_argument('--temperature', type=float, default=0.7, help='Generation temperature')
+    generate_parser.add_argument('--stream', action='store_true', help='Stream provider output, keeping complete questions if truncated')
     generate_parser.add_argument('--instructions', help='Custom instructions for AI')
     generate_parser.add_argument('-o', '--output', help='Output JSON file (default: stdout)')
+    generate_parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                                 help='json: one document at the end; jsonl: one question per line as generated')
+    add_chunking_arguments(generate_parser)
+    add_rate_limit_arguments(generate_parser)
+    add_routing_arguments(generate_parser)
+    add_cache_arguments(generate_parser)
+    add_dedup_arguments(generate_parser)
+    add_metrics_arguments(generate_parser)
     generate_parser.set_defaults(func=cmd_generate)
     
     # Pipeline command
@@ -187,10 +509,86 @@ def main():
     pipeline_parser.add_argument('--difficulty', required=True, help='Distribution (e.g., easy:10,medium:20,hard:10)')
     pipeline_parser.add_argument('--model', default='gemini-1.5-flash', help='AI model to use')
     pipeline_parser.add_argument('--temperature', type=float, default=0.7, help='Generation temperature')
+    pipeline_parser.add_argument('--stream', action='store_true', help='Stream provider output, keeping complete questions if truncated')
     pipeline_parser.add_argument('--instructions', help='Custom instructions for AI')
     pipeline_parser.add_argument('-o', '--output', help='Output JSON file (default: stdout)')
+    pipeline_parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                                 help='json: one document at the end; jsonl: one question per line as generated')
+    add_chunking_arguments(pipeline_parser)
+    add_worker_arguments(pipeline_parser)
+    add_rate_limit_arguments(pipeline_parser)
+    add_routing_arguments(pipeline_parser)
+    add_cache_arguments(pipeline_parser)
+    add_dedup_arguments(pipeline_parser)
+    add_metrics_arguments(pipeline_parser)
     pipeline_parser.set_defaults(func=cmd_pipeline)
     
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Run the pipeline over a directory or job manifest')
+    batch_parser.add_argument('source', help='Directory of documents or JSON manifest')
+    batch_parser.add_argument('--output-dir', required=True, help='Directory for per-document question JSON')
+    batch_parser.add_argument('--skill-id', help='Default skill UUID (manifest entries may override)')
+    batch_parser.add_argument('--difficulty', help='Default distribution (e.g., easy:10,medium:20,hard:10)')
+    batch_parser.add_argument('--model', default='gemini-1.5-flash', help='AI model to use')
+    batch_parser.add_argument('--temperature', type=float, default=0.7, help='Generation temperature')
+    batch_parser.add_argument('--stream', action='store_true', help='Stream provider output, keeping complete questions if truncated')
+    batch_parser.add_argument('--instructions', help='Default custom instructions for AI')
+    batch_parser.add_argument('--concurrency', type=int, default=4, help='Documents processed at once')
+    batch_parser.add_argument('--state', help=f'Progress file for resuming (default: OUTPUT_DIR/{STATE_FILENAME})')
+    add_chunking_arguments(batch_parser)
+    add_worker_arguments(batch_parser)
+    add_rate_limit_arguments(batch_parser)
+    add_routing_arguments(batch_parser)
+    add_cache_arguments(batch_parser)
+    add_dedup_arguments(batch_parser)
+    add_metrics_arguments(batch_parser)
+    batch_parser.set_defaults(func=cmd_batch)
+    
+    # Publish command
+    publish_parser = subparsers.add_parser('publish', help='Upsert generated questions into Supabase')
+    publish_parser.add_argument('inputs', nargs='+', help='Question files from generate/pipeline/batch (.json or .jsonl)')
+    publish_parser.add_argument('--skill-id', help='Skill UUID (default: the skill recorded in each JSON file)')
+    publish_parser.add_argument('--app-id', help="App UUID (default: the skill's app)")
+    publish_parser.add_argument('--database-url',
+                                help=f"Postgres connection string (default: ${' or $'.join(DATABASE_URL_ENV)})")
+    publish_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                                help='Questions per upsert statement')
+    publish_parser.set_defaults(func=cmd_publish)
+    
+    # Worker command
+    worker_parser = subparsers.add_parser('worker', help='Serve queued extract/generate/pipeline jobs')
+    worker_parser.add_argument('--queue', default=str(DEFAULT_QUEUE_PATH), help='SQLite job queue file')
+    worker_parser.add_argument('--concurrency', type=int, default=4, help='Jobs processed at once')
+    worker_parser.add_argument('--http', metavar='[HOST:]PORT', help='Also accept jobs over HTTP (default host 127.0.0.1)')
+    worker_parser.add_argument('--drain', action='store_true', help='Exit once the queue is empty')
+    worker_parser.add_argument('--requeue-running', action='store_true',
+                               help='Requeue jobs left running by a crashed worker (only with no other workers)')
+    worker_parser.add_argument('--model', default='gemini-1.5-flash', help='AI model to use')
+    worker_parser.add_argument('--temperature', type=float, default=0.7, help='Generation temperature')
+    worker_parser.add_argument('--stream', action='store_true', help='Stream provider output, keeping complete questions if truncated')
+    add_chunking_arguments(worker_parser)
+    add_worker_arguments(worker_parser)
+    add_rate_limit_arguments(worker_parser)
+    add_routing_arguments(worker_parser)
+    add_cache_arguments(worker_parser)
+    add_dedup_arguments(worker_parser)
+    add_metrics_arguments(worker_parser)
+    # Chunk sizing reads these; jobs carry their own distribution and instructions
+    worker_parser.set_defaults(func=cmd_worker, difficulty=None, instructions=None)
+    
+    # Submit command
+    submit_parser = subparsers.add_parser('submit', help='Queue a job for a running worker')
+    submit_parser.add_argument('kind', choices=JOB_KINDS, help='Job type')
+    submit_parser.add_argument('input', help='Document (extract/pipeline) or text file (generate)')
+    submit_parser.add_argument('--skill-id', help='Target skill UUID (generate/pipeline)')
+    submit_parser.add_argument('--difficulty', help='Distribution (e.g., easy:10,medium:20,hard:10)')
+    submit_parser.add_argument('--instructions', help='Custom instructions for AI')
+    submit_parser.add_argument('-o', '--output', help='Write the result here (default: stored in the queue)')
+    submit_parser.add_argument('--queue', default=str(DEFAULT_QUEUE_PATH), help='SQLite job queue file')
+    submit_parser.add_argument('--wait', action='store_true', help='Wait for the job and print its result')
+    submit_parser.add_argument('--timeout', type=float, help='With --wait, give up after this many seconds')
+    submit_parser.set_defaults(func=cmd_submit)
+    
     args = parser.parse_args()
     
     if not args.command:
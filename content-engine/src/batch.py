@@ -0,0 +1,287 @@
+"""
+Batch processing of many source documents in one process.
+
+Jobs come from a directory of documents or a JSON manifest. One parser and
+one generator are shared by every job, jobs run concurrently, and progress
+is recorded in a state file so an interrupted run resumes where it stopped.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .parsers.document_parser import DocumentParser
+from .generators.question_generator import QuestionGenerator
+from .validators.question_schema import DifficultyLevel
+from .utils.cache import file_digest, make_key
+from .utils.chunking import TextChunker
+from .pipeline import build_output_data, coerce_distribution, run_pipeline
+from .utils.metrics import PipelineMetrics, collect, timed
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = ".batch_state.json"
+
+
+@dataclass
+class BatchJob:
+    """One source document and how to generate from it."""
+    input: str
+    skill_id: str
+    difficulty_distribution: Dict[DifficultyLevel, int]
+    output: str
+    instructions: Optional[str] = None
+
+    def state_key(self, model: str, temperature: float) -> str:
+        """Progress key: the input plus a hash of its content and every setting its output depends on."""
+        try:
+            content = file_digest(self.input)
+        except OSError:
+            content = None  # The job fails when run and is retried next time
+        settings = make_key(
+            "batch-job",
+            content,
+            model,
+            temperature,
+            self.skill_id,
+            {level.value: n for level, n in self.difficulty_distribution.items()},
+            self.instructions,
+            str(Path(self.output).resolve()),
+        )
+        return f"{self.input}#{settings[:16]}"
+
+
+def load_jobs(
+    source: str,
+    output_dir: str,
+    skill_id: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    instructions: Optional[str] = None
+) -> List[BatchJob]:
+    """
+    Build the job list from a directory or a JSON manifest.
+
+    A directory yields one job per supported document, all using the given
+    skill_id and difficulty. A manifest is either a list of job objects or
+    {"defaults": {...}, "jobs": [...]}, where each job has "input" and may
+    override "skill_id", "difficulty", "instructions" and "output".
+    Relative inputs are resolved against the manifest's directory.
+
+    Raises:
+        ValueError: If a job lacks a skill ID or distribution
+        FileNotFoundError: If the source does not exist
+    """
+    path = Path(source)
+    if not path.exists():
+        raise FileNotFoundError(f"Batch source not found: {source}")
+
+    defaults: Dict[str, Any] = {
+        "skill_id": skill_id,
+        "difficulty": difficulty,
+        "instructions": instructions,
+    }
+
+    if path.is_dir():
+        entries = [
+            {"input": str(p)}
+            for p in sorted(path.rglob("*"))
+            if p.is_file() and p.suffix.lower() in DocumentParser.SUPPORTED_FORMATS
+        ]
+        base_dir = path
+    else:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        if isinstance(manifest, dict):
+            defaults.update({k: v for k, v in manifest.get("defaults", {}).items() if v is not None})
+            entries = manifest.get("jobs", [])
+        else:
+            entries = manifest
+        base_dir = path.parent
+
+    jobs = []
+    used_outputs = set()
+    for idx, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or "input" not in entry:
+            raise ValueError(f"Manifest job {idx} must be an object with an 'input' field")
+
+        settings = {**defaults, **{k: v for k, v in entry.items() if v is not None}}
+        input_path = Path(settings["input"])
+        if not input_path.is_absolute() and not path.is_dir():
+            input_path = base_dir / input_path
+
+        if not settings.get("skill_id"):
+            raise ValueError(f"No skill_id for {input_path} (set it in the manifest or with --skill-id)")
+        if not settings.get("difficulty"):
+            raise ValueError(f"No difficulty for {input_path} (set it in the manifest or with --difficulty)")
+
+        output = settings.get("output") or _default_output(input_path, base_dir, output_dir, used_outputs)
+        used_outputs.add(output)
+
+        jobs.append(BatchJob(
+            input=str(input_path),
+            skill_id=settings["skill_id"],
+            difficulty_distribution=coerce_distribution(settings["difficulty"]),
+            output=output,
+            instructions=settings.get("instructions"),
+        ))
+
+    return jobs
+
+
+def _default_output(input_path: Path, base_dir: Path, output_dir: str, used: set) -> str:
+    """<output_dir>/<relative path with separators flattened>.json, unique per job."""
+    try:
+        relative = input_path.resolve().relative_to(base_dir.resolve())
+    except ValueError:
+        relative = Path(input_path.name)
+    name = "__".join(relative.with_suffix("").parts)
+
+    candidate = str(Path(output_dir) / f"{name}.json")
+    n = 2
+    while candidate in used:
+        candidate = str(Path(output_dir) / f"{name}_{n}.json")
+        n += 1
+    return candidate
+
+
+class BatchState:
+    """
+    Resumable progress record, saved atomically after every job.
+    Completed jobs are skipped on the next run; failed ones are retried.
+    Jobs are keyed by input, its content and settings (see BatchJob.state_key),
+    so editing the input or changing the model, temperature, skill,
+    difficulty, instructions or output regenerates it.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.completed: Dict[str, Dict[str, Any]] = {}
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.completed = data.get("completed", {})
+            self.failed = data.get("failed", {})
+
+    def is_done(self, key: str) -> bool:
+        record = self.completed.get(key)
+        return record is not None and Path(record["output"]).exists()
+
+    def mark_done(self, key: str, job: BatchJob, total_generated: int) -> None:
+        with self._lock:
+            self.completed[key] = {
+                "output": job.output,
+                "total_generated": total_generated,
+                "finished_at": time.time(),
+            }
+            self.failed.pop(key, None)
+            self._save()
+
+    def mark_failed(self, key: str, error: Exception) -> None:
+        with self._lock:
+            self.failed[key] = str(error)
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"completed": self.completed, "failed": self.failed}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class BatchRunner:
+    """Runs batch jobs concurrently over a shared parser and generator."""
+
+    def __init__(
+        self,
+        parser: DocumentParser,
+        generator: QuestionGenerator,
+        state: BatchState,
+        concurrency: int = 4,
+        chunker: Optional[TextChunker] = None
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.parser = parser
+        self.generator = generator
+        self.state = state
+        self.concurrency = concurrency
+        self.chunker = chunker
+
+    def run(self, jobs: List[BatchJob]) -> Dict[str, int]:
+        """
+        Process every job not already completed in the state file.
+
+        Returns:
+            Counts of completed, skipped and failed jobs for this run
+        """
+        # Keyed before running, so an input edited mid-run is regenerated next time
+        keys = {
+            id(job): job.state_key(self.generator.model, self.generator.temperature)
+            for job in jobs
+        }
+        pending = [job for job in jobs if not self.state.is_done(keys[id(job)])]
+        skipped = len(jobs) - len(pending)
+        if skipped:
+            logger.info(f"Resuming batch: {skipped} of {len(jobs)} jobs already complete")
+
+        completed = failed = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            # Each job runs in a copy of the caller's context so run-wide metrics see it
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._run_job, job): job
+                for job in pending
+            }
+
+            for done, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                try:
+                    total = future.result()
+                except Exception as e:
+                    failed += 1
+                    self.state.mark_failed(keys[id(job)], e)
+                    logger.error(f"[{done}/{len(pending)}] ✗ {job.input}: {e}")
+                    continue
+
+                completed += 1
+                self.state.mark_done(keys[id(job)], job, total)
+                logger.info(f"[{done}/{len(pending)}] ✓ {job.input}: {total} questions -> {job.output}")
+
+        return {"completed": completed, "skipped": skipped, "failed": failed}
+
+    def _run_job(self, job: BatchJob) -> int:
+        with collect(PipelineMetrics()) as metrics:
+            response = run_pipeline(
+                self.parser,
+                self.generator,
+                job.input,
+                skill_id=job.skill_id,
+                difficulty_distribution=job.difficulty_distribution,
+                custom_instructions=job.instructions,
+                chunker=self.chunker
+            )
+
+            output_data = build_output_data(
+                response,
+                source_file=job.input,
+                skill_id=job.skill_id,
+                source_metadata=self.parser.get_metadata(job.input, self.parser.cache),
+                metrics=metrics.summary()
+            )
+
+            with timed("output_write"):
+                output = Path(job.output)
+                output.parent.mkdir(parents=True, exist_ok=True)
+                tmp = output.with_suffix(".tmp")
+                tmp.write_text(json.dumps(output_data, indent=2), encoding="utf-8")
+                os.replace(tmp, output)
+
+        return response.total_generated
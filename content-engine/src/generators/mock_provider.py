@@ -0,0 +1,242 @@
+"""
+Offline stand-in for the AI providers.
+
+Serves synthetic or recorded replies with configurable latency and error
+injection, so the pipeline can run (and be benchmarked) without network
+access or API keys. Selected through the model name:
+
+    mock                                 synthetic questions, no delay
+    mock:latency=0.2,jitter=0.05,error_rate=0.1
+    replay:<path>[,latency=...]          recorded replies (JSONL file or
+                                         generation cache directory)
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+MOCK_PREFIXES = ("mock", "replay")
+
+_COUNT_RE = re.compile(r"Generate exactly (\d+) questions")
+_DISTRIBUTION_RE = re.compile(r"(\d+) (easy|medium|hard)\b")
+_SOURCE_RE = re.compile(r"\*\*Source Text:\*\*\n(.*?)\n\n(?:\*\*Additional Instructions|Remember:)", re.S)
+_WORD_RE = re.compile(r"[A-Za-z]{4,}")
+
+_TYPES = ("multiple_choice", "text_input", "boolean", "mcq_multi", "reorder_steps")
+
+
+class MockProviderError(Exception):
+    """Injected provider failure, shaped like a retryable API error."""
+
+    def __init__(self, message: str, status_code: int = 503):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def load_recording(path: str) -> Dict[str, Any]:
+    """
+    Load recorded replies for replay.
+
+    Accepts a JSONL file of {"response": ..., "prompt_sha256": ...} records
+    (the hash is optional) or a generation cache directory, whose entries
+    keep each provider's raw reply.
+
+    Returns:
+        {"responses": [...], "by_prompt": {prompt_sha256: response}}
+    """
+    source = Path(path)
+    responses: List[str] = []
+    by_prompt: Dict[str, str] = {}
+
+    if source.is_dir():
+        for entry_path in sorted(source.glob("*/*.json")):
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            if "raw_response" in entry:
+                responses.append(entry["raw_response"])
+    else:
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                responses.append(record["response"])
+                if record.get("prompt_sha256"):
+                    by_prompt[record["prompt_sha256"]] = record["response"]
+
+    if not responses:
+        raise ValueError(f"No recorded responses in {path}")
+    return {"responses": responses, "by_prompt": by_prompt}
+
+
+def synthetic_reply(prompt: str) -> str:
+    """
+    A valid JSON reply to a generation prompt.
+
+    Honors the requested count and difficulty distribution, cycles through
+    every question type and draws words from the source text, so output is
+    deterministic per prompt but varies between prompts.
+    """
+    difficulties = [level for count, level in _DISTRIBUTION_RE.findall(prompt) for _ in range(int(count))]
+    match = _COUNT_RE.search(prompt)
+    total = int(match.group(1)) if match else len(difficulties)
+    difficulties += ["medium"] * (total - len(difficulties))
+
+    source = _SOURCE_RE.search(prompt)
+    words = _WORD_RE.findall(source.group(1) if source else prompt) or ["topic"]
+    rng = random.Random(prompt_hash(prompt))
+
+    questions = []
+    for i, difficulty in enumerate(difficulties[:total]):
+        topic = " ".join(rng.choice(words) for _ in range(3))
+        question_type = _TYPES[i % len(_TYPES)]
+        question: Dict[str, Any] = {
+            "content": f"Question {i + 1}: what does the text say about {topic}?",
+            "type": question_type,
+            "explanation": f"The source discusses {topic}.",
+            "points": 1 + i % 3,
+            "difficulty": difficulty,
+        }
+
+        if question_type in ("multiple_choice", "mcq_multi"):
+            question["options"] = {"options": [{"id": c, "text": rng.choice(words)} for c in "abcd"]}
+            question["solution"] = (
+                {"correct_option_id": rng.choice("abcd")} if question_type == "multiple_choice"
+                else {"correct_option_ids": sorted(rng.sample("abcd", 2))}
+            )
+        elif question_type == "text_input":
+            question["options"] = {"placeholder": "Enter your answer"}
+            question["solution"] = {"exact_match": rng.choice(words), "case_sensitive": False}
+        elif question_type == "boolean":
+            question["options"] = {}
+            question["solution"] = {"correct_value": rng.random() < 0.5}
+        else:
+            steps = [{"id": str(n), "text": rng.choice(words)} for n in range(1, 5)]
+            order = [step["id"] for step in steps]
+            rng.shuffle(order)
+            question["options"] = {"steps": steps}
+            question["solution"] = {"correct_order": order}
+
+        questions.append(question)
+
+    return json.dumps(questions, indent=2)
+
+
+class MockProvider:
+    """
+    Provider client that answers prompts locally.
+
+    Args:
+        responses: Recorded replies served in rotation (None = synthetic replies)
+        by_prompt: Recorded replies keyed by prompt SHA-256, preferred when present
+        latency: Seconds before a reply (or its first streamed piece)
+        jitter: Extra uniform random delay in seconds
+        error_rate: Probability a call fails with a retryable 503
+        throttle_rate: Probability a call fails with a 429
+        chunk_chars: Characters per streamed piece
+        seed: Seed for jitter and error injection
+    """
+
+    def __init__(
+        self,
+        responses: Optional[List[str]] = None,
+        by_prompt: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        chunk_chars: int = 64,
+        seed: int = 0
+    ):
+        if chunk_chars < 1:
+            raise ValueError("chunk_chars must be at least 1")
+
+        self.responses = responses
+        self.by_prompt = by_prompt or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_model(cls, model: str) -> "MockProvider":
+        """Build a provider from a `mock[:k=v,...]` or `replay:<path>[,k=v,...]` model name."""
+        kind, _, spec = model.partition(":")
+        parts = [part for part in spec.split(",") if part]
+
+        kwargs: Dict[str, Any] = {}
+        if kind == "replay":
+            if not parts or "=" in parts[0]:
+                raise ValueError("replay model needs a recording: replay:<path>")
+            kwargs.update(load_recording(parts.pop(0)))
+        elif kind != "mock":
+            raise ValueError(f"Unsupported mock model: {model}")
+
+        for part in parts:
+            name, sep, value = part.partition("=")
+            if not sep or name not in ("latency", "jitter", "error_rate", "throttle_rate", "chunk_chars", "seed"):
+                raise ValueError(f"Invalid mock option: {part!r}")
+            kwargs[name] = int(value) if name in ("chunk_chars", "seed") else float(value)
+
+        return cls(**kwargs)
+
+    def reply(self, prompt: str) -> str:
+        """The reply for a prompt, without delay or failures."""
+        if self.responses is None:
+            return synthetic_reply(prompt)
+
+        recorded = self.by_prompt.get(prompt_hash(prompt))
+        if recorded is not None:
+            return recorded
+        with self._lock:
+            return self.responses[self.calls % len(self.responses)]
+
+    def _next_call(self) -> float:
+        """Count the call, apply error injection and return its delay."""
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+
+        if roll < self.throttle_rate:
+            raise MockProviderError("Injected rate limit (retry in 0.1s)", status_code=429)
+        if roll < self.throttle_rate + self.error_rate:
+            raise MockProviderError("Injected provider error", status_code=503)
+        return delay
+
+    def complete(self, prompt: str) -> str:
+        reply = self.reply(prompt)
+        delay = self._next_call()
+        if delay:
+            time.sleep(delay)
+        return reply
+
+    async def acomplete(self, prompt: str) -> str:
+        reply = self.reply(prompt)
+        delay = self._next_call()
+        if delay:
+            await asyncio.sleep(delay)
+        return reply
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield the reply in `chunk_chars` pieces after the first-piece delay."""
+        reply = self.reply(prompt)
+        delay = self._next_call()
+        if delay:
+            time.sleep(delay)
+        for pos in range(0, len(reply), self.chunk_chars):
+            yield reply[pos:pos + self.chunk_chars]
@@ -5,29 +5,54 @@ AI-powered question generator using Gemini Flash or GPT-4o-mini.
 import os
 import json
 import time
+import asyncio
 import logging
-from typing import List, Dict, Optional
-from pydantic import ValidationError
+from typing import Any, AsyncIterator, Callable, List, Dict, Iterable, Iterator, Optional, Tuple, Union
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+from ..validators.question_schema import (
+    QuestionSchema,
+    DifficultyLevel,
+    GenerationRequest,
+    GenerationResponse,
+)
+from ..validators.batch_validator import validate_questions
+from .mock_provider import MOCK_PREFIXES, MockProvider
+from ..utils.cache import GenerationCache
+from ..utils.chunking import TextChunk, TextChunker
+from ..utils.dedup import DEDUP_MODES, DedupIndex
+from ..utils.json_stream import JsonArrayStream
+from ..utils.lazy import require
+from ..utils.metrics import count, observe, timed
+from ..utils.rate_limiter import (
+    RateLimiter,
+    aretry_call,
+    get_rate_limiter,
+    is_retryable,
+    retry_call,
+    retry_delay,
+)
+from ..utils.tokens import TokenCounter, TokenUsage, context_window, estimate_cost, get_token_counter
 
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+logger = logging.getLogger(__name__)
 
-from ..validators.question_schema import QuestionSchema, DifficultyLevel, GenerationResponse
+# Provider SDKs are imported when a generator for that provider is created
+GEMINI_SDK = ("google.generativeai", "google-generativeai required. Install: pip install google-generativeai")
+OPENAI_SDK = ("openai", "openai required. Install: pip install openai")
 
-logger = logging.getLogger(__name__)
+MAX_OUTPUT_TOKENS = 4096
+
+# Share of the context budget used when source tokens are only estimated
+ESTIMATE_SAFETY = 0.9
+
+# Receives each validated question as soon as it is available
+QuestionCallback = Callable[[QuestionSchema], None]
 
 
 class QuestionGenerator:
     """
     Generates curriculum questions from text using AI.
-    Supports Gemini Flash (preferred) and OpenAI GPT-4o-mini.
+    Supports Gemini Flash (preferred) and OpenAI GPT-4o-mini, plus offline
+    `mock`/`replay` models (see mock_provider) for tests and benchmarks.
     """
     
     DEFAULT_SYSTEM_PROMPT = """You are an expert curriculum designer for Questerix, an adaptive learning platform.
@@ -68,54 +93,100 @@ Return a JSON array of question objects ONLY. Example:
         self,
         model: str = "gemini-1.5-flash",
         temperature: float = 0.7,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        max_source_chars: int = 4000,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5,
+        cache: Optional[GenerationCache] = None,
+        refresh_cache: bool = False,
+        stream: bool = False,
+        dedup: Optional[DedupIndex] = None,
+        dedup_mode: str = "drop",
+        token_counter: Optional[TokenCounter] = None
     ):
         """
         Initialize the question generator.
         
         Args:
-            model: Model identifier (gemini-1.5-flash, gpt-4o-mini)
+            model: Model identifier (gemini-1.5-flash, gpt-4o-mini, mock, replay:<path>)
             temperature: Creativity level (0.0-2.0)
             api_key: API key (or use environment variable)
+            max_source_chars: Source text limit for single-shot generation
+                (use generate_chunked to cover longer documents)
+            rate_limiter: Quota shared with other generators
+                (defaults to the process-wide limiter for this provider/model)
+            max_retries: Retries for throttled or transient provider errors
+            cache: Response cache keyed by prompt and generation parameters
+            refresh_cache: Ignore cached responses but still store new ones
+            stream: Stream provider output and validate questions as they arrive
+            dedup: Near-duplicate index checked before questions are returned
+            dedup_mode: "drop" near-duplicates or "flag" them via duplicate_of
+            token_counter: Tokenizer for budgeting and usage estimates
+                (defaults to the best offline counter for the provider)
         """
+        if dedup_mode not in DEDUP_MODES:
+            raise ValueError(f"dedup_mode must be one of {DEDUP_MODES}")
+        
         self.model = model
         self.temperature = temperature
+        self.max_source_chars = max_source_chars
+        self.max_retries = max_retries
+        self.cache = cache
+        self.refresh_cache = refresh_cache
+        self.stream = stream
+        self.dedup = dedup
+        self.dedup_mode = dedup_mode
+        
+        self._init_client(api_key)
         
-        # Determine provider
-        if model.startswith("gemini"):
+        self.rate_limiter = rate_limiter or get_rate_limiter(self.provider, self.model)
+        self.token_counter = token_counter or get_token_counter(self.provider, self.model)
+        self.context_tokens = context_window(self.model)
+        self._last_prompt_tokens: Optional[Tuple[str, int]] = None
+        
+        logger.info(f"Initialized QuestionGenerator with {self.provider}/{self.model}")
+    
+    def _init_client(self, api_key: Optional[str]) -> None:
+        """Determine the provider from the model name and create its client."""
+        if self.model.startswith("gemini"):
             self.provider = "gemini"
-            if genai is None:
-                raise ImportError("google-generativeai required. Install: pip install google-generativeai")
+            genai = require(*GEMINI_SDK)
             
             api_key = api_key or os.getenv("GEMINI_API_KEY")
             if not api_key:
                 raise ValueError("GEMINI_API_KEY environment variable not set")
             
             genai.configure(api_key=api_key)
-            self.client = genai.GenerativeModel(model)
+            self.client = genai.GenerativeModel(self.model)
         
-        elif model.startswith("gpt"):
+        elif self.model.startswith("gpt"):
             self.provider = "openai"
-            if OpenAI is None:
-                raise ImportError("openai required. Install: pip install openai")
+            openai = require(*OPENAI_SDK)
             
             api_key = api_key or os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY environment variable not set")
             
-            self.client = OpenAI(api_key=api_key)
+            # Retries are handled here, under the shared rate limiter
+            self.client = openai.OpenAI(api_key=api_key, max_retries=0)
+            self._openai_api_key = api_key
+            self._async_client = None
         
-        else:
-            raise ValueError(f"Unsupported model: {model}")
+        elif self.model.startswith(MOCK_PREFIXES):
+            self.provider = "mock"
+            self.client = MockProvider.from_model(self.model)
         
-        logger.info(f"Initialized QuestionGenerator with {self.provider}/{self.model}")
+        else:
+            raise ValueError(f"Unsupported model: {self.model}")
     
     def generate(
         self,
         text: str,
         skill_id: str,
         difficulty_distribution: Dict[DifficultyLevel, int],
-        custom_instructions: Optional[str] = None
+        custom_instructions: Optional[str] = None,
+        truncate: bool = True,
+        on_question: Optional[QuestionCallback] = None
     ) -> GenerationResponse:
         """
         Generate questions from source text.
@@ -125,6 +196,9 @@ Return a JSON array of question objects ONLY. Example:
             skill_id: Target skill UUID (for metadata)
             difficulty_distribution: How many questions per difficulty level
             custom_instructions: Optional user-specific instructions
+            truncate: Cut the source to max_source_chars before prompting
+            on_question: Called with each validated question as soon as it is
+                available (per streamed object when streaming)
             
         Returns:
             GenerationResponse with validated questions
@@ -132,54 +206,701 @@ Return a JSON array of question objects ONLY. Example:
         start_time = time.time()
         
         # Build prompt
-        prompt = self._build_prompt(text, difficulty_distribution, custom_instructions)
+        with timed("prompt_build"):
+            prompt = self._build_prompt(text, difficulty_distribution, custom_instructions, truncate)
         
         logger.info(f"Generating {sum(difficulty_distribution.values())} questions...")
         logger.debug(f"Prompt length: {len(prompt)} chars")
         
-        # Call AI
-        if self.provider == "gemini":
-            raw_response = self._call_gemini(prompt)
+        cached = self._cached_response(prompt, start_time)
+        if cached is not None:
+            kept, duplicates = self._screen(cached.questions, skill_id, cached=True)
+            _notify(on_question, kept)
+            return self._with_questions(cached, kept, duplicates)
+        
+        usage = TokenUsage()
+        if self.stream:
+            raw_parts: List[str] = []
+            questions = []
+            kept = []
+            duplicates = 0
+            for question in self._stream_questions(prompt, raw_parts, usage):
+                questions.append(question)
+                screened, dup = self._screen([question], skill_id)
+                kept.extend(screened)
+                duplicates += dup
+                _notify(on_question, screened)
+            raw_response = "".join(raw_parts)
+            response = self._build_response(prompt, raw_response, questions, start_time, usage)
         else:
-            raw_response = self._call_openai(prompt)
+            raw_response = self._complete(prompt, usage)
+            response = self._parse_response(prompt, raw_response, start_time, usage)
+            kept, duplicates = self._screen(response.questions, skill_id)
+            _notify(on_question, kept)
+        
+        # Cache the unfiltered reply; dedup depends on index state, not the prompt
+        self._store_response(prompt, raw_response, response, usage)
+        return self._with_questions(response, kept, duplicates)
+    
+    def iter_questions(
+        self,
+        text: str,
+        skill_id: str,
+        difficulty_distribution: Dict[DifficultyLevel, int],
+        custom_instructions: Optional[str] = None,
+        truncate: bool = True
+    ) -> Iterator[QuestionSchema]:
+        """
+        Stream validated questions as the provider produces them.
+        
+        Each question is yielded as soon as its JSON object is complete, so
+        the first question is available long before the reply finishes. If
+        the reply is cut off (e.g. by the output token limit), every question
+        completed before the cut is still yielded.
+        
+        Args:
+            Same as generate()
+            
+        Yields:
+            Validated questions in the order the model wrote them
+        """
+        start_time = time.time()
+        
+        with timed("prompt_build"):
+            prompt = self._build_prompt(text, difficulty_distribution, custom_instructions, truncate)
+        
+        cached = self._cached_response(prompt, start_time)
+        if cached is not None:
+            yield from self._screen(cached.questions, skill_id, cached=True)[0]
+            return
+        
+        logger.info(f"Streaming {sum(difficulty_distribution.values())} questions...")
+        
+        raw_parts: List[str] = []
+        questions = []
+        usage = TokenUsage()
+        for question in self._stream_questions(prompt, raw_parts, usage):
+            questions.append(question)
+            yield from self._screen([question], skill_id)[0]
+        
+        raw_response = "".join(raw_parts)
+        response = self._build_response(prompt, raw_response, questions, start_time, usage)
+        self._store_response(prompt, raw_response, response, usage)
+    
+    async def agenerate(
+        self,
+        text: str,
+        skill_id: str,
+        difficulty_distribution: Dict[DifficultyLevel, int],
+        custom_instructions: Optional[str] = None,
+        truncate: bool = True
+    ) -> GenerationResponse:
+        """
+        Async variant of generate() using the providers' native async clients.
+        
+        Prompt building and validation are identical to generate(); only the
+        network call is awaited, so many requests can be in flight at once.
+        """
+        start_time = time.time()
+        
+        with timed("prompt_build"):
+            prompt = self._build_prompt(text, difficulty_distribution, custom_instructions, truncate)
+        
+        logger.info(f"Generating {sum(difficulty_distribution.values())} questions (async)...")
+        logger.debug(f"Prompt length: {len(prompt)} chars")
+        
+        cached = self._cached_response(prompt, start_time)
+        if cached is not None:
+            return self._with_questions(cached, *self._screen(cached.questions, skill_id, cached=True))
+        
+        usage = TokenUsage()
+        raw_response = await self._acomplete(prompt, usage)
+        response = self._parse_response(prompt, raw_response, start_time, usage)
+        self._store_response(prompt, raw_response, response, usage)
+        return self._with_questions(response, *self._screen(response.questions, skill_id))
+    
+    async def generate_many(
+        self,
+        requests: Iterable[GenerationRequest],
+        concurrency: int = 8,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, Union[GenerationResponse, Exception]]]:
+        """
+        Run many generation requests concurrently.
+        
+        At most `concurrency` requests are in flight at any time. Results are
+        yielded as each request finishes, not in submission order, so callers
+        receive the request's index alongside its outcome. A failed or timed-out
+        request yields its exception instead of aborting the batch.
+        
+        Every request runs on this generator's model and temperature. A
+        request that explicitly asks for a different model or temperature
+        yields a ValueError rather than silently running with other settings;
+        use one generator per model.
+        
+        Args:
+            requests: Generation requests (consumed lazily)
+            concurrency: Maximum number of in-flight provider calls
+            timeout: Per-request timeout in seconds (None = no limit)
+            
+        Yields:
+            (index, GenerationResponse or Exception) tuples
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        
+        async def run(idx: int, request: GenerationRequest):
+            try:
+                self._check_request_settings(request)
+                response = await asyncio.wait_for(
+                    self.agenerate(
+                        text=request.text,
+                        skill_id=request.skill_id,
+                        difficulty_distribution=request.difficulty_distribution,
+                        custom_instructions=request.custom_instructions
+                    ),
+                    timeout=timeout
+                )
+                return idx, response
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = TimeoutError(f"Request {idx} timed out after {timeout}s")
+                logger.warning(f"Request {idx} failed: {e}")
+                return idx, e
+        
+        pending = set()
+        request_iter = enumerate(requests)
         
-        # Parse and validate
         try:
-            questions_data = json.loads(raw_response)
+            while True:
+                # Top up the in-flight set before waiting on it
+                for idx, request in request_iter:
+                    pending.add(asyncio.ensure_future(run(idx, request)))
+                    if len(pending) >= concurrency:
+                        break
+                
+                if not pending:
+                    return
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _check_request_settings(self, request: GenerationRequest) -> None:
+        """Reject a request that explicitly sets a model or temperature other than this generator's."""
+        requested = request.model_fields_set
+        if "model" in requested and request.model != self.model:
+            raise ValueError(f"Request asks for model {request.model!r}, but this generator uses {self.model!r}")
+        if "temperature" in requested and request.temperature != self.temperature:
+            raise ValueError(
+                f"Request asks for temperature {request.temperature}, but this generator uses {self.temperature}"
+            )
+    
+    def generate_chunked(
+        self,
+        text: str,
+        skill_id: str,
+        difficulty_distribution: Dict[DifficultyLevel, int],
+        custom_instructions: Optional[str] = None,
+        chunker: Optional[TextChunker] = None,
+        on_question: Optional[QuestionCallback] = None,
+        collect: bool = True
+    ) -> GenerationResponse:
+        """
+        Generate questions from a document of any length.
+        
+        The text is split into overlapping token-budgeted chunks, the requested
+        distribution is spread across chunks in proportion to their size, and
+        the per-chunk results are merged into a single response.
+        
+        Args:
+            text: Full source document
+            skill_id: Target skill UUID (for metadata)
+            difficulty_distribution: Total questions per difficulty level
+            custom_instructions: Optional user-specific instructions
+            chunker: Chunking strategy (defaults to TextChunker())
+            on_question: Called with each validated question as it is produced
+            collect: Keep questions in the returned response; pass False with
+                on_question to keep memory flat on very large runs
             
-            if not isinstance(questions_data, list):
-                raise ValueError("AI response must be a JSON array")
+        Returns:
+            GenerationResponse with validated questions from every chunk
+        """
+        chunker = chunker or TextChunker()
+        return self.generate_from_chunks(
+            chunker.split(text),
+            skill_id=skill_id,
+            difficulty_distribution=difficulty_distribution,
+            custom_instructions=custom_instructions,
+            on_question=on_question,
+            collect=collect
+        )
+    
+    def generate_from_chunks(
+        self,
+        chunks: Iterable[TextChunk],
+        skill_id: str,
+        difficulty_distribution: Dict[DifficultyLevel, int],
+        custom_instructions: Optional[str] = None,
+        on_question: Optional[QuestionCallback] = None,
+        collect: bool = True
+    ) -> GenerationResponse:
+        """
+        Run generation over pre-built chunks and merge the results.
+        
+        Chunks are consumed lazily, so `chunks` may be a generator.
+        A failing chunk is logged and skipped; the call only fails if
+        every chunk that was asked for questions failed.
+        With collect=False the response carries counts but no questions.
+        """
+        start_time = time.time()
+        
+        questions: List[QuestionSchema] = []
+        total_generated = 0
+        token_count = 0
+        input_tokens = 0
+        output_tokens = 0
+        cost_usd: Optional[float] = 0.0
+        usage_reported = True
+        duplicate_count = 0
+        chunk_count = 0
+        failed = 0
+        last_error: Optional[Exception] = None
+        progress = 0.0
+        
+        for chunk in chunks:
+            chunk_distribution = allocate_distribution(
+                difficulty_distribution, progress, chunk.progress
+            )
+            progress = chunk.progress
             
-            validated_questions = []
-            for idx, q_data in enumerate(questions_data):
-                try:
-                    validated_questions.append(QuestionSchema(**q_data))
-                except ValidationError as e:
-                    logger.warning(f"Question {idx+1} failed validation: {e}")
-                    # Skip invalid questions rather than failing entire batch
+            if sum(chunk_distribution.values()) == 0:
+                continue
             
-            generation_time = int((time.time() - start_time) * 1000)
+            chunk_count += 1
+            # Name the section so questions stay on its topic, even when the chunk starts mid-section
+            text = chunk.text if chunk.title is None else f"[Section: {chunk.title}]\n\n{chunk.text}"
+            try:
+                response = self.generate(
+                    text=text,
+                    skill_id=skill_id,
+                    difficulty_distribution=chunk_distribution,
+                    custom_instructions=custom_instructions,
+                    truncate=False,
+                    on_question=on_question
+                )
+            except Exception as e:
+                failed += 1
+                last_error = e
+                logger.warning(f"Chunk {chunk.index} failed, skipping: {e}")
+                continue
             
-            return GenerationResponse(
-                questions=validated_questions,
-                total_generated=len(validated_questions),
-                token_count=len(prompt.split()) + len(raw_response.split()),  # Rough estimate
-                generation_time_ms=generation_time,
-                model_used=self.model
+            if collect:
+                questions.extend(response.questions)
+            total_generated += response.total_generated
+            token_count += response.token_count
+            input_tokens += response.input_tokens
+            output_tokens += response.output_tokens
+            usage_reported = usage_reported and response.usage_reported
+            if cost_usd is not None and response.cost_usd is not None:
+                cost_usd += response.cost_usd
+            else:
+                cost_usd = None
+            duplicate_count += response.duplicate_count
+        
+        if chunk_count and failed == chunk_count:
+            raise ValueError(f"All {chunk_count} chunks failed to generate: {last_error}")
+        
+        logger.info(f"Generated {total_generated} questions from {chunk_count} chunks ({failed} failed)")
+        
+        return GenerationResponse(
+            questions=questions,
+            total_generated=total_generated,
+            token_count=token_count,
+            generation_time_ms=int((time.time() - start_time) * 1000),
+            model_used=self.model,
+            chunk_count=chunk_count,
+            duplicate_count=duplicate_count,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            usage_reported=usage_reported and chunk_count > failed,
+            cost_usd=cost_usd
+        )
+    
+    def _complete(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """
+        Send a prompt to the configured provider and return the raw text.
+        Provider-reported token counts are written to `usage` when available.
+        """
+        call = getattr(self, f"_call_{self.provider}")
+        with timed("provider"):
+            return retry_call(
+                lambda: call(prompt, usage),
+                limiter=self.rate_limiter,
+                tokens=self._request_tokens(prompt),
+                max_retries=self.max_retries
+            )
+    
+    async def _acomplete(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Async counterpart of _complete()."""
+        call = getattr(self, f"_acall_{self.provider}")
+        with timed("provider"):
+            return await aretry_call(
+                lambda: call(prompt, usage),
+                limiter=self.rate_limiter,
+                tokens=self._request_tokens(prompt),
+                max_retries=self.max_retries
             )
+    
+    def _request_tokens(self, prompt: str) -> int:
+        """Tokens a request counts against the quota (prompt plus output ceiling)."""
+        return self._prompt_tokens(prompt) + MAX_OUTPUT_TOKENS
+    
+    def _prompt_tokens(self, prompt: str) -> int:
+        """Locally counted input tokens for a prompt."""
+        # Each prompt is counted for the rate limiter and again for usage; reuse the count
+        last = self._last_prompt_tokens
+        if last is not None and last[0] is prompt:
+            return last[1]
+        
+        tokens = self.token_counter.count(prompt)
+        if self.provider == "openai":
+            # The system prompt is also sent as its own message
+            tokens += self.token_counter.count(self.DEFAULT_SYSTEM_PROMPT)
+        self._last_prompt_tokens = (prompt, tokens)
+        return tokens
+    
+    def _cache_key(self, prompt: str) -> str:
+        return GenerationCache.key(prompt, self.provider, self.model, self.temperature, MAX_OUTPUT_TOKENS)
+    
+    def _cached_response(self, prompt: str, start_time: float) -> Optional[GenerationResponse]:
+        """Rebuild a response from the cache, or None on a miss."""
+        if self.cache is None or self.refresh_cache:
+            return None
+        
+        entry = self.cache.get(self._cache_key(prompt))
+        if entry is None:
+            count("generation_cache_misses")
+            return None
+        count("generation_cache_hits")
+        
+        questions = [QuestionSchema.model_validate(q) for q in entry["questions"]]
+        logger.info(f"Cache hit: reusing {len(questions)} questions")
+        
+        return GenerationResponse(
+            questions=questions,
+            total_generated=len(questions),
+            token_count=entry["token_count"],
+            generation_time_ms=int((time.time() - start_time) * 1000),
+            model_used=entry["model"],
+            cache_hit=True,
+            input_tokens=entry.get("input_tokens", 0),
+            output_tokens=entry.get("output_tokens", 0),
+            cost_usd=0.0  # Nothing is billed for a cached reply
+        )
+    
+    def _store_response(
+        self,
+        prompt: str,
+        raw_response: str,
+        response: GenerationResponse,
+        usage: Optional[TokenUsage] = None
+    ) -> None:
+        """Cache a complete reply; truncated or empty ones are worth retrying instead."""
+        if self.cache is None:
+            return
+        if not response.questions or (usage is not None and usage.truncated):
+            count("generation_cache_skipped")
+            logger.debug("Not caching an empty or truncated reply")
+            return
+        
+        try:
+            self.cache.store(
+                self._cache_key(prompt),
+                raw_response=raw_response,
+                questions=[q.model_dump(mode="json") for q in response.questions],
+                token_count=response.token_count,
+                model=response.model_used,
+                input_tokens=response.input_tokens,
+                output_tokens=response.output_tokens
+            )
+        except OSError as e:
+            logger.warning(f"Could not write generation cache: {e}")
+    
+    def _screen(
+        self,
+        questions: List[QuestionSchema],
+        skill_id: str,
+        cached: bool = False
+    ) -> Tuple[List[QuestionSchema], int]:
+        """
+        Apply the dedup index, returning the questions to keep and the duplicate count.
+        A cached reply was indexed when it was first generated, so its questions
+        do not count as duplicates of themselves.
+        """
+        if self.dedup is None or not questions:
+            return questions, 0
+        with timed("dedup"):
+            kept, duplicates = self.dedup.screen(questions, skill_id, self.dedup_mode, already_screened=cached)
+        count("duplicates", duplicates)
+        return kept, duplicates
+    
+    @staticmethod
+    def _with_questions(
+        response: GenerationResponse,
+        questions: List[QuestionSchema],
+        duplicates: int
+    ) -> GenerationResponse:
+        if questions is response.questions:
+            return response
+        return response.model_copy(update={
+            "questions": questions,
+            "total_generated": len(questions),
+            "duplicate_count": duplicates
+        })
+    
+    def _parse_response(
+        self,
+        prompt: str,
+        raw_response: str,
+        start_time: float,
+        usage: Optional[TokenUsage] = None
+    ) -> GenerationResponse:
+        """Parse the raw AI output into a validated GenerationResponse."""
+        with timed("json_decode"):
+            questions_data = self._decode_questions(raw_response, usage)
+        
+        # Skip invalid questions rather than failing entire batch
+        with timed("validation"):
+            result = validate_questions(questions_data)
+        count("questions_valid", len(result.valid))
+        count("questions_invalid", len(result.errors))
+        for error in result.errors:
+            logger.warning(f"Question {error.index+1} failed validation: {error.message}")
+        
+        return self._build_response(prompt, raw_response, result.valid, start_time, usage)
+    
+    def _decode_questions(self, raw_response: str, usage: Optional[TokenUsage] = None) -> List[Any]:
+        """
+        Decode the AI output as a JSON array.
         
+        Falls back to the incremental parser when strict decoding fails,
+        recovering replies wrapped in code fences or truncated mid-array.
+        A truncated reply is flagged on `usage`.
+        """
+        try:
+            questions_data = json.loads(raw_response)
         except json.JSONDecodeError as e:
-            logger.error(f"AI returned invalid JSON: {e}")
+            parser = JsonArrayStream()
+            questions_data = parser.feed(raw_response)
+            
+            if not questions_data:
+                logger.error(f"AI returned invalid JSON: {e}")
+                logger.debug(f"Raw response: {raw_response[:500]}...")
+                raise ValueError(f"AI did not return valid JSON: {e}")
+            
+            if parser.truncated:
+                logger.warning(f"AI response was truncated; kept {len(questions_data)} complete questions")
+                if usage is not None:
+                    usage.truncated = True
+            return questions_data
+        
+        if not isinstance(questions_data, list):
+            raise ValueError("AI response must be a JSON array")
+        
+        return questions_data
+    
+    def _validate_question(self, idx: int, q_data: Any) -> Optional[QuestionSchema]:
+        """
+        Validate one streamed question with the batch validator, so both
+        paths apply the same rules; log and return None if it is invalid.
+        """
+        with timed("validation"):
+            result = validate_questions([q_data])
+        if result.errors:
+            # Skip invalid questions rather than failing entire batch
+            logger.warning(f"Question {idx+1} failed validation: {result.errors[0].message}")
+            count("questions_invalid")
+            return None
+        count("questions_valid")
+        return result.valid[0]
+    
+    def _build_response(
+        self,
+        prompt: str,
+        raw_response: str,
+        questions: List[QuestionSchema],
+        start_time: float,
+        usage: Optional[TokenUsage] = None
+    ) -> GenerationResponse:
+        generation_time = int((time.time() - start_time) * 1000)
+        usage = self._resolve_usage(prompt, raw_response, usage)
+        model = usage.model or self.model
+        
+        return GenerationResponse(
+            questions=questions,
+            total_generated=len(questions),
+            token_count=usage.total,
+            generation_time_ms=generation_time,
+            model_used=model,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            usage_reported=usage.reported,
+            cost_usd=estimate_cost(model, usage.input_tokens, usage.output_tokens)
+        )
+    
+    def _resolve_usage(self, prompt: str, raw_response: str, usage: Optional[TokenUsage]) -> TokenUsage:
+        """Provider-reported usage when available, otherwise local counts."""
+        if usage is not None and usage.reported:
+            # Recalibrate the local estimate against the real tokenizer
+            self.token_counter.observe(self._prompt_tokens(prompt), usage.input_tokens)
+            return usage
+        return TokenUsage(
+            self._prompt_tokens(prompt),
+            self.token_counter.count(raw_response),
+            model=usage.model if usage is not None else None
+        )
+    
+    def _stream_questions(
+        self,
+        prompt: str,
+        raw_parts: List[str],
+        usage: Optional[TokenUsage] = None
+    ) -> Iterator[QuestionSchema]:
+        """
+        Stream the provider reply through the incremental parser.
+        
+        Raw text pieces are appended to `raw_parts` for caching, and reported
+        token counts are written to `usage`. An error after questions have
+        arrived ends the stream but keeps them.
+        """
+        parser = JsonArrayStream()
+        parsed = 0
+        
+        try:
+            for piece in self._stream_complete(prompt, usage):
+                raw_parts.append(piece)
+                for q_data in parser.feed(piece):
+                    question = self._validate_question(parsed, q_data)
+                    parsed += 1
+                    if question is not None:
+                        yield question
+        except Exception as e:
+            if parsed == 0:
+                raise
+            logger.warning(f"Stream interrupted after {parsed} questions, keeping them: {e}")
+            if usage is not None:
+                usage.truncated = True
+            return
+        
+        if not parser.started:
+            raw_response = "".join(raw_parts)
+            logger.error("AI returned no JSON array")
             logger.debug(f"Raw response: {raw_response[:500]}...")
-            raise ValueError(f"AI did not return valid JSON: {e}")
+            raise ValueError("AI did not return valid JSON: no array found")
+        
+        if parser.truncated:
+            logger.warning(f"AI response was truncated; kept {parsed} complete questions")
+            if usage is not None:
+                usage.truncated = True
+    
+    def _stream_complete(self, prompt: str, usage: Optional[TokenUsage] = None) -> Iterator[str]:
+        """
+        Stream raw text from the provider under the rate limiter.
+        Failures before the first piece arrives are retried like _complete().
+        """
+        stream = getattr(self, f"_stream_{self.provider}")
+        tokens = self._request_tokens(prompt)
+        attempt = 0
+        start = time.perf_counter()
+        
+        while True:
+            if self.rate_limiter is not None:
+                with timed("rate_limit_wait"):
+                    self.rate_limiter.acquire(tokens)
+            
+            started = False
+            try:
+                for piece in stream(prompt, usage):
+                    if not started:
+                        started = True
+                        # Streamed replies are consumed as they arrive; time to first piece is the provider's share
+                        observe("provider_first_piece", time.perf_counter() - start)
+                    yield piece
+            except Exception as e:
+                if started or attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = retry_delay(e, attempt, self.rate_limiter)
+                attempt += 1
+                logger.warning(f"Transient provider error ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_success()
+            return
     
     def _build_prompt(
+        self,
+        text: str,
+        difficulty_distribution: Dict[DifficultyLevel, int],
+        custom_instructions: Optional[str],
+        truncate: bool = True
+    ) -> str:
+        """
+        Construct the full generation prompt.
+        
+        Source text beyond the model's context window (after the prompt
+        template and the output allowance) is always cut, so a prompt never
+        overflows; `truncate` additionally applies max_source_chars.
+        """
+        if truncate and len(text) > self.max_source_chars:
+            logger.warning(
+                f"Source text truncated from {len(text)} to {self.max_source_chars} chars; "
+                "use chunked generation to cover the full document"
+            )
+            text = text[:self.max_source_chars]
+        
+        budget = self.source_token_budget(difficulty_distribution, custom_instructions)
+        source_tokens = self.token_counter.count(text)
+        if source_tokens > budget:
+            logger.warning(
+                f"Source text truncated from {source_tokens} to {budget} tokens "
+                f"to fit the {self.context_tokens}-token context window of {self.model}"
+            )
+            text = self.token_counter.truncate(text, budget)
+        
+        return self._render_prompt(text, difficulty_distribution, custom_instructions)
+    
+    def source_token_budget(
+        self,
+        difficulty_distribution: Optional[Dict[DifficultyLevel, int]] = None,
+        custom_instructions: Optional[str] = None
+    ) -> int:
+        """
+        Source tokens that fit in one prompt.
+        
+        The context window minus the output allowance and the prompt template,
+        with headroom when the token counter only estimates. Use it as the
+        chunk size to pack each chunk into the context window.
+        """
+        overhead = self._prompt_tokens(
+            self._render_prompt("", difficulty_distribution or {}, custom_instructions)
+        )
+        budget = self.context_tokens - MAX_OUTPUT_TOKENS - overhead
+        if not self.token_counter.exact:
+            budget = int(budget * ESTIMATE_SAFETY)
+        return max(budget, 0)
+    
+    def _render_prompt(
         self,
         text: str,
         difficulty_distribution: Dict[DifficultyLevel, int],
         custom_instructions: Optional[str]
     ) -> str:
-        """Construct the full generation prompt."""
         total_questions = sum(difficulty_distribution.values())
         
         distribution_text = ", ".join([
@@ -194,7 +915,7 @@ Return a JSON array of question objects ONLY. Example:
 {distribution_text}
 
 **Source Text:**
-{text[:4000]}  # Limit to ~4000 chars to stay within context
+{text}
 
 {f"**Additional Instructions:** {custom_instructions}" if custom_instructions else ""}
 
@@ -203,23 +924,24 @@ Remember: Output ONLY the JSON array. No markdown, no explanations.
         
         return f"{self.DEFAULT_SYSTEM_PROMPT}\n\n{user_prompt}"
     
-    def _call_gemini(self, prompt: str) -> str:
+    def _call_gemini(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
         """Call Gemini API."""
         try:
             response = self.client.generate_content(
                 prompt,
-                generation_config=genai.GenerationConfig(
+                generation_config=require(*GEMINI_SDK).GenerationConfig(
                     temperature=self.temperature,
-                    max_output_tokens=4096,
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
                 )
             )
+            _record_gemini_usage(response, usage)
             return response.text
         
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
             raise
     
-    def _call_openai(self, prompt: str) -> str:
+    def _call_openai(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
         """Call OpenAI API."""
         try:
             response = self.client.chat.completions.create(
@@ -229,10 +951,162 @@ Remember: Output ONLY the JSON array. No markdown, no explanations.
                     {"role": "user", "content": prompt}
                 ],
                 temperature=self.temperature,
-                max_tokens=4096
+                max_tokens=MAX_OUTPUT_TOKENS
             )
+            _record_openai_usage(response, usage)
             return response.choices[0].message.content
         
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
+    
+    def _stream_gemini(self, prompt: str, usage: Optional[TokenUsage] = None) -> Iterator[str]:
+        """Stream text pieces from the Gemini API."""
+        try:
+            response = self.client.generate_content(
+                prompt,
+                generation_config=require(*GEMINI_SDK).GenerationConfig(
+                    temperature=self.temperature,
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
+                ),
+                stream=True
+            )
+            for chunk in response:
+                # Every chunk carries running totals; the last one is final
+                _record_gemini_usage(chunk, usage)
+                # Chunks without text (e.g. the final finish-reason chunk) raise on .text
+                if chunk.parts:
+                    yield chunk.text
+        
+        except Exception as e:
+            logger.error(f"Gemini API error: {e}")
+            raise
+    
+    def _stream_openai(self, prompt: str, usage: Optional[TokenUsage] = None) -> Iterator[str]:
+        """Stream text pieces from the OpenAI API."""
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.DEFAULT_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=MAX_OUTPUT_TOKENS,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                # Usage arrives on a final chunk with no choices
+                _record_openai_usage(chunk, usage)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+    
+    async def _acall_gemini(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Call Gemini API asynchronously."""
+        try:
+            response = await self.client.generate_content_async(
+                prompt,
+                generation_config=require(*GEMINI_SDK).GenerationConfig(
+                    temperature=self.temperature,
+                    max_output_tokens=MAX_OUTPUT_TOKENS,
+                )
+            )
+            _record_gemini_usage(response, usage)
+            return response.text
+        
+        except Exception as e:
+            logger.error(f"Gemini API error: {e}")
+            raise
+    
+    async def _acall_openai(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Call OpenAI API asynchronously."""
+        if self._async_client is None:
+            self._async_client = require(*OPENAI_SDK).AsyncOpenAI(api_key=self._openai_api_key, max_retries=0)
+        
+        try:
+            response = await self._async_client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self.DEFAULT_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=MAX_OUTPUT_TOKENS
+            )
+            _record_openai_usage(response, usage)
+            return response.choices[0].message.content
+        
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise
+
+    def _call_mock(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Answer from the local mock provider."""
+        return self.client.complete(prompt)
+    
+    def _stream_mock(self, prompt: str, usage: Optional[TokenUsage] = None) -> Iterator[str]:
+        """Stream from the local mock provider."""
+        return self.client.stream(prompt)
+    
+    async def _acall_mock(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Answer from the local mock provider asynchronously."""
+        return await self.client.acomplete(prompt)
+
+
+def _record_gemini_usage(response: Any, usage: Optional[TokenUsage]) -> None:
+    if usage is None:
+        return
+    candidates = getattr(response, "candidates", None) or []
+    reason = getattr(candidates[0], "finish_reason", None) if candidates else None
+    if getattr(reason, "name", reason) in ("MAX_TOKENS", 2):
+        usage.truncated = True
+    
+    metadata = getattr(response, "usage_metadata", None)
+    if not metadata or not metadata.prompt_token_count:
+        return
+    usage.input_tokens = metadata.prompt_token_count
+    usage.output_tokens = metadata.candidates_token_count or 0
+    usage.reported = True
+
+
+def _record_openai_usage(response: Any, usage: Optional[TokenUsage]) -> None:
+    if usage is None:
+        return
+    choices = getattr(response, "choices", None) or []
+    if choices and getattr(choices[0], "finish_reason", None) == "length":
+        usage.truncated = True
+    
+    reported = getattr(response, "usage", None)
+    if reported is None:
+        return
+    usage.input_tokens = reported.prompt_tokens
+    usage.output_tokens = reported.completion_tokens
+    usage.reported = True
+
+
+def _notify(callback: Optional[QuestionCallback], questions: List[QuestionSchema]) -> None:
+    if callback is not None:
+        for question in questions:
+            callback(question)
+
+
+def allocate_distribution(
+    distribution: Dict[DifficultyLevel, int],
+    start: float,
+    end: float
+) -> Dict[DifficultyLevel, int]:
+    """
+    Share of a difficulty distribution owed to the document span [start, end).
+    
+    Uses cumulative rounding so that per-chunk counts always sum back to the
+    requested totals once the whole document (0.0 -> 1.0) has been covered.
+    """
+    return {
+        level: int(count * end + 0.5) - int(count * start + 0.5)
+        for level, count in distribution.items()
+    }
@@ -0,0 +1,408 @@
+"""
+Question generation routed across several providers.
+
+RouterGenerator holds one QuestionGenerator per backend model (e.g. Gemini
+and OpenAI) and sends each provider call to the healthiest or cheapest
+backend, failing over on errors and optionally hedging slow calls to a
+second backend.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .question_generator import QuestionGenerator
+from ..utils.tokens import TokenUsage, estimate_cost
+
+logger = logging.getLogger(__name__)
+
+ROUTING_STRATEGIES = ("health", "cost")
+DEFAULT_MODELS = ("gemini-1.5-flash", "gpt-4o-mini")
+
+# Latency samples kept per backend, and how many are needed before hedging on a quantile
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+# Weight of the newest call in the failure-rate and latency moving averages
+EWMA_ALPHA = 0.2
+
+
+class Backend:
+    """One provider behind the router, with its recent health."""
+
+    def __init__(self, generator: QuestionGenerator, failure_threshold: int, cooldown: float):
+        self.generator = generator
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.calls = 0
+        self.failures = 0
+        self.failure_rate = 0.0
+        self.latency: Optional[float] = None  # Moving average of successful calls, seconds
+        self.consecutive_failures = 0
+        self.open_until = 0.0  # Circuit breaker: ranked last until this time
+
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        return self.generator.model
+
+    def healthy(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) >= self.open_until
+
+    def unit_cost(self) -> float:
+        """List price of a million input plus a million output tokens (inf if unknown)."""
+        cost = estimate_cost(self.model, 1_000_000, 1_000_000)
+        return float("inf") if cost is None else cost
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Latency quantile over recent successful calls, once enough are recorded."""
+        with self._lock:
+            if len(self._latencies) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.consecutive_failures = 0
+            self.failure_rate *= 1 - EWMA_ALPHA
+            self.latency = latency if self.latency is None else (
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+            )
+            self._latencies.append(latency)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.failure_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.failure_rate
+            if self.consecutive_failures >= self.failure_threshold:
+                self.open_until = time.monotonic() + self.cooldown
+                logger.warning(
+                    f"Backend {self.model} failed {self.consecutive_failures} times in a row; "
+                    f"deprioritized for {self.cooldown:.0f}s"
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "failures": self.failures,
+            "failure_rate": round(self.failure_rate, 3),
+            "latency_ms": None if self.latency is None else round(self.latency * 1000),
+            "p95_ms": None if (p95 := self.latency_quantile(0.95)) is None else round(p95 * 1000),
+            "healthy": self.healthy(),
+        }
+
+
+class RouterGenerator(QuestionGenerator):
+    """
+    QuestionGenerator that spreads provider calls over several backends.
+
+    Prompt building, validation, caching and dedup are inherited; only the
+    provider call is routed. Each call goes to the best-ranked backend:
+
+    - "health": lowest recent failure rate, then lowest latency
+    - "cost": lowest list price, then health
+
+    A backend that fails (after its own retries) is skipped and the next one
+    is tried; `failure_threshold` consecutive failures move it to the back of
+    the ranking for `cooldown` seconds. With `hedge=True`, a call still
+    running after the backend's p95 latency (or `hedge_after` seconds) is
+    duplicated to the next backend and the first reply wins. The losing call
+    is not cancelled and is still billed, so hedging trades cost for tail
+    latency. Streaming calls fail over before the first piece but are not hedged.
+
+    Example:
+        generator = RouterGenerator(["gemini-1.5-flash", "gpt-4o-mini"], hedge=True)
+        response = generator.generate(text, skill_id, distribution)
+        print(response.model_used, generator.backend_stats())
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str] = DEFAULT_MODELS,
+        strategy: str = "health",
+        hedge: bool = False,
+        hedge_after: Optional[float] = None,
+        hedge_quantile: float = 0.95,
+        backend_retries: int = 1,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        api_keys: Optional[Dict[str, str]] = None,
+        max_workers: int = 32,
+        **kwargs
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            models: Backend models in order of preference
+            strategy: "health" or "cost" (see class docstring)
+            hedge: Duplicate slow calls to a second backend
+            hedge_after: Fixed hedge delay in seconds; otherwise the primary's
+                latency at `hedge_quantile`, once enough calls are recorded
+            hedge_quantile: Latency quantile that triggers a hedge
+            backend_retries: Retries within a backend before failing over
+            failure_threshold: Consecutive failures that deprioritize a backend
+            cooldown: Seconds a failing backend stays deprioritized
+            api_keys: API key per backend model (default: environment variables)
+            max_workers: Threads available for hedged calls
+            **kwargs: QuestionGenerator options (temperature, cache, stream, ...)
+        """
+        if strategy not in ROUTING_STRATEGIES:
+            raise ValueError(f"strategy must be one of {ROUTING_STRATEGIES}")
+        if not models:
+            raise ValueError("At least one backend model is required")
+
+        self.models = list(models)
+        self.strategy = strategy
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.hedge_quantile = hedge_quantile
+        self.backend_retries = backend_retries
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._api_keys = api_keys or {}
+        self._max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+        token_counter = kwargs.pop("token_counter", None)
+        super().__init__(model=",".join(self.models), **kwargs)
+
+        # Backends enforce their own quotas; budget prompts for the smallest window
+        self.rate_limiter = None
+        primary = self.backends[0].generator
+        self.token_counter = token_counter or primary.token_counter
+        self.context_tokens = min(b.generator.context_tokens for b in self.backends)
+
+    def _init_client(self, api_key: Optional[str]) -> None:
+        """Create a QuestionGenerator per backend, skipping unavailable ones."""
+        self.provider = "router"
+        self.backends: List[Backend] = []
+
+        for model in self.models:
+            try:
+                generator = QuestionGenerator(
+                    model=model,
+                    temperature=self.temperature,
+                    api_key=self._api_keys.get(model),
+                    max_retries=self.backend_retries
+                )
+            except (ImportError, ValueError) as e:
+                logger.warning(f"Router backend {model} unavailable: {e}")
+                continue
+            self.backends.append(Backend(generator, self.failure_threshold, self.cooldown))
+
+        if not self.backends:
+            raise ValueError(f"No router backend available among: {', '.join(self.models)}")
+
+    def backend_stats(self) -> List[Dict[str, Any]]:
+        """Health and latency of every backend, in current ranking order."""
+        return [backend.stats() for backend in self._ranked()]
+
+    def _ranked(self) -> List[Backend]:
+        """Backends in the order they should be tried; sorting is stable, so ties keep preference order."""
+        now = time.monotonic()
+
+        def health(backend: Backend) -> Tuple[float, float]:
+            return backend.failure_rate, backend.latency if backend.latency is not None else 0.0
+
+        if self.strategy == "cost":
+            key = lambda b: (not b.healthy(now), b.unit_cost(), *health(b))
+        else:
+            key = lambda b: (not b.healthy(now), *health(b))
+        return sorted(self.backends, key=key)
+
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        if not self.hedge:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return backend.latency_quantile(self.hedge_quantile)
+
+    def _call_backend(self, backend: Backend, prompt: str) -> Tuple[str, TokenUsage]:
+        usage = TokenUsage(model=backend.model)
+        start = time.monotonic()
+        try:
+            text = backend.generator._complete(prompt, usage)
+        except Exception:
+            backend.record_failure()
+            raise
+        backend.record_success(time.monotonic() - start)
+        return text, usage
+
+    def _complete(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Send the prompt to the best backend, failing over and hedging as configured."""
+        backends = self._ranked()
+        if self.hedge and len(backends) > 1:
+            text, call_usage = self._race(prompt, backends)
+        else:
+            text, call_usage = self._failover(prompt, backends)
+
+        _copy_usage(usage, call_usage)
+        return text
+
+    def _failover(self, prompt: str, backends: List[Backend]) -> Tuple[str, TokenUsage]:
+        last_error: Optional[Exception] = None
+        for backend in backends:
+            try:
+                return self._call_backend(backend, prompt)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Backend {backend.model} failed, failing over: {e}")
+        raise last_error
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="router")
+            return self._pool
+
+    def _race(self, prompt: str, backends: List[Backend]) -> Tuple[str, TokenUsage]:
+        """Run the call on the first backend, adding the next on a hedge timeout or failure."""
+        pool = self._executor()
+        queue = iter(backends)
+        pending = {}
+        last_error: Optional[Exception] = None
+
+        def launch() -> Optional[Backend]:
+            backend = next(queue, None)
+            if backend is not None:
+                # Carry the caller's context so metrics collectors see the backend call
+                pending[pool.submit(contextvars.copy_context().run, self._call_backend, backend, prompt)] = backend
+            return backend
+
+        # The backend the hedge timer is running for; a failover hands it on
+        racing = launch()
+        hedged = False
+        while pending:
+            timeout = None if hedged else self._hedge_delay(racing)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                hedged = True
+                backend = launch()
+                if backend is not None:
+                    logger.info(f"Hedging slow call on {racing.model} ({timeout:.1f}s) to {backend.model}")
+                continue
+
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Backend {backend.model} failed, failing over: {e}")
+                    failover = launch()
+                    if failover is not None and not hedged:
+                        racing = failover
+
+        raise last_error
+
+    async def _acomplete(self, prompt: str, usage: Optional[TokenUsage] = None) -> str:
+        """Async counterpart of _complete(), hedging with tasks instead of threads."""
+        queue = iter(self._ranked())
+        pending: Dict[asyncio.Task, Backend] = {}
+        last_error: Optional[Exception] = None
+
+        async def call(backend: Backend) -> Tuple[str, TokenUsage]:
+            call_usage = TokenUsage(model=backend.model)
+            start = time.monotonic()
+            try:
+                text = await backend.generator._acomplete(prompt, call_usage)
+            except Exception:
+                backend.record_failure()
+                raise
+            backend.record_success(time.monotonic() - start)
+            return text, call_usage
+
+        def launch() -> Optional[Backend]:
+            backend = next(queue, None)
+            if backend is not None:
+                pending[asyncio.ensure_future(call(backend))] = backend
+            return backend
+
+        racing = launch()
+        hedged = False
+        try:
+            while pending:
+                timeout = None if hedged else self._hedge_delay(racing)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedged = True
+                    backend = launch()
+                    if backend is not None:
+                        logger.info(f"Hedging slow call on {racing.model} ({timeout:.1f}s) to {backend.model}")
+                    continue
+
+                for task in done:
+                    backend = pending.pop(task)
+                    try:
+                        text, call_usage = task.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.warning(f"Backend {backend.model} failed, failing over: {e}")
+                        failover = launch()
+                        if failover is not None and not hedged:
+                            racing = failover
+                        continue
+                    _copy_usage(usage, call_usage)
+                    return text
+        finally:
+            # Unlike threads, a losing async call can be cancelled
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    def _stream_complete(self, prompt: str, usage: Optional[TokenUsage] = None) -> Iterator[str]:
+        """Stream from the best backend, failing over until the first piece arrives."""
+        last_error: Optional[Exception] = None
+        for backend in self._ranked():
+            call_usage = TokenUsage(model=backend.model)
+            start = time.monotonic()
+            started = False
+            try:
+                for piece in backend.generator._stream_complete(prompt, call_usage):
+                    if not started:
+                        started = True
+                        if usage is not None:
+                            usage.model = backend.model
+                    yield piece
+            except Exception as e:
+                backend.record_failure()
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"Backend {backend.model} failed, failing over: {e}")
+                continue
+
+            backend.record_success(time.monotonic() - start)
+            _copy_usage(usage, call_usage)
+            return
+
+        raise last_error
+
+
+def _copy_usage(target: Optional[TokenUsage], source: TokenUsage) -> None:
+    """Report a backend call's usage through the caller's TokenUsage."""
+    if target is None:
+        return
+    target.input_tokens = source.input_tokens
+    target.output_tokens = source.output_tokens
+    target.reported = source.reported
+    target.model = source.model
+    target.truncated = source.truncated
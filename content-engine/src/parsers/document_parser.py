@@ -2,26 +2,40 @@
 Document parser for extracting text from PDF, DOCX, and images.
 """
 
+import os
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import logging
 
-try:
-    from PyPDF2 import PdfReader
-except ImportError:
-    PdfReader = None
+from ..utils.cache import ExtractionCache
+from ..utils.lazy import optional_import, require
+from ..utils.metrics import count, timed, timed_iter
 
-try:
-    from docx import Document
-except ImportError:
-    Document = None
+logger = logging.getLogger(__name__)
 
-try:
-    from PIL import Image
-except ImportError:
-    Image = None
+# Backends are imported on first use; see utils.lazy
+PDF_BACKEND = ("PyPDF2", "PyPDF2 is required for PDF parsing. Install with: pip install PyPDF2")
+DOCX_BACKEND = ("docx", "python-docx is required. Install with: pip install python-docx")
+IMAGE_BACKEND = ("PIL.Image", "Pillow is required. Install with: pip install Pillow")
 
-logger = logging.getLogger(__name__)
+# Separator placed between sections when a document is joined into one string
+SECTION_SEPARATOR = "\n\n"
+
+_HEADING_STYLE_RE = re.compile(r"Heading (\d)")
+
+
+@dataclass
+class DocumentSection:
+    """A page (PDF) or paragraph/table (DOCX) of extracted text."""
+    index: int    # 0-based page or block number
+    text: str
+    offset: int   # Character offset of `text` within the joined document
+    total: int    # Number of pages/blocks in the document
+    # Heading depth (1 = top level) of a heading, 0 for body text, or None when
+    # the format does not mark structure (PDF pages) and it has to be inferred
+    heading_level: Optional[int] = None
 
 
 class DocumentParser:
@@ -38,6 +52,41 @@ class DocumentParser:
         '.jpeg': 'parse_image',
     }
     
+    SECTION_ITERATORS = {
+        '.pdf': '_iter_pdf_pages',
+        '.docx': '_iter_docx_blocks',
+        '.png': '_iter_image',
+        '.jpg': '_iter_image',
+        '.jpeg': '_iter_image',
+    }
+    
+    # Below this many pages the process pool costs more than it saves
+    MIN_PARALLEL_PAGES = 16
+    
+    # Page ranges handed to each worker, for load balancing uneven pages
+    TASKS_PER_WORKER = 4
+    
+    # Bump whenever extraction output changes, to invalidate cached results
+    PARSER_VERSION = "2"
+    
+    def __init__(
+        self,
+        workers: int = 1,
+        cache: Optional[ExtractionCache] = None,
+        refresh_cache: bool = False
+    ):
+        """
+        Args:
+            workers: Processes used for PDF text extraction
+                (1 = in-process, 0 = one per CPU core)
+            cache: Extraction cache keyed by file content; repeat parses of
+                an unchanged file skip extraction entirely
+            refresh_cache: Ignore cached extractions but still store new ones
+        """
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.cache = cache
+        self.refresh_cache = refresh_cache
+    
     def parse(self, file_path: str) -> str:
         """
         Main entry point for parsing any supported document.
@@ -52,6 +101,77 @@ class DocumentParser:
             ValueError: If file format is not supported
             FileNotFoundError: If file doesn't exist
         """
+        ext = self._check_format(file_path)
+        
+        logger.info(f"Parsing {ext} file: {file_path}")
+        
+        if self.cache is not None:
+            return SECTION_SEPARATOR.join(s.text for s in self._iter_cached(file_path, ext))
+        
+        method_name = self.SUPPORTED_FORMATS[ext]
+        method = getattr(self, method_name)
+        
+        return method(file_path)
+
+    def iter_sections(self, file_path: str) -> Iterator[DocumentSection]:
+        """
+        Stream a document's text section by section.
+        
+        Yields non-empty pages (PDF) or paragraphs (DOCX) as soon as each is
+        extracted, so callers can start work before the whole file is parsed.
+        Joining the texts with SECTION_SEPARATOR reproduces parse().
+        
+        Args:
+            file_path: Path to the document file
+            
+        Raises:
+            ValueError: If file format is not supported
+            FileNotFoundError: If file doesn't exist
+        """
+        ext = self._check_format(file_path)
+        
+        logger.info(f"Streaming {ext} file: {file_path}")
+        
+        if self.cache is not None:
+            return self._iter_cached(file_path, ext)
+        
+        method = getattr(self, self.SECTION_ITERATORS[ext])
+        return method(file_path)
+
+    def _iter_cached(self, file_path: str, ext: str) -> Iterator[DocumentSection]:
+        """Serve sections from the extraction cache, filling it on a miss."""
+        key = self.cache.key(file_path, self.PARSER_VERSION)
+        entry = None if self.refresh_cache else self.cache.get(key)
+        
+        if entry is not None and entry.get("sections") is not None:
+            logger.info(f"Extraction cache hit: {file_path}")
+            count("extraction_cache_hits")
+            offset = 0
+            for index, text, heading_level in entry["sections"]:
+                yield DocumentSection(
+                    index=index, text=text, offset=offset, total=entry["total"], heading_level=heading_level
+                )
+                offset += len(text) + len(SECTION_SEPARATOR)
+            return
+        
+        count("extraction_cache_misses")
+        metadata: Dict[str, Any] = {}
+        sections = []
+        total = 0
+        for section in getattr(self, self.SECTION_ITERATORS[ext])(file_path, metadata):
+            sections.append([section.index, section.text, section.heading_level])
+            total = section.total
+            yield section
+        
+        # Only reached once the whole document was extracted
+        try:
+            self.cache.put(key, {"sections": sections, "total": total, "metadata": metadata})
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache: {e}")
+
+    @classmethod
+    def _check_format(cls, file_path: str) -> str:
+        """Validate that the file exists and is supported; return its extension."""
         path = Path(file_path)
         
         if not path.exists():
@@ -59,71 +179,129 @@ class DocumentParser:
         
         ext = path.suffix.lower()
         
-        if ext not in self.SUPPORTED_FORMATS:
+        if ext not in cls.SUPPORTED_FORMATS:
             raise ValueError(
                 f"Unsupported file format: {ext}. "
-                f"Supported formats: {list(self.SUPPORTED_FORMATS.keys())}"
+                f"Supported formats: {list(cls.SUPPORTED_FORMATS.keys())}"
             )
         
-        method_name = self.SUPPORTED_FORMATS[ext]
-        method = getattr(self, method_name)
-        
-        logger.info(f"Parsing {ext} file: {file_path}")
-        return method(file_path)
+        return ext
 
     def parse_pdf(self, file_path: str) -> str:
         """Extract text from PDF file."""
-        if PdfReader is None:
-            raise ImportError("PyPDF2 is required for PDF parsing. Install with: pip install PyPDF2")
+        full_text = SECTION_SEPARATOR.join(section.text for section in self._iter_pdf_pages(file_path))
+        logger.info(f"Total extracted: {len(full_text)} characters")
         
-        text_chunks = []
+        return full_text
+
+    def iter_pages(self, file_path: str) -> Iterator[DocumentSection]:
+        """Yield the non-empty pages of a PDF in order as they are extracted."""
+        if Path(file_path).suffix.lower() != '.pdf':
+            raise ValueError(f"iter_pages requires a PDF file: {file_path}")
+        return self.iter_sections(file_path)
+
+    def _iter_pdf_pages(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Iterator[DocumentSection]:
+        """Extract PDF pages, recording page count and document info into `metadata`."""
+        PyPDF2 = require(*PDF_BACKEND)
         
         try:
-            reader = PdfReader(file_path)
-            page_count = len(reader.pages)
+            with timed("parse_open"):
+                reader = PyPDF2.PdfReader(file_path)
+                page_count = len(reader.pages)
+            
+            if metadata is not None:
+                metadata.update(self._pdf_metadata(reader))
             
             logger.info(f"Processing {page_count} pages...")
             
-            for page_num, page in enumerate(reader.pages, 1):
-                text = page.extract_text()
+            if self.workers > 1 and page_count >= self.MIN_PARALLEL_PAGES:
+                pages = self._extract_pages_parallel(file_path, page_count)
+            else:
+                pages = (page.extract_text() for page in reader.pages)
+            
+            offset = 0
+            for page_num, text in enumerate(timed_iter("parse_page", pages)):
                 if text.strip():
-                    text_chunks.append(text)
-                    logger.debug(f"Extracted {len(text)} chars from page {page_num}")
+                    logger.debug(f"Extracted {len(text)} chars from page {page_num + 1}")
+                    yield DocumentSection(index=page_num, text=text, offset=offset, total=page_count)
+                    offset += len(text) + len(SECTION_SEPARATOR)
         
         except Exception as e:
             logger.error(f"PDF parsing error: {e}")
             raise
+
+    def _extract_pages_parallel(self, file_path: str, page_count: int) -> Iterator[str]:
+        """Extract page text across worker processes, yielded in page order."""
+        workers = min(self.workers, page_count)
+        step = max(1, -(-page_count // (workers * self.TASKS_PER_WORKER)))
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
         
-        full_text = "\n\n".join(text_chunks)
-        logger.info(f"Total extracted: {len(full_text)} characters")
+        logger.info(f"Extracting {page_count} pages with {workers} workers ({len(ranges)} ranges)")
         
-        return full_text
+        # multiprocessing is only needed for large PDFs; keep it off the import path
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in submission order, i.e. page order,
+            # while later ranges keep extracting in the background
+            for texts in executor.map(
+                _extract_page_range,
+                [file_path] * len(ranges),
+                [start for start, _ in ranges],
+                [stop for _, stop in ranges],
+            ):
+                yield from texts
 
     def parse_docx(self, file_path: str) -> str:
         """Extract text from DOCX file."""
-        if Document is None:
-            raise ImportError("python-docx is required. Install with: pip install python-docx")
+        blocks = list(self._iter_docx_blocks(file_path))
+        
+        full_text = SECTION_SEPARATOR.join(b.text for b in blocks)
+        logger.info(f"Extracted {len(blocks)} paragraphs and tables, {len(full_text)} characters")
+        
+        return full_text
+
+    def _iter_docx_blocks(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Iterator[DocumentSection]:
+        """
+        Yield the non-empty paragraphs and tables of a DOCX file in body order.
+        
+        Headings carry their level from the paragraph style, list items are
+        prefixed with "- " (indented by list level) and tables become one
+        line per row with cells separated by " | ".
+        """
+        docx = require(*DOCX_BACKEND)
         
         try:
-            doc = Document(file_path)
-            paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
+            with timed("parse_open"):
+                doc = docx.Document(file_path)
+                blocks = list(doc.iter_inner_content())
+                # Paragraph.style resolves each style through the whole styles part; map ids once
+                style_names = {style.style_id: style.name for style in doc.styles}
             
-            full_text = "\n\n".join(paragraphs)
-            logger.info(f"Extracted {len(paragraphs)} paragraphs, {len(full_text)} characters")
-            
-            return full_text
+            offset = 0
+            for idx, block in enumerate(blocks):
+                if hasattr(block, "rows"):
+                    text, level = _docx_table_text(block), 0
+                else:
+                    text, level = _docx_paragraph_text(block, style_names)
+                if text.strip():
+                    yield DocumentSection(index=idx, text=text, offset=offset, total=len(blocks), heading_level=level)
+                    offset += len(text) + len(SECTION_SEPARATOR)
         
         except Exception as e:
             logger.error(f"DOCX parsing error: {e}")
             raise
 
+    def _iter_image(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> Iterator[DocumentSection]:
+        """Images produce a single placeholder section."""
+        yield DocumentSection(index=0, text=self.parse_image(file_path), offset=0, total=1)
+
     def parse_image(self, file_path: str) -> str:
         """
         For images, we don't do OCR in Python (expensive).
         Instead, return a placeholder that signals the frontend to use Gemini Vision.
         """
-        if Image is None:
-            raise ImportError("Pillow is required. Install with: pip install Pillow")
+        Image = require(*IMAGE_BACKEND)
         
         try:
             img = Image.open(file_path)
@@ -138,8 +316,13 @@ class DocumentParser:
             raise
 
     @staticmethod
-    def get_metadata(file_path: str) -> Dict[str, Any]:
-        """Extract file metadata."""
+    def get_metadata(file_path: str, cache: Optional[ExtractionCache] = None) -> Dict[str, Any]:
+        """
+        Extract file metadata.
+        
+        With a cache, format metadata (e.g. PDF page count) recorded by an
+        earlier parse is reused instead of reopening the document.
+        """
         path = Path(file_path)
         
         metadata = {
@@ -149,17 +332,74 @@ class DocumentParser:
         }
         
         # PDF-specific metadata
-        if path.suffix.lower() == '.pdf' and PdfReader:
+        PyPDF2 = optional_import(PDF_BACKEND[0]) if path.suffix.lower() == '.pdf' else None
+        if PyPDF2 is not None:
+            key = cache.key(file_path, DocumentParser.PARSER_VERSION) if cache else None
+            entry = cache.get(key) if cache else None
+            
+            if entry is not None:
+                metadata.update(entry.get("metadata", {}))
+                return metadata
+            
             try:
-                reader = PdfReader(file_path)
-                metadata["page_count"] = len(reader.pages)
-                if reader.metadata:
-                    metadata["pdf_metadata"] = {
-                        "title": reader.metadata.get("/Title"),
-                        "author": reader.metadata.get("/Author"),
-                        "subject": reader.metadata.get("/Subject"),
-                    }
+                reader = PyPDF2.PdfReader(file_path)
+                pdf_metadata = DocumentParser._pdf_metadata(reader)
+                metadata.update(pdf_metadata)
+                if cache:
+                    cache.put(key, {"sections": None, "total": 0, "metadata": pdf_metadata})
             except Exception as e:
                 logger.warning(f"Could not extract PDF metadata: {e}")
         
         return metadata
+
+    @staticmethod
+    def _pdf_metadata(reader) -> Dict[str, Any]:
+        """Page count and document info from an open PdfReader."""
+        metadata: Dict[str, Any] = {"page_count": len(reader.pages)}
+        if reader.metadata:
+            metadata["pdf_metadata"] = {
+                "title": reader.metadata.get("/Title"),
+                "author": reader.metadata.get("/Author"),
+                "subject": reader.metadata.get("/Subject"),
+            }
+        return metadata
+
+def _docx_paragraph_text(paragraph, style_names: Dict[str, str]) -> Tuple[str, int]:
+    """(text, heading level) of a DOCX paragraph, marking list items."""
+    text = paragraph.text
+    if not text.strip():
+        return "", 0
+    style = style_names.get(paragraph._p.style, "") or ""
+    if style == "Title":
+        return text, 1
+    match = _HEADING_STYLE_RE.match(style)
+    if match:
+        return text, int(match.group(1))
+    
+    properties = paragraph._p.pPr
+    numbering = properties.numPr if properties is not None else None
+    if numbering is not None or style.startswith("List"):
+        depth = numbering.ilvl.val if numbering is not None and numbering.ilvl is not None else 0
+        text = "  " * depth + "- " + text
+    return text, 0
+
+
+def _docx_table_text(table) -> str:
+    """One line per row, cells joined by " | "; merged cells appear once."""
+    lines = []
+    for row in table.rows:
+        cells, seen = [], set()
+        for cell in row.cells:
+            if id(cell._tc) in seen:
+                continue
+            seen.add(id(cell._tc))
+            cells.append(" ".join(cell.text.split()))
+        if any(cells):
+            lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Worker-process entry point: extract text for pages [start, stop)."""
+    reader = require(*PDF_BACKEND).PdfReader(file_path)
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
@@ -0,0 +1,113 @@
+"""
+Shared extract + generate pipeline used by the CLI and batch runner.
+"""
+
+import logging
+from typing import Any, Dict, Mapping, Optional, Union
+
+from .parsers.document_parser import DocumentParser
+from .generators.question_generator import QuestionCallback, QuestionGenerator
+from .validators.question_schema import DifficultyLevel, GenerationResponse
+from .utils.chunking import TextChunker
+
+logger = logging.getLogger(__name__)
+
+
+def parse_distribution(dist_str: str) -> dict:
+    """Parse difficulty distribution from CLI string."""
+    # Format: "easy:10,medium:20,hard:10"
+    distribution = {}
+
+    try:
+        for pair in dist_str.split(','):
+            level, count = pair.split(':')
+            level = level.strip().lower()
+            count = int(count.strip())
+
+            if level not in ['easy', 'medium', 'hard']:
+                raise ValueError(f"Invalid difficulty level: {level}")
+
+            distribution[DifficultyLevel(level)] = count
+
+        return distribution
+
+    except Exception as e:
+        raise ValueError(f"Invalid distribution format: {e}")
+
+
+def coerce_distribution(value: Union[str, Mapping[str, int]]) -> Dict[DifficultyLevel, int]:
+    """Distribution from a CLI-style string or a {level: count} mapping (e.g. from JSON)."""
+    if isinstance(value, str):
+        return parse_distribution(value)
+    return {DifficultyLevel(level): int(count) for level, count in value.items()}
+
+
+def run_pipeline(
+    parser: DocumentParser,
+    generator: QuestionGenerator,
+    input_path: str,
+    skill_id: str,
+    difficulty_distribution: Dict[DifficultyLevel, int],
+    custom_instructions: Optional[str] = None,
+    chunker: Optional[TextChunker] = None,
+    on_question: Optional[QuestionCallback] = None,
+    collect: bool = True
+) -> GenerationResponse:
+    """
+    Extract a document and generate questions from it.
+
+    With a chunker, pages are streamed into chunks so generation starts
+    while extraction is still running; otherwise the document is extracted
+    in full and sent as a single prompt. `on_question` and `collect` are
+    passed through to the generator.
+    """
+    if chunker is not None:
+        logger.info("Extracting and generating in streamed chunks...")
+        return generator.generate_from_chunks(
+            chunker.iter_chunks(parser.iter_sections(input_path)),
+            skill_id=skill_id,
+            difficulty_distribution=difficulty_distribution,
+            custom_instructions=custom_instructions,
+            on_question=on_question,
+            collect=collect
+        )
+
+    # Step 1: Extract
+    logger.info("Step 1: Extracting text...")
+    text = parser.parse(input_path)
+    logger.info(f"Extracted {len(text)} characters")
+
+    # Step 2: Generate
+    logger.info("Step 2: Generating questions...")
+    return generator.generate(
+        text=text,
+        skill_id=skill_id,
+        difficulty_distribution=difficulty_distribution,
+        custom_instructions=custom_instructions,
+        on_question=on_question
+    )
+
+
+def build_output_metadata(response: GenerationResponse, **metadata: Any) -> Dict[str, Any]:
+    """Run metadata recorded alongside generated questions."""
+    return {
+        **metadata,
+        "model": response.model_used,
+        "total_generated": response.total_generated,
+        "generation_time_ms": response.generation_time_ms,
+        "token_count": response.token_count,
+        "input_tokens": response.input_tokens,
+        "output_tokens": response.output_tokens,
+        "usage_reported": response.usage_reported,
+        "cost_usd": response.cost_usd,
+        "chunk_count": response.chunk_count,
+        "duplicate_count": response.duplicate_count
+    }
+
+
+def build_output_data(response: GenerationResponse, **metadata: Any) -> Dict[str, Any]:
+    """JSON output document: run metadata followed by the questions."""
+    return {
+        "metadata": build_output_metadata(response, **metadata),
+        "questions": [q.model_dump() for q in response.questions]
+    }
@@ -0,0 +1,261 @@
+"""
+Publish validated questions to the Supabase `questions` table.
+
+Questions are upserted in batches over a single Postgres connection, keyed
+by a content hash (see supabase/migrations/*_question_content_hash.sql), so
+publishing the same output twice never creates duplicate rows.
+"""
+
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from .validators.question_schema import QuestionSchema
+from .utils.cache import make_key
+from .utils.lazy import require
+from .utils.output import METADATA_KEY
+
+logger = logging.getLogger(__name__)
+
+# Checked in order when no database URL is given explicitly
+DATABASE_URL_ENV = ("SUPABASE_DB_URL", "DATABASE_URL")
+DEFAULT_BATCH_SIZE = 500
+
+# Imported on first connect, so other commands never load the driver
+POSTGRES_DRIVER = ("psycopg2", "psycopg2 is required for publishing (pip install psycopg2-binary)")
+
+# Admin-managed columns (status, is_published, sort_order, deleted_at) are
+# never overwritten; rows whose values are unchanged are not touched at all.
+_UPSERT_SQL = """
+INSERT INTO public.questions
+    (skill_id, type, content, options, solution, explanation, points, app_id, content_hash)
+VALUES %s
+ON CONFLICT (content_hash) DO UPDATE SET
+    explanation = EXCLUDED.explanation,
+    points = EXCLUDED.points,
+    updated_at = now()
+WHERE questions.explanation IS DISTINCT FROM EXCLUDED.explanation
+   OR questions.points IS DISTINCT FROM EXCLUDED.points
+RETURNING (xmax = 0) AS inserted
+"""
+
+# app_id falls back to the skill's app so rows stay visible under tenant RLS
+_ROW_TEMPLATE = (
+    "(%s::uuid, %s::question_type, %s::jsonb, %s::jsonb, %s::jsonb, %s, %s, "
+    "COALESCE(%s::uuid, (SELECT app_id FROM public.skills WHERE id = %s::uuid)), %s)"
+)
+
+
+def question_content_hash(question: QuestionSchema, skill_id: str) -> str:
+    """SHA-256 identifying a question by its skill and substantive content."""
+    return make_key(
+        "question",
+        skill_id,
+        question.type.value,
+        question.content,
+        question.options,
+        question.solution
+    )
+
+
+def iter_question_file(path: str, metadata: Optional[Dict[str, Any]] = None) -> Iterator[QuestionSchema]:
+    """
+    Read questions from CLI output: a JSON document or a JSONL stream.
+
+    JSONL is read line by line, so files of any size are streamed. Questions
+    that fail validation are logged and skipped.
+
+    Args:
+        path: .json file from --format json, or .jsonl file from --format jsonl
+        metadata: Optional dict filled with the file's run metadata when it is read
+            (before the first question for JSON, after the last one for JSONL)
+
+    Yields:
+        Validated questions in file order
+    """
+    if metadata is None:
+        metadata = {}
+
+    if Path(path).suffix.lower() == ".jsonl":
+        records = _iter_jsonl(path, metadata)
+    else:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        metadata.update(data.get("metadata", {}))
+        records = enumerate(data.get("questions", []), 1)
+
+    for idx, record in records:
+        try:
+            yield QuestionSchema.model_validate(record)
+        except ValidationError as e:
+            logger.warning(f"Skipping invalid question {idx} in {path}: {e}")
+
+
+def _iter_jsonl(path: str, metadata: Dict[str, Any]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if METADATA_KEY in record:
+                metadata.update(record[METADATA_KEY])
+                continue
+            yield line_no, record
+
+
+class QuestionPublisher:
+    """
+    Buffers questions and upserts them into `questions` in batches.
+
+    Each batch is a single multi-row INSERT ... ON CONFLICT statement committed
+    on its own, so an interrupted load keeps every finished batch and can
+    simply be re-run. `add` is thread-safe and matches the generator's
+    `on_question` callback, so questions can be published as they are
+    generated.
+
+    Example:
+        with QuestionPublisher(skill_id=skill_id) as publisher:
+            generator.generate_chunked(text, skill_id, dist, on_question=publisher.add, collect=False)
+        print(publisher.stats)
+    """
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        skill_id: Optional[str] = None,
+        app_id: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.database_url = database_url or next(
+            (os.environ[name] for name in DATABASE_URL_ENV if os.getenv(name)), None
+        )
+        self.skill_id = skill_id
+        self.app_id = app_id
+        self.batch_size = batch_size
+        self.stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        self._conn = None
+        self._pending: Dict[str, Tuple[Any, ...]] = {}
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Open the database connection if it is not open yet."""
+        if self._conn is not None:
+            return self._conn
+
+        psycopg2 = require(*POSTGRES_DRIVER)
+        if not self.database_url:
+            raise ValueError(f"No database URL: pass one or set {' or '.join(DATABASE_URL_ENV)}")
+
+        self._conn = psycopg2.connect(self.database_url, application_name="questerix-content-engine")
+        return self._conn
+
+    def add(self, question: QuestionSchema, skill_id: Optional[str] = None) -> None:
+        """Queue a question, flushing once a full batch is buffered."""
+        skill_id = skill_id or self.skill_id
+        if not skill_id:
+            raise ValueError("No skill_id to publish under")
+
+        content_hash = question_content_hash(question, skill_id)
+        row = (
+            skill_id,
+            question.type.value,
+            question.content,
+            question.options,
+            question.solution,
+            question.explanation,
+            question.points,
+            self.app_id,
+            skill_id,
+            content_hash,
+        )
+
+        with self._lock:
+            # Same hash twice in one statement is an error in Postgres; last one wins
+            self._pending[content_hash] = row
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def publish(self, questions: Iterable[QuestionSchema], skill_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Upsert every question and flush.
+
+        Returns:
+            Cumulative inserted / updated / unchanged counts
+        """
+        for question in questions:
+            self.add(question, skill_id)
+        self.flush()
+        return dict(self.stats)
+
+    def publish_file(self, path: str) -> Dict[str, int]:
+        """
+        Publish a JSON or JSONL output file.
+        Uses the publisher's skill_id, else the one recorded in the file's metadata.
+        """
+        metadata: Dict[str, Any] = {}
+        for question in iter_question_file(path, metadata):
+            skill_id = self.skill_id or metadata.get("skill_id")
+            if not skill_id:
+                raise ValueError(f"No skill_id for {path} (JSONL input needs an explicit skill ID)")
+            self.add(question, skill_id)
+        self.flush()
+        return dict(self.stats)
+
+    def flush(self) -> None:
+        """Write any buffered questions."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+
+        conn = self.connect()
+        extras = require("psycopg2.extras", POSTGRES_DRIVER[1])
+        Json, execute_values = extras.Json, extras.execute_values
+        rows: List[Tuple[Any, ...]] = [
+            row[:2] + tuple(Json(value) for value in row[2:5]) + row[5:]
+            for row in self._pending.values()
+        ]
+        try:
+            with conn.cursor() as cur:
+                results = execute_values(
+                    cur, _UPSERT_SQL, rows,
+                    template=_ROW_TEMPLATE, page_size=len(rows), fetch=True
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        inserted = sum(1 for (was_inserted,) in results if was_inserted)
+        self.stats["inserted"] += inserted
+        self.stats["updated"] += len(results) - inserted
+        self.stats["unchanged"] += len(rows) - len(results)
+        self._pending.clear()
+
+        logger.info(f"Published batch of {len(rows)} questions ({inserted} new)")
+
+    def close(self) -> None:
+        """Close the connection. Unflushed questions are discarded."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "QuestionPublisher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.close()
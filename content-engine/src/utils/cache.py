@@ -0,0 +1,224 @@
+"""
+Content-addressed on-disk caches for expensive pipeline stages.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv("CONTENT_ENGINE_CACHE_DIR", Path.home() / ".cache" / "questerix-content-engine")
+)
+
+
+_digests: Dict[Any, str] = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(file_path: str) -> str:
+    """
+    SHA-256 of a file's content.
+    Memoized per process on (path, size, mtime) so repeat lookups are free.
+    """
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+
+    with _digests_lock:
+        digest = _digests.get(memo_key)
+    if digest is not None:
+        return digest
+
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    digest = hasher.hexdigest()
+
+    with _digests_lock:
+        _digests[memo_key] = digest
+    return digest
+
+
+def make_key(*parts: Any) -> str:
+    """Stable SHA-256 key over JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    JSON-file cache with size- and age-based eviction.
+
+    Entries live at <directory>/<key[:2]>/<key>.json and are written
+    atomically, so several processes can share a cache directory.
+    Reads refresh an entry's mtime, making size eviction least-recently-used.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age_seconds: Optional[float] = 30 * 24 * 3600
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for `key`, or None on a miss or expiry."""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self._expired(stat.st_mtime):
+                self._remove(path, stat.st_size)
+                return None
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = 0
+            self._remove(path, size)
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Store `entry` under `key`, evicting old entries if over budget."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            over_budget = self._size > self.max_bytes
+
+        if over_budget:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least-recently-used ones until under budget."""
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if not self._expired(mtime) and total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._size = total
+
+        if removed:
+            logger.info(f"Evicted {removed} cache entries from {self.directory}")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for path in self.directory.glob("*/*.json"):
+            self._remove(path)
+        with self._lock:
+            self._size = 0
+
+    def _expired(self, mtime: float) -> bool:
+        return self.max_age_seconds is not None and time.time() - mtime > self.max_age_seconds
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def _remove(self, path: Path, size: int = 0) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size = max(0, self._size - size)
+
+
+class GenerationCache(DiskCache):
+    """
+    Cache of AI generation results keyed by the built prompt plus every
+    parameter that affects the provider's output.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, **kwargs):
+        super().__init__(directory or DEFAULT_CACHE_DIR / "generation", **kwargs)
+
+    @staticmethod
+    def key(prompt: str, provider: str, model: str, temperature: float, max_output_tokens: int) -> str:
+        return make_key("generation", prompt, provider, model, temperature, max_output_tokens)
+
+    def store(
+        self,
+        key: str,
+        raw_response: str,
+        questions: List[Dict[str, Any]],
+        token_count: int,
+        model: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0
+    ) -> None:
+        """Cache the raw provider output alongside its validated questions."""
+        self.put(key, {
+            "raw_response": raw_response,
+            "questions": questions,
+            "token_count": token_count,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "model": model,
+            "created_at": time.time(),
+        })
+
+
+class ExtractionCache(DiskCache):
+    """
+    Cache of parsed documents keyed by file content hash and parser version.
+    Entries hold per-section text and format metadata (e.g. PDF page count).
+    """
+
+    def __init__(self, directory: Optional[Path] = None, **kwargs):
+        super().__init__(directory or DEFAULT_CACHE_DIR / "extraction", **kwargs)
+
+    @staticmethod
+    def key(file_path: str, parser_version: str) -> str:
+        return make_key("extraction", file_digest(file_path), parser_version)
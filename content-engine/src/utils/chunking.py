@@ -0,0 +1,338 @@
+"""
+Split long source documents into overlapping, token-budgeted chunks.
+"""
+
+import re
+import logging
+import statistics
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+from ..parsers.document_parser import SECTION_SEPARATOR, DocumentSection
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_RE = re.compile(r"\S.*?(?=\n\s*\n|\Z)", re.S)
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.!?](?=\s)|\Z)", re.S)
+
+# Heading-like lines in unstructured text: "2.3 Cell Division", "Chapter 4: Forces"
+_NUMBERED_HEADING_RE = re.compile(r"(\d+(?:\.\d+)*)\.?\s+\S")
+_NAMED_HEADING_RE = re.compile(r"(?:chapter|unit|part|section|lesson|module|topic)\s+[\w.]+\b", re.I)
+HEADING_MAX_CHARS = 80
+HEADING_MAX_WORDS = 12
+
+
+@dataclass
+class TextChunk:
+    """A contiguous slice of the source text."""
+    index: int
+    text: str
+    start: int
+    end: int
+    token_count: int
+    # Fraction of the document covered once this chunk has been consumed (0.0-1.0]
+    progress: float
+    # Headings enclosing the start of the chunk, outermost first ("Forces > Friction")
+    title: Optional[str] = None
+
+
+@dataclass
+class _Unit:
+    """Smallest piece the chunker packs: a paragraph, sentence or hard split."""
+    section: DocumentSection
+    start: int  # Offsets within section.text
+    end: int
+    tokens: int
+    progress: float
+    level: int = 0                # Heading depth when the unit is a heading, else 0
+    path: Tuple[str, ...] = ()    # Titles of the headings enclosing the unit
+
+
+class TextChunker:
+    """
+    Splits text into chunks of at most `max_tokens` tokens.
+    Chunks break on paragraph boundaries where possible, falling back to
+    sentences and finally to hard character splits for run-on text.
+    Consecutive chunks share up to `overlap_tokens` of trailing context.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 2000,
+        overlap_tokens: int = 200,
+        token_counter: Callable[[str], int] = estimate_tokens
+    ):
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        if overlap_tokens < 0 or overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be between 0 and max_tokens")
+
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.count_tokens = token_counter
+
+    def split(self, text: str) -> List[TextChunk]:
+        """
+        Split text into overlapping chunks.
+
+        Args:
+            text: Full source text
+
+        Returns:
+            Chunks in document order; empty if the text has no content
+        """
+        section = DocumentSection(index=0, text=text, offset=0, total=1)
+        chunks = list(self.iter_chunks([section]))
+        logger.info(f"Split {len(text)} characters into {len(chunks)} chunks")
+        return chunks
+
+    def iter_chunks(self, sections: Iterable[DocumentSection]) -> Iterator[TextChunk]:
+        """
+        Chunk a stream of document sections lazily.
+
+        Each chunk is yielded as soon as the following section shows it is
+        full, so generation can begin while the parser is still extracting.
+        Chunk offsets refer to the joined document (see DocumentParser.parse).
+
+        Args:
+            sections: Sections in document order, e.g. DocumentParser.iter_sections()
+
+        Yields:
+            Chunks in document order; the last one has progress 1.0
+        """
+        buffer: List[_Unit] = []
+        used = 0
+        index = 0
+
+        for unit in self._iter_units(sections):
+            while buffer and used + unit.tokens > self.max_tokens:
+                cut = self._break_point(buffer)
+                yield self._make_chunk(index, buffer[:cut])
+                index += 1
+                # A chunk cut early leaves the rest to start the next one;
+                # otherwise the next chunk repeats trailing context
+                buffer = buffer[cut:] if cut < len(buffer) else self._overlap(buffer, unit.tokens)
+                used = sum(u.tokens for u in buffer)
+
+            buffer.append(unit)
+            used += unit.tokens
+
+        if buffer:
+            chunk = self._make_chunk(index, buffer)
+            chunk.progress = 1.0
+            yield chunk
+
+    def _break_point(self, buffer: List[_Unit]) -> int:
+        """Number of leading units of a full buffer to emit as the next chunk (at least 1)."""
+        return len(buffer)
+
+    def _overlap(self, buffer: List[_Unit], next_tokens: int) -> List[_Unit]:
+        """Trailing units to repeat at the start of the next chunk."""
+        budget = min(self.overlap_tokens, self.max_tokens - next_tokens)
+        kept: List[_Unit] = []
+        total = 0
+        # Never carry the whole previous chunk, or chunking would not advance
+        for unit in reversed(buffer[1:]):
+            if total + unit.tokens > budget:
+                break
+            kept.append(unit)
+            total += unit.tokens
+        kept.reverse()
+        return kept
+
+    def _make_chunk(self, index: int, units: List[_Unit]) -> TextChunk:
+        # Rebuild the text from the original sections, keeping in-section whitespace
+        parts = []
+        first = 0
+        for i in range(1, len(units) + 1):
+            if i == len(units) or units[i].section is not units[first].section:
+                section = units[first].section
+                parts.append(section.text[units[first].start:units[i - 1].end])
+                first = i
+        text = SECTION_SEPARATOR.join(parts)
+
+        return TextChunk(
+            index=index,
+            text=text,
+            start=units[0].section.offset + units[0].start,
+            end=units[-1].section.offset + units[-1].end,
+            token_count=self.count_tokens(text),
+            progress=units[-1].progress,
+            title=" > ".join(units[0].path) or None,
+        )
+
+    def _blocks(self, section: DocumentSection) -> Iterator[Tuple[int, int, int]]:
+        """(start, end, heading level) of the blocks in a section: here, its paragraphs."""
+        for para in _PARAGRAPH_RE.finditer(section.text):
+            yield para.start(), para.end(), 0
+
+    def _iter_units(self, sections: Iterable[DocumentSection]) -> Iterator[_Unit]:
+        """Break sections into units that each fit the budget."""
+        headings: List[Tuple[int, str]] = []
+
+        for section in sections:
+            text = section.text
+            if not text:
+                continue
+
+            def unit(start: int, end: int, tokens: int, level: int = 0) -> _Unit:
+                progress = (section.index + end / len(text)) / section.total
+                path = tuple(title for _, title in headings)
+                return _Unit(section, start, end, tokens, progress, level, path)
+
+            for block_start, block_end, level in self._blocks(section):
+                block = text[block_start:block_end]
+                if level:
+                    while headings and headings[-1][0] >= level:
+                        headings.pop()
+                    headings.append((level, " ".join(block.split())))
+
+                tokens = self.count_tokens(block)
+                if tokens <= self.max_tokens:
+                    yield unit(block_start, block_end, tokens, level)
+                    continue
+
+                for sentence in _SENTENCE_RE.finditer(text, block_start, block_end):
+                    tokens = self.count_tokens(sentence.group())
+                    if tokens <= self.max_tokens:
+                        yield unit(sentence.start(), sentence.end(), tokens)
+                        continue
+
+                    step = self.max_tokens * CHARS_PER_TOKEN
+                    pos = sentence.start()
+                    while pos < sentence.end():
+                        end = min(pos + step, sentence.end())
+                        tokens = self.count_tokens(text[pos:end])
+                        # Dense text (formulas, digits) has fewer chars per token; shrink to fit
+                        while tokens > self.max_tokens and end - pos > 1:
+                            end = pos + max(1, (end - pos) * self.max_tokens // tokens)
+                            tokens = self.count_tokens(text[pos:end])
+                        yield unit(pos, end, tokens)
+                        pos = end
+
+
+class SemanticChunker(TextChunker):
+    """
+    Chunks aligned with the document's own structure.
+
+    Headings come from the parser where the format marks them (DOCX heading
+    styles); for unstructured text such as PDF pages they are inferred from
+    line layout: short, unpunctuated lines that are numbered ("2.1 Forces"),
+    named ("Chapter 3"), all caps or title case. Page lines are regrouped
+    into paragraphs, ending one at a blank line or a short sentence-final line.
+
+    A full chunk is cut before the outermost heading that leaves it at least
+    `min_fill` full, so chunks hold whole sections where the budget allows and
+    never end on a dangling heading. Sections larger than the budget fall back
+    to paragraph and sentence splits with overlap, like TextChunker. Every
+    chunk is titled with the headings enclosing its start.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 2000,
+        overlap_tokens: int = 200,
+        token_counter: Callable[[str], int] = estimate_tokens,
+        min_fill: float = 0.5
+    ):
+        super().__init__(max_tokens, overlap_tokens, token_counter)
+        if not 0.0 <= min_fill <= 1.0:
+            raise ValueError("min_fill must be between 0 and 1")
+        self.min_fill = min_fill
+
+    def _break_point(self, buffer: List[_Unit]) -> int:
+        floor = self.min_fill * self.max_tokens
+        best = None
+        filled = 0
+        for i, unit in enumerate(buffer):
+            # Prefer the outermost heading, and the latest of equals to fill the chunk
+            if i and unit.level and filled >= floor and (best is None or unit.level <= buffer[best].level):
+                best = i
+            filled += unit.tokens
+
+        if best is not None:
+            return best
+        if len(buffer) > 1 and buffer[-1].level:
+            return len(buffer) - 1
+        return len(buffer)
+
+    def _blocks(self, section: DocumentSection) -> Iterator[Tuple[int, int, int]]:
+        if section.heading_level is not None:
+            for i, (start, end, _) in enumerate(super()._blocks(section)):
+                yield start, end, section.heading_level if i == 0 else 0
+            return
+        yield from _layout_blocks(section.text)
+
+
+def _layout_blocks(text: str) -> Iterator[Tuple[int, int, int]]:
+    """Paragraph and heading blocks of unstructured text, from its line layout."""
+    lines = []
+    pos = 0
+    for raw in text.split("\n"):
+        lines.append((pos, pos + len(raw)))
+        pos += len(raw) + 1
+    widths = [len(text[s:e].strip()) for s, e in lines if len(text[s:e].strip()) > 20]
+    typical = statistics.median(widths) if widths else 0
+
+    para_start = None
+    para_end = 0
+    sentence_ended = True
+    for start, end in lines:
+        line = text[start:end].strip()
+        if not line:
+            if para_start is not None:
+                yield para_start, para_end, 0
+                para_start = None
+            sentence_ended = True
+            continue
+
+        # Only a line that cannot continue a sentence can be a heading
+        level = _heading_level(line) if para_start is None or sentence_ended else 0
+        sentence_ended = line[-1] in ".!?:"
+        # Title case alone is weak evidence; also require a line well short of the page width
+        if level == 2 and typical and len(line) >= 0.7 * typical:
+            level = 0
+        if level:
+            if para_start is not None:
+                yield para_start, para_end, 0
+                para_start = None
+            lead = len(text[start:end]) - len(text[start:end].lstrip())
+            yield start + lead, start + lead + len(line), level
+            continue
+
+        if para_start is None:
+            para_start = start + len(text[start:end]) - len(text[start:end].lstrip())
+        para_end = start + len(text[start:end].rstrip())
+
+        # A sentence-final line well short of the page width ends its paragraph
+        if typical and sentence_ended and len(line) < 0.7 * typical:
+            yield para_start, para_end, 0
+            para_start = None
+
+    if para_start is not None:
+        yield para_start, para_end, 0
+
+
+def _heading_level(line: str) -> int:
+    """Heading depth of a standalone line of unstructured text, or 0 for body text."""
+    if len(line) > HEADING_MAX_CHARS or line[-1] in ".,;!?" or not line[0].isalnum():
+        return 0
+    words = line.split()
+    if len(words) > HEADING_MAX_WORDS:
+        return 0
+
+    numbered = _NUMBERED_HEADING_RE.match(line)
+    if numbered and line[numbered.end() - 1].isupper():
+        return numbered.group(1).count(".") + 1
+    if _NAMED_HEADING_RE.match(line):
+        return 1
+
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 3 and all(c.isupper() for c in letters):
+        return 1
+
+    significant = [w for w in words if len(w) > 3 and w[0].isalpha()]
+    if line[0].isupper() and significant and sum(w[0].isupper() for w in significant) / len(significant) >= 0.6:
+        return 2
+    return 0
@@ -0,0 +1,282 @@
+"""
+Persistent near-duplicate index for generated questions (MinHash + LSH).
+"""
+
+import re
+import time
+import random
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from .cache import DEFAULT_CACHE_DIR, make_key
+from ..validators.question_schema import QuestionSchema
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = DEFAULT_CACHE_DIR / "dedup.sqlite3"
+DEDUP_MODES = ("drop", "flag")
+
+SHINGLE_CHARS = 5
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    skill_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    preview TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (skill_id, key)
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    skill_id TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    question_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_buckets ON buckets (skill_id, bucket);
+"""
+
+
+@dataclass
+class DuplicateMatch:
+    """An indexed question that a new one nearly duplicates."""
+    key: str
+    similarity: float  # Estimated Jaccard similarity of the two shingle sets
+    preview: str
+
+
+def question_text(question: QuestionSchema) -> str:
+    """Normalized text a question is compared on: content plus option text."""
+    parts = [question.content]
+    _collect_strings(question.options, parts)
+    return _NON_WORD_RE.sub(" ", " ".join(parts).lower()).strip()
+
+
+def question_key(question: QuestionSchema) -> str:
+    """Index key of a question: identical normalized text gives the same key."""
+    return make_key("dedup", question_text(question))
+
+
+def _collect_strings(value: Any, out: List[str]) -> None:
+    if isinstance(value, str):
+        out.append(value)
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            if k != "id":  # Option ids ("a", "b") say nothing about content
+                _collect_strings(v, out)
+    elif isinstance(value, list):
+        for v in value:
+            _collect_strings(v, out)
+
+
+def _shingles(text: str) -> Set[int]:
+    """64-bit hashes of overlapping character n-grams."""
+    if len(text) <= SHINGLE_CHARS:
+        grams = {text}
+    else:
+        grams = {text[i:i + SHINGLE_CHARS] for i in range(len(text) - SHINGLE_CHARS + 1)}
+    return {
+        int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+        for g in grams
+    }
+
+
+class DedupIndex:
+    """
+    MinHash signatures of every question seen per skill, with LSH buckets.
+
+    A question's signature is split into `bands`; two questions share a
+    bucket when any band matches, so candidates come from an indexed lookup
+    rather than a scan over past questions. Candidates are then confirmed by
+    estimated Jaccard similarity against `threshold`.
+
+    The index lives in SQLite, so it persists across runs and can be shared
+    by several processes. Checks are thread-safe, and a question added in
+    the current batch is matched by the next one immediately.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.path = Path(path or DEFAULT_INDEX_PATH)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Shingle hashes are already uniform, so XOR with a fixed random mask
+        # stands in for a permutation at a fraction of the cost of (a*x + b) mod p
+        rng = random.Random(0x5EED)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._check_params()
+        self._lock = threading.Lock()
+
+    def _check_params(self) -> None:
+        """Signatures are only comparable under the same permutations and banding."""
+        params = {"num_perm": str(self.num_perm), "bands": str(self.bands)}
+        stored = dict(self._conn.execute("SELECT name, value FROM meta"))
+        if not stored:
+            self._conn.executemany("INSERT INTO meta (name, value) VALUES (?, ?)", params.items())
+            self._conn.commit()
+        elif stored != params:
+            raise ValueError(f"Dedup index {self.path} was built with {stored}, not {params}")
+
+    def signature(self, question: QuestionSchema) -> Tuple[int, ...]:
+        """MinHash signature over the question's character shingles."""
+        hashes = _shingles(question_text(question))
+        return tuple(min(map(mask.__xor__, hashes)) for mask in self._masks)
+
+    def _buckets(self, signature: Tuple[int, ...]) -> List[int]:
+        buckets = []
+        for band in range(self.bands):
+            values = array("Q", signature[band * self.rows:(band + 1) * self.rows])
+            digest = hashlib.blake2b(band.to_bytes(2, "little") + values.tobytes(), digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "little", signed=True))
+        return buckets
+
+    def _find(
+        self,
+        skill_id: str,
+        signature: Tuple[int, ...],
+        buckets: List[int],
+        own_key: Optional[str] = None
+    ) -> Optional[DuplicateMatch]:
+        placeholders = ",".join("?" * len(buckets))
+        rows = self._conn.execute(
+            f"SELECT key, signature, preview FROM questions WHERE id IN ("
+            f"SELECT question_id FROM buckets WHERE skill_id = ? AND bucket IN ({placeholders}))",
+            [skill_id, *buckets]
+        )
+
+        best: Optional[DuplicateMatch] = None
+        for key, blob, preview in rows:
+            if key == own_key:
+                # The question itself is indexed; nothing can match more closely
+                return DuplicateMatch(key=key, similarity=1.0, preview=preview)
+            other = array("Q", blob)
+            similarity = sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = DuplicateMatch(key=key, similarity=similarity, preview=preview)
+        return best
+
+    def find(self, question: QuestionSchema, skill_id: str) -> Optional[DuplicateMatch]:
+        """Closest indexed near-duplicate of `question` for this skill, if any."""
+        signature = self.signature(question)
+        with self._lock:
+            return self._find(skill_id, signature, self._buckets(signature))
+
+    def check_and_add(self, question: QuestionSchema, skill_id: str) -> Optional[DuplicateMatch]:
+        """
+        Return the near-duplicate `question` matches, or index it if there is none.
+        The change is not durable until commit().
+        """
+        signature = self.signature(question)
+        buckets = self._buckets(signature)
+        key = question_key(question)
+
+        with self._lock:
+            match = self._find(skill_id, signature, buckets, key)
+            if match is not None:
+                return match
+
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO questions (skill_id, key, signature, preview, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (skill_id, key, array("Q", signature).tobytes(), question.content[:200], time.time())
+            )
+            if cur.rowcount:
+                self._conn.executemany(
+                    "INSERT INTO buckets (skill_id, bucket, question_id) VALUES (?, ?, ?)",
+                    [(skill_id, bucket, cur.lastrowid) for bucket in buckets]
+                )
+            return None
+
+    def screen(
+        self,
+        questions: Iterable[QuestionSchema],
+        skill_id: str,
+        mode: str = "drop",
+        already_screened: bool = False
+    ) -> Tuple[List[QuestionSchema], int]:
+        """
+        Check a batch against the index and against itself.
+
+        Args:
+            questions: Newly generated questions
+            skill_id: Skill whose history they are compared with
+            mode: "drop" removes near-duplicates; "flag" keeps them with
+                `duplicate_of` set to the matching question's index key
+            already_screened: The batch went through the index before (e.g. a
+                cached reply), so a question matching its own indexed copy is
+                kept; repeats within the batch still count as duplicates
+
+        Returns:
+            (questions to keep, number of near-duplicates found)
+        """
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {mode}")
+
+        kept: List[QuestionSchema] = []
+        duplicates = 0
+        replayed: Set[str] = set()
+        for question in questions:
+            match = self.check_and_add(question, skill_id)
+            if match is not None and already_screened:
+                key = question_key(question)
+                if match.key == key and key not in replayed:
+                    replayed.add(key)
+                    match = None
+            if match is None:
+                kept.append(question)
+                continue
+
+            duplicates += 1
+            logger.info(f"Near-duplicate ({match.similarity:.2f}) of earlier question: {match.preview[:60]!r}")
+            if mode == "flag":
+                kept.append(question.model_copy(update={"duplicate_of": match.key}))
+
+        self.commit()
+        return kept, duplicates
+
+    def count(self, skill_id: Optional[str] = None) -> int:
+        """Number of indexed questions, optionally for one skill."""
+        with self._lock:
+            if skill_id is None:
+                return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM questions WHERE skill_id = ?", (skill_id,)
+            ).fetchone()[0]
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,120 @@
+"""
+Incremental parser for a JSON array arriving in pieces (e.g. a streamed LLM reply).
+"""
+
+import re
+import json
+import logging
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Characters that can change nesting state outside / inside a string
+_STRUCTURAL_RE = re.compile(r'[{}\[\]"]')
+_STRING_RE = re.compile(r'["\\]')
+
+
+class JsonArrayStream:
+    """
+    Pulls complete elements out of a top-level JSON array as text is fed in.
+
+    Text before the opening bracket (such as a Markdown code fence) is
+    ignored. Each object or array element is decoded as soon as its closing
+    bracket arrives, so a reply cut off mid-element still yields every
+    element that was complete. Consumed text is discarded, keeping memory
+    proportional to the largest single element.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0                       # Next character to scan
+        self._start: Optional[int] = None   # Start of the element being scanned
+        self._depth = 0
+        self._in_string = False
+        self.started = False                # Opening '[' seen
+        self.finished = False               # Closing ']' seen
+        self.malformed = 0                  # Elements that failed to decode
+
+    def feed(self, text: str) -> List[Any]:
+        """Add text and return the elements completed by it, in order."""
+        if self.finished:
+            return []
+
+        buf = self._buffer + text
+        i = self._pos
+        items: List[Any] = []
+
+        while i < len(buf):
+            if not self.started:
+                i = buf.find("[", i)
+                if i < 0:
+                    i = len(buf)
+                    break
+                self.started = True
+                i += 1
+                continue
+
+            if self._start is None:
+                # Between elements: skip separators until the next element or ']'
+                c = buf[i]
+                if c in "{[":
+                    self._start = i
+                    self._depth = 1
+                elif c == "]":
+                    self.finished = True
+                    i += 1
+                    break
+                i += 1
+                continue
+
+            if self._in_string:
+                match = _STRING_RE.search(buf, i)
+                if match is None:
+                    i = len(buf)
+                    break
+                if match.group() == "\\":
+                    if match.end() >= len(buf):
+                        # Escape split across feeds; rescan once more text arrives
+                        i = match.start()
+                        break
+                    i = match.end() + 1
+                else:
+                    self._in_string = False
+                    i = match.end()
+                continue
+
+            match = _STRUCTURAL_RE.search(buf, i)
+            if match is None:
+                i = len(buf)
+                break
+            c = match.group()
+            i = match.end()
+
+            if c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    element = buf[self._start:i]
+                    self._start = None
+                    try:
+                        items.append(json.loads(element))
+                    except json.JSONDecodeError as e:
+                        self.malformed += 1
+                        logger.warning(f"Skipping malformed array element: {e}")
+
+        # Drop everything already consumed
+        cut = self._start if self._start is not None else i
+        self._buffer = buf[cut:]
+        self._pos = i - cut
+        if self._start is not None:
+            self._start = 0
+
+        return items
+
+    @property
+    def truncated(self) -> bool:
+        """True if the array was opened but never closed."""
+        return self.started and not self.finished
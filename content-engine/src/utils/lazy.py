@@ -0,0 +1,45 @@
+"""
+On-demand imports for optional heavy dependencies.
+
+Provider SDKs and document backends take from tens of milliseconds to over a
+second to import, so modules load them the first time a code path needs them
+rather than at import time. A CLI call only pays for the backends it uses.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict, Optional
+
+_modules: Dict[str, Optional[ModuleType]] = {}
+_lock = threading.Lock()
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """
+    Import module `name` on first call.
+
+    Returns:
+        The module, or None when it is not installed. Both outcomes are
+        remembered, so a missing package is only looked for once.
+    """
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+
+    with _lock:
+        if name not in _modules:
+            try:
+                _modules[name] = importlib.import_module(name)
+            except ImportError:
+                _modules[name] = None
+        return _modules[name]
+
+
+def require(name: str, install_hint: str) -> ModuleType:
+    """Import module `name` on first call, raising ImportError(install_hint) if it is missing."""
+    module = optional_import(name)
+    if module is None:
+        raise ImportError(install_hint)
+    return module
@@ -0,0 +1,165 @@
+"""
+Per-stage timing and counters for pipeline runs.
+
+Instrumented code calls `timed(stage)` and `count(name)` unconditionally;
+they record into every PipelineMetrics activated with `collect()` in the
+current context and cost almost nothing when none is active. Collectors nest,
+so a batch can keep run-wide totals and per-job metrics at the same time.
+Contexts follow asyncio tasks automatically; submit thread pool work with
+`contextvars.copy_context().run` to carry them across threads.
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Durations kept per stage for quantiles; totals and counts are exact regardless
+SAMPLE_WINDOW = 10_000
+QUANTILES = (0.5, 0.95, 0.99)
+
+_active: ContextVar[Tuple["PipelineMetrics", ...]] = ContextVar("pipeline_metrics", default=())
+
+
+class _Stage:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class PipelineMetrics:
+    """Thread-safe stage durations (seconds) and event counters."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._stages: Dict[str, _Stage] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = _Stage()
+            entry.count += 1
+            entry.total += seconds
+            entry.max = max(entry.max, seconds)
+            entry.samples.append(seconds)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly snapshot: per-stage count and milliseconds, plus counters."""
+        with self._lock:
+            stages = {
+                name: {
+                    "count": s.count,
+                    "total_ms": round(s.total * 1000, 2),
+                    "mean_ms": round(s.total / s.count * 1000, 3),
+                    **{f"p{int(q * 100)}_ms": round(s.quantile(q) * 1000, 3) for q in QUANTILES},
+                    "max_ms": round(s.max * 1000, 3),
+                }
+                for name, s in sorted(self._stages.items())
+            }
+            counters = dict(sorted(self._counters.items()))
+        return {"wall_ms": round((time.time() - self.started) * 1000, 2), "stages": stages, "counters": counters}
+
+    def to_prometheus(self, prefix: str = "content_engine") -> str:
+        """Prometheus text exposition (for node_exporter's textfile collector)."""
+        lines: List[str] = [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        with self._lock:
+            for name, s in sorted(self._stages.items()):
+                for q in QUANTILES:
+                    lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} {s.quantile(q):.6f}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {s.total:.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {s.count}')
+
+            lines += [
+                f"# HELP {prefix}_events_total Pipeline events (retries, cache hits, ...)",
+                f"# TYPE {prefix}_events_total counter",
+            ]
+            for name, value in sorted(self._counters.items()):
+                lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write Prometheus text for a .prom path, otherwise a JSON summary."""
+        target = Path(path)
+        if target.suffix == ".prom":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.summary(), indent=2)
+        # Replace atomically so a scraper never sees a partial file
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(content, encoding="utf-8")
+        tmp.replace(target)
+
+
+@contextmanager
+def collect(metrics: PipelineMetrics) -> Iterator[PipelineMetrics]:
+    """Record stages and counters from this context into `metrics`."""
+    token = _active.set(_active.get() + (metrics,))
+    try:
+        yield metrics
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the enclosed block as one occurrence of `stage`."""
+    active = _active.get()
+    if not active:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for metrics in active:
+            metrics.observe(stage, elapsed)
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record a duration measured by the caller in every active collector."""
+    for metrics in _active.get():
+        metrics.observe(stage, seconds)
+
+
+def timed_iter(stage: str, items: Iterable[T]) -> Iterator[T]:
+    """Yield from `items`, timing how long each item takes to produce."""
+    iterator = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        observe(stage, time.perf_counter() - start)
+        yield item
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add to a counter in every active collector."""
+    for metrics in _active.get():
+        metrics.increment(name, amount)
@@ -0,0 +1,34 @@
+"""
+Incremental writers for generated questions.
+"""
+
+import json
+from typing import Any, Dict, TextIO
+
+from ..validators.question_schema import QuestionSchema
+from .metrics import timed
+
+# Key of the trailing metadata record in JSONL output
+METADATA_KEY = "_metadata"
+
+
+class JsonlQuestionWriter:
+    """
+    Writes one question per line as soon as it is produced, then a final
+    {"_metadata": {...}} record. Each line is flushed immediately so loaders
+    can tail the file while generation is still running.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.count = 0
+
+    def write_question(self, question: QuestionSchema) -> None:
+        with timed("output_write"):
+            self.stream.write(json.dumps(question.model_dump(mode="json"), ensure_ascii=False) + "\n")
+            self.stream.flush()
+        self.count += 1
+
+    def write_metadata(self, metadata: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps({METADATA_KEY: metadata}, ensure_ascii=False) + "\n")
+        self.stream.flush()
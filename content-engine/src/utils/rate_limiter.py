@@ -0,0 +1,318 @@
+"""
+Process-wide rate limiting and retry with backoff for AI provider calls.
+
+Every QuestionGenerator talking to the same provider/model shares one
+RateLimiter, so parallel generators stay under the account quota together
+instead of each bursting into 429s.
+"""
+
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .metrics import count, timed
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Default (requests/min, tokens/min) budgets per provider
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "gemini": (1000, 1_000_000),
+    "openai": (500, 200_000),
+    "mock": (1_000_000, 1_000_000_000),  # Offline provider: effectively unthrottled
+}
+
+# Fraction of the configured quota actually used, to leave room for clock skew
+HEADROOM = 0.95
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "ResourceExhausted",
+    "TooManyRequests",
+}
+
+_RETRY_HINT_RE = re.compile(r"retry(?:[ _]delay|[ -]after| in)\D{0,20}?(\d+(?:\.\d+)?)", re.I)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_minute`.
+    Reservations may push the bucket into debt; the caller is told how long
+    to wait until its reservation is covered.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Never demand more than a full bucket, or large requests would wait forever
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def set_rate(self, rate_per_minute: float) -> None:
+        """Change the refill rate, keeping the current fill level."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate_per_minute / 60.0
+
+
+class RateLimiter:
+    """
+    Requests/min and tokens/min budget for one provider/model.
+
+    After a 429 the limiter pauses every caller until the provider's
+    Retry-After has passed and temporarily lowers its request rate,
+    recovering gradually as calls succeed.
+    """
+
+    MIN_RATE_FACTOR = 0.25
+    BACKOFF_FACTOR = 0.8
+    RECOVERY_FACTOR = 1.05
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = TokenBucket(requests_per_minute * HEADROOM)
+        self._tokens = TokenBucket(tokens_per_minute * HEADROOM)
+        self._rate_factor = 1.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            blocked = max(0.0, self._blocked_until - time.monotonic())
+        return max(blocked, self._requests.reserve(1), self._tokens.reserve(tokens))
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of `tokens` tokens fits within the budget."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limiter sleeping {delay:.2f}s")
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Async counterpart of acquire()."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            logger.debug(f"Rate limiter sleeping {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def penalize(self, retry_after: float) -> None:
+        """Record a provider throttle: pause all callers and slow down."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._rate_factor = max(self.MIN_RATE_FACTOR, self._rate_factor * self.BACKOFF_FACTOR)
+            factor = self._rate_factor
+        self._requests.set_rate(self.requests_per_minute * HEADROOM * factor)
+        logger.warning(f"Provider throttled; pausing {retry_after:.1f}s at {factor:.0%} of request quota")
+
+    def record_success(self) -> None:
+        """Let the request rate creep back towards the configured quota."""
+        with self._lock:
+            if self._rate_factor >= 1.0:
+                return
+            self._rate_factor = min(1.0, self._rate_factor * self.RECOVERY_FACTOR)
+            factor = self._rate_factor
+        self._requests.set_rate(self.requests_per_minute * HEADROOM * factor)
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limits: Dict[Tuple[str, str], Tuple[float, float]] = {}
+_registry_lock = threading.Lock()
+
+
+def configure_rate_limit(
+    provider: str,
+    model: str,
+    requests_per_minute: float,
+    tokens_per_minute: float
+) -> RateLimiter:
+    """Set the quota for a provider/model, replacing any existing limiter."""
+    with _registry_lock:
+        _limits[(provider, model)] = (requests_per_minute, tokens_per_minute)
+        limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        _limiters[(provider, model)] = limiter
+        return limiter
+
+
+def get_rate_limiter(provider: str, model: str) -> RateLimiter:
+    """Return the process-wide limiter shared by all callers of provider/model."""
+    with _registry_lock:
+        limiter = _limiters.get((provider, model))
+        if limiter is None:
+            rpm, tpm = _limits.get((provider, model), DEFAULT_LIMITS.get(provider, (60, 100_000)))
+            limiter = RateLimiter(rpm, tpm)
+            _limiters[(provider, model)] = limiter
+        return limiter
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a provider error is transient and worth retrying."""
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether a provider error is a quota/throttling response."""
+    return _status_code(error) == 429 or type(error).__name__ in {"ResourceExhausted", "RateLimitError", "TooManyRequests"}
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Extract the provider's requested wait (seconds) from an error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms:
+        try:
+            return float(retry_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    match = _RETRY_HINT_RE.search(str(error))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                value = None
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_delay(
+    error: Exception,
+    attempt: int,
+    limiter: Optional[RateLimiter] = None,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0
+) -> float:
+    """
+    Seconds to wait before retrying after `error`.
+    Honors Retry-After; a throttle also pauses everyone sharing `limiter`.
+    Every call counts as one retry in the active pipeline metrics.
+    """
+    count("retries")
+    retry_after = get_retry_after(error)
+    if retry_after is not None:
+        delay = min(max_delay, retry_after) + random.uniform(0, base_delay)
+    else:
+        delay = backoff_delay(attempt, base_delay, max_delay)
+
+    if is_rate_limited(error):
+        count("throttled")
+        if limiter is not None:
+            limiter.penalize(delay)
+    return delay
+
+
+def retry_call(
+    func: Callable[[], T],
+    limiter: Optional[RateLimiter] = None,
+    tokens: int = 0,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0
+) -> T:
+    """
+    Call `func` under the rate limiter, retrying transient failures.
+
+    Waits for the provider's Retry-After when given, otherwise uses jittered
+    exponential backoff. Non-retryable errors are raised immediately.
+    """
+    attempt = 0
+    while True:
+        if limiter is not None:
+            with timed("rate_limit_wait"):
+                limiter.acquire(tokens)
+        try:
+            result = func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = retry_delay(e, attempt, limiter, base_delay, max_delay)
+            attempt += 1
+            logger.warning(f"Transient provider error ({e}); retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if limiter is not None:
+            limiter.record_success()
+        return result
+
+
+async def aretry_call(
+    func: Callable[[], Awaitable[T]],
+    limiter: Optional[RateLimiter] = None,
+    tokens: int = 0,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0
+) -> T:
+    """Async counterpart of retry_call()."""
+    attempt = 0
+    while True:
+        if limiter is not None:
+            with timed("rate_limit_wait"):
+                await limiter.aacquire(tokens)
+        try:
+            result = await func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = retry_delay(e, attempt, limiter, base_delay, max_delay)
+            attempt += 1
+            logger.warning(f"Transient provider error ({e}); retry {attempt}/{max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if limiter is not None:
+            limiter.record_success()
+        return result
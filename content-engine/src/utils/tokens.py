@@ -0,0 +1,215 @@
+"""
+Token counting helpers used for prompt budgeting and cost accounting.
+"""
+
+import re
+import math
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, TypeVar
+
+from .lazy import optional_import
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token for English prose on current LLM tokenizers.
+CHARS_PER_TOKEN = 4
+
+# Context window (prompt + output) per model, matched by longest name prefix
+MODEL_CONTEXT_TOKENS: Dict[str, int] = {
+    "gemini-1.5-flash": 1_048_576,
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-2.0-flash": 1_048_576,
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+}
+DEFAULT_CONTEXT_TOKENS = 32_000
+
+# USD per million (input, output) tokens, matched by longest name prefix
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+_WORD_RE = re.compile(r"[A-Za-z]+")
+_DIGITS_RE = re.compile(r"\d+")
+_SYMBOL_RE = re.compile(r"[^A-Za-z\d\s]")
+_NEWLINES_RE = re.compile(r"\s*\n\s*")
+
+T = TypeVar("T")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap character-based token estimate."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class TokenUsage:
+    """Tokens billed for one provider call."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    reported: bool = False  # True when the counts came from the provider, not a local count
+    model: Optional[str] = None  # Model that served the call, when it differs from the generator's
+    truncated: bool = False  # True when the reply was cut off by the output token limit
+
+    @property
+    def total(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+class TokenCounter:
+    """
+    Counts tokens the way one provider's tokenizer would.
+    Instances are callable, so they can be passed to TextChunker as `token_counter`.
+    """
+
+    name = "chars"
+    exact = False  # True when counts match the provider's tokenizer exactly
+
+    def count(self, text: str) -> int:
+        return estimate_tokens(text)
+
+    def __call__(self, text: str) -> int:
+        return self.count(text)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of `text` within `max_tokens`."""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+
+        # Token counts grow monotonically with prefix length
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.count(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
+
+    def observe(self, estimated: int, reported: int) -> None:
+        """Feed back a provider-reported count for text this counter estimated."""
+
+
+class HeuristicTokenCounter(TokenCounter):
+    """
+    Offline estimate that follows how BPE/SentencePiece tokenizers split text.
+
+    Words cost one token per `word_chars` letters, digit runs one token per
+    `digits_per_token` digits, and every symbol or non-ASCII character (math
+    operators, brackets, Greek letters) costs a token of its own. This tracks
+    math-heavy content far better than counting words or characters.
+
+    Provider-reported usage fed through observe() continuously rescales the
+    estimate, so it converges on the real tokenizer over a run.
+    """
+
+    name = "heuristic"
+
+    def __init__(self, word_chars: int = 6, digits_per_token: int = 3, scale: float = 1.0):
+        self.word_chars = word_chars
+        self.digits_per_token = digits_per_token
+        self.scale = scale
+        self._estimated = 0
+        self._reported = 0
+        self._lock = threading.Lock()
+
+    def _raw_count(self, text: str) -> int:
+        words = sum(1 + (len(w) - 1) // self.word_chars for w in _WORD_RE.findall(text))
+        digits = sum(-(-len(d) // self.digits_per_token) for d in _DIGITS_RE.findall(text))
+        symbols = len(_SYMBOL_RE.findall(text))
+        newlines = len(_NEWLINES_RE.findall(text))
+        return words + digits + symbols + newlines
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return math.ceil(self._raw_count(text) * self.scale)
+
+    def observe(self, estimated: int, reported: int) -> None:
+        if estimated <= 0 or reported <= 0:
+            return
+        with self._lock:
+            # Undo the current scale so the ratio compares raw estimates
+            self._estimated += estimated / self.scale
+            self._reported += reported
+            # Bounded, so one odd reply cannot wreck budgeting
+            self.scale = min(2.0, max(0.5, self._reported / self._estimated))
+
+
+class TiktokenCounter(TokenCounter):
+    """Exact counts for OpenAI models using tiktoken (optional dependency)."""
+
+    name = "tiktoken"
+    exact = True
+
+    def __init__(self, model: str):
+        tiktoken = optional_import("tiktoken")
+        if tiktoken is None:
+            raise ImportError("tiktoken required. Install: pip install tiktoken")
+        try:
+            self.encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            self.encoding = tiktoken.get_encoding("o200k_base")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max(max_tokens, 0)])
+
+
+# Heuristic settings per provider. OpenAI's BPE vocabularies group up to three
+# digits per token; Gemini's SentencePiece vocabulary splits every digit.
+PROVIDER_PROFILES: Dict[str, Dict[str, int]] = {
+    "openai": {"word_chars": 6, "digits_per_token": 3},
+    "gemini": {"word_chars": 6, "digits_per_token": 1},
+}
+
+
+def get_token_counter(provider: str, model: str) -> TokenCounter:
+    """
+    Best available offline counter for a provider/model.
+
+    OpenAI models use tiktoken when it is installed; everything else gets a
+    heuristic counter with the provider's profile.
+    """
+    if provider == "openai" and optional_import("tiktoken") is not None:
+        try:
+            return TiktokenCounter(model)
+        except Exception as e:
+            logger.warning(f"tiktoken unavailable for {model} ({e}); using heuristic token counts")
+    return HeuristicTokenCounter(**PROVIDER_PROFILES.get(provider, {}))
+
+
+def _lookup(table: Dict[str, T], model: str) -> Optional[T]:
+    matches = [prefix for prefix in table if model.startswith(prefix)]
+    return table[max(matches, key=len)] if matches else None
+
+
+def context_window(model: str) -> int:
+    """Total tokens (prompt + output) a model accepts."""
+    return _lookup(MODEL_CONTEXT_TOKENS, model) or DEFAULT_CONTEXT_TOKENS
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """USD cost of a call at list prices, or None for models without a known price."""
+    pricing = _lookup(MODEL_PRICING, model)
+    if pricing is None:
+        return None
+    input_price, output_price = pricing
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
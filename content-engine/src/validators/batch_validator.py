@@ -0,0 +1,161 @@
+"""
+Batch validation of question dicts against QuestionSchema.
+
+Whole lists are validated in a single pydantic-core call instead of one
+try/except round-trip per question, and failures come back as structured
+per-item errors rather than log lines.
+"""
+
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Dict, Iterable, Iterator, List, Literal, Sequence, Tuple, Union
+
+from pydantic import Discriminator, Tag, TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
+from typing_extensions import NotRequired, TypedDict
+
+from .question_schema import TYPE_RULES, QuestionSchema, QuestionType, check_answer
+
+TYPE_TAGS = frozenset(t.value for t in QuestionType)
+
+
+@dataclass
+class QuestionError:
+    """Why one input item failed validation."""
+    index: int
+    errors: List[Dict[str, Any]]  # pydantic error dicts; loc is relative to the item
+
+    @property
+    def message(self) -> str:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or '<item>'}: {e['msg']}" for e in self.errors
+        )
+
+
+@dataclass
+class ValidationResult:
+    """Valid questions in input order plus per-item errors for the rest."""
+    valid: List[QuestionSchema] = field(default_factory=list)
+    valid_indices: List[int] = field(default_factory=list)
+    errors: List[QuestionError] = field(default_factory=list)
+
+
+def _question_tag(value: Any) -> Any:
+    """Discriminator: the item's type, defaulting to multiple_choice like QuestionSchema."""
+    if not isinstance(value, dict):
+        return None
+    question_type = value.get("type", QuestionType.MULTIPLE_CHOICE)
+    return question_type.value if isinstance(question_type, QuestionType) else question_type
+
+
+def _field_type(info: FieldInfo) -> Any:
+    """A QuestionSchema field as a TypedDict annotation, keeping its constraints."""
+    annotation = Annotated[(info.annotation, *info.metadata)] if info.metadata else info.annotation
+    return annotation if info.is_required() else NotRequired[annotation]
+
+
+def _shape(question_type: QuestionType) -> type:
+    """QuestionSchema's fields with the options and solution shape of one question type."""
+    options, solution = TYPE_RULES[question_type]
+    fields = {name: _field_type(info) for name, info in QuestionSchema.model_fields.items()}
+    fields["type"] = NotRequired[Literal[question_type]]
+    fields["solution"] = solution
+    if options is not None:
+        fields["options"] = options
+    return TypedDict(f"{question_type.name.title().replace('_', '')}Question", fields)
+
+
+# Discriminated union of per-type shapes: checks a question entirely in
+# pydantic-core and builds plain dicts, with no model instances or Python validators
+TypedQuestion = Annotated[
+    Union[tuple(Annotated[_shape(t), Tag(t.value)] for t in QuestionType)],
+    Discriminator(_question_tag)
+]
+
+_MODELS = TypeAdapter(List[QuestionSchema]).validator
+_SHAPES = TypeAdapter(List[TypedQuestion]).validator
+
+
+def _group_errors(error: ValidationError) -> Dict[int, List[Dict[str, Any]]]:
+    """Split a list-level ValidationError into item-relative errors by index."""
+    by_index: Dict[int, List[Dict[str, Any]]] = {}
+    for e in error.errors(include_url=False):
+        index, *loc = e["loc"]
+        # Union errors repeat the type tag as the first location part
+        if loc and loc[0] in TYPE_TAGS:
+            loc = loc[1:]
+        by_index.setdefault(index, []).append({**e, "loc": tuple(loc)})
+    return by_index
+
+
+def _validate_list(validator, items: List[Any]) -> Tuple[List[Any], List[int], Dict[int, List[Dict[str, Any]]]]:
+    """
+    Validate all items in one call. On failure only the remaining good items
+    are validated again, so a few bad items cost at most one extra pass.
+    """
+    try:
+        return validator.validate_python(items), list(range(len(items))), {}
+    except ValidationError as e:
+        failed = _group_errors(e)
+
+    indices = [i for i in range(len(items)) if i not in failed]
+    return validator.validate_python([items[i] for i in indices]), indices, failed
+
+
+def validate_questions(items: Sequence[Any]) -> ValidationResult:
+    """
+    Validate a list of question dicts and build QuestionSchema models.
+
+    Args:
+        items: Question dicts (e.g. decoded model output)
+
+    Returns:
+        ValidationResult with valid questions, their input indices and
+        structured errors for the rest
+    """
+    validated, indices, failed = _validate_list(_MODELS, list(items))
+    return ValidationResult(
+        valid=validated,
+        valid_indices=indices,
+        errors=[QuestionError(index, errors) for index, errors in sorted(failed.items())]
+    )
+
+
+def check_questions(items: Sequence[Any]) -> List[QuestionError]:
+    """
+    Check question dicts without building models.
+
+    Applies the same rules as QuestionSchema through the discriminated union,
+    skipping model construction. Intended for re-validating stored questions,
+    e.g. before a schema migration.
+
+    Returns:
+        Errors for invalid items; empty if every item is valid
+    """
+    items = list(items)
+    validated, indices, failed = _validate_list(_SHAPES, items)
+
+    for index, values in zip(indices, validated):
+        question_type = values.get("type", QuestionType.MULTIPLE_CHOICE)
+        try:
+            check_answer(question_type, values.get("options", {}), values["solution"])
+        except ValueError as e:
+            failed[index] = [{"type": "value_error", "loc": (), "msg": f"Value error, {e}", "input": items[index]}]
+
+    return [QuestionError(index, errors) for index, errors in sorted(failed.items())]
+
+
+def iter_check_questions(items: Iterable[Any], batch_size: int = 10_000) -> Iterator[QuestionError]:
+    """check_questions over a stream of any length in bounded batches; indices are global."""
+    batch: List[Any] = []
+    offset = 0
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            for error in check_questions(batch):
+                error.index += offset
+                yield error
+            offset += len(batch)
+            batch = []
+    for error in check_questions(batch):
+        error.index += offset
+        yield error
@@ -3,8 +3,9 @@ Pydantic schemas for validating AI-generated questions.
 Ensures strict compliance with Questerix database schema.
 """
 
-from pydantic import BaseModel, Field, field_validator
-from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator, with_config
+from typing import Annotated, Dict, Any, List, Optional, Tuple, Union
+from typing_extensions import NotRequired, TypedDict
 from enum import Enum
 
 
@@ -30,6 +31,99 @@ class QuestionOption(BaseModel):
     text: str = Field(..., description="Option content")
 
 
+@with_config(ConfigDict(extra="allow"))
+class OptionItem(TypedDict):
+    """One entry of an options or steps list."""
+    id: str
+    text: str
+
+
+@with_config(ConfigDict(extra="allow"))
+class ChoiceOptions(TypedDict):
+    """Options for multiple_choice and mcq_multi questions."""
+    options: Annotated[List[OptionItem], Field(min_length=2)]
+
+
+@with_config(ConfigDict(extra="allow"))
+class StepOptions(TypedDict):
+    """Options for reorder_steps questions."""
+    steps: Annotated[List[OptionItem], Field(min_length=2)]
+
+
+@with_config(ConfigDict(extra="allow"))
+class SingleChoiceSolution(TypedDict):
+    correct_option_id: str
+
+
+@with_config(ConfigDict(extra="allow"))
+class MultiChoiceSolution(TypedDict):
+    correct_option_ids: Annotated[List[str], Field(min_length=1)]
+
+
+@with_config(ConfigDict(extra="allow"))
+class TextInputSolution(TypedDict):
+    exact_match: Union[str, int, float]
+    case_sensitive: NotRequired[bool]
+
+
+@with_config(ConfigDict(extra="allow"))
+class BooleanSolution(TypedDict):
+    correct_value: bool
+
+
+@with_config(ConfigDict(extra="allow"))
+class StepOrderSolution(TypedDict):
+    correct_order: Annotated[List[str], Field(min_length=2)]
+
+
+# (options shape, solution shape) per question type; None means free-form options.
+# TypedDicts validate straight to dicts, matching the JSONB columns.
+TYPE_RULES: Dict[QuestionType, Tuple[Optional[type], type]] = {
+    QuestionType.MULTIPLE_CHOICE: (ChoiceOptions, SingleChoiceSolution),
+    QuestionType.MCQ_MULTI: (ChoiceOptions, MultiChoiceSolution),
+    QuestionType.TEXT_INPUT: (None, TextInputSolution),
+    QuestionType.BOOLEAN: (None, BooleanSolution),
+    QuestionType.REORDER_STEPS: (StepOptions, StepOrderSolution),
+}
+
+
+def type_fields_shape(question_type: QuestionType) -> type:
+    """TypedDict of the options and solution fields for one question type."""
+    options, solution = TYPE_RULES[question_type]
+    return TypedDict(f"{question_type.name.title().replace('_', '')}Fields", {
+        "options": options or NotRequired[Dict[str, Any]],
+        "solution": solution,
+    })
+
+
+# One adapter call checks both fields, keeping per-question validation in pydantic-core
+_TYPE_FIELDS = {
+    question_type: TypeAdapter(type_fields_shape(question_type)).validator for question_type in QuestionType
+}
+
+
+def check_answer(question_type: QuestionType, options: Dict[str, Any], solution: Dict[str, Any]) -> None:
+    """
+    Ensure the solution refers to options that exist.
+    Expects options and solution already shaped per TYPE_RULES.
+    
+    Raises:
+        ValueError: If the answer does not match the options
+    """
+    if question_type == QuestionType.MULTIPLE_CHOICE:
+        if solution["correct_option_id"] not in {o["id"] for o in options["options"]}:
+            raise ValueError(f"correct_option_id {solution['correct_option_id']!r} is not an option id")
+    
+    elif question_type == QuestionType.MCQ_MULTI:
+        unknown = set(solution["correct_option_ids"]) - {o["id"] for o in options["options"]}
+        if unknown:
+            raise ValueError(f"correct_option_ids {sorted(unknown)} are not option ids")
+    
+    elif question_type == QuestionType.REORDER_STEPS:
+        if sorted(solution["correct_order"]) != sorted(step["id"] for step in options["steps"]):
+            raise ValueError("correct_order must list every step id exactly once")
+
+
 class QuestionSchema(BaseModel):
     """
     Validated schema for a single generated question.
@@ -50,43 +144,16 @@ class QuestionSchema(BaseModel):
     # AI generation metadata (not stored in DB)
     difficulty: DifficultyLevel = Field(default=DifficultyLevel.MEDIUM)
     confidence_score: Optional[float] = Field(None, ge=0.0, le=1.0, description="AI confidence")
+    duplicate_of: Optional[str] = Field(None, description="Dedup index key of an earlier near-duplicate (flag mode)")
     
-    @field_validator("options", mode="before")
-    @classmethod
-    def validate_options(cls, v, info):
-        """Ensure options match question type."""
-        question_type = info.data.get("type")
-        
-        if question_type == QuestionType.MULTIPLE_CHOICE:
-            # Must have options array
-            if "options" not in v:
-                raise ValueError("Multiple choice questions must have 'options' array")
-            if not isinstance(v["options"], list):
-                raise ValueError("'options' must be an array")
-            if len(v["options"]) < 2:
-                raise ValueError("Must have at least 2 options")
-        
-        return v
-    
-    @field_validator("solution", mode="before")
-    @classmethod
-    def validate_solution(cls, v, info):
-        """Ensure solution matches question type."""
-        question_type = info.data.get("type")
-        
-        if question_type == QuestionType.MULTIPLE_CHOICE:
-            if "correct_option_id" not in v:
-                raise ValueError("Multiple choice solutions must have 'correct_option_id'")
-        
-        elif question_type == QuestionType.TEXT_INPUT:
-            if "exact_match" not in v:
-                raise ValueError("Text input solutions must have 'exact_match'")
-        
-        elif question_type == QuestionType.BOOLEAN:
-            if "correct_value" not in v:
-                raise ValueError("Boolean solutions must have 'correct_value'")
-        
-        return v
+    @model_validator(mode="after")
+    def validate_type_fields(self):
+        """Ensure options and solution match the question type, keeping the coerced values."""
+        fields = _TYPE_FIELDS[self.type].validate_python({"options": self.options, "solution": self.solution})
+        self.options = fields.get("options", self.options)
+        self.solution = fields["solution"]
+        check_answer(self.type, self.options, self.solution)
+        return self
 
 
 class GenerationRequest(BaseModel):
@@ -97,6 +164,7 @@ class GenerationRequest(BaseModel):
         ...,
         description="Number of questions per difficulty"
     )
+    custom_instructions: Optional[str] = Field(None, description="Optional user-specific instructions")
     model: str = Field(default="gemini-1.5-flash")
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
 
@@ -108,3 +176,10 @@ class GenerationResponse(BaseModel):
     token_count: int
     generation_time_ms: int
     model_used: str
+    chunk_count: Optional[int] = Field(None, description="Chunks generated from (chunked mode only)")
+    cache_hit: bool = Field(default=False, description="Served from the generation cache")
+    duplicate_count: int = Field(default=0, description="Near-duplicates dropped or flagged")
+    input_tokens: int = Field(default=0, description="Prompt tokens")
+    output_tokens: int = Field(default=0, description="Completion tokens")
+    usage_reported: bool = Field(default=False, description="Token counts came from the provider rather than a local count")
+    cost_usd: Optional[float] = Field(None, description="Cost at list prices (None for unpriced models)")
@@ -0,0 +1,446 @@
+"""
+Long-running worker that serves extract/generate/pipeline jobs from a queue.
+
+Jobs are submitted to a local SQLite queue, either directly (`JobQueue.submit`,
+`python -m src submit`) or through the optional HTTP front-end. A worker keeps
+one parser, one generator (with its provider client, caches, rate limiter and
+dedup index) and a thread pool warm across jobs, so a submission never pays
+import, client setup or cache warm-up costs. Several worker processes may
+share one queue file.
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from .parsers.document_parser import DocumentParser
+from .generators.question_generator import QuestionGenerator
+from .pipeline import build_output_data, coerce_distribution, run_pipeline
+from .utils.cache import DEFAULT_CACHE_DIR
+from .utils.chunking import TextChunker
+from .utils.metrics import PipelineMetrics, collect, timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = DEFAULT_CACHE_DIR / "jobs.sqlite3"
+JOB_KINDS = ("extract", "generate", "pipeline")
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+"""
+
+
+@dataclass
+class QueuedJob:
+    """A job claimed from the queue."""
+    id: int
+    kind: str
+    params: Dict[str, Any]
+
+
+class JobQueue:
+    """
+    Durable FIFO job queue in a SQLite file.
+
+    Claims run in an immediate transaction, so concurrent workers (threads
+    or processes) never receive the same job. Results and errors are stored
+    with the job until it is read back with get().
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or DEFAULT_QUEUE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit mode; multi-statement updates open their own transactions
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> int:
+        """
+        Queue a job.
+
+        Returns:
+            The job ID
+
+        Raises:
+            ValueError: If `kind` is not a supported job kind
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind} (expected one of {', '.join(JOB_KINDS)})")
+
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO jobs (kind, params, created_at) VALUES (?, ?, ?)",
+                (kind, json.dumps(params), time.time())
+            )
+            return cur.lastrowid
+
+    def claim(self) -> Optional[QueuedJob]:
+        """Mark the oldest queued job as running and return it, or None if the queue is empty."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, kind, params FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                        (time.time(), row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        return QueuedJob(id=row[0], kind=row[1], params=json.loads(row[2]))
+
+    def complete(self, job_id: int, result: Dict[str, Any]) -> None:
+        self._finish(job_id, "done", json.dumps(result), None)
+
+    def fail(self, job_id: int, error: Exception) -> None:
+        self._finish(job_id, "failed", None, str(error))
+
+    def _finish(self, job_id: int, status: str, result: Optional[str], error: Optional[str]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+
+    def requeue_running(self) -> int:
+        """
+        Return jobs left running by a worker that stopped mid-job to the queue.
+        Only call this when no other worker is using the queue.
+        """
+        with self._lock:
+            cur = self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            return cur.rowcount
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Status, result and timings of a job, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, status, result, error, attempts, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+            "attempts": row[5],
+            "created_at": row[6],
+            "started_at": row[7],
+            "finished_at": row[8],
+        }
+
+    def wait(self, job_id: int, timeout: Optional[float] = None, poll_interval: float = 0.2) -> Dict[str, Any]:
+        """
+        Block until a job is done or failed.
+
+        Raises:
+            KeyError: If the job does not exist
+            TimeoutError: If it is still pending after `timeout` seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                raise KeyError(f"No such job: {job_id}")
+            if job["status"] in ("done", "failed"):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(poll_interval)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        with self._lock:
+            rows = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        return {status: rows.get(status, 0) for status in JOB_STATUSES}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Worker:
+    """
+    Runs queued jobs concurrently over a warm parser and generator.
+
+    Job parameters by kind:
+        extract:  input, [output]
+        generate: text or input (a text file), skill_id, difficulty, [instructions], [output]
+        pipeline: input, skill_id, difficulty, [instructions], [output]
+
+    `difficulty` is a distribution string ("easy:5,hard:2") or a {level: count}
+    object. With `output`, the result is written there and the stored job
+    result only records the path and counts; otherwise the stored result is
+    the full output document.
+    """
+
+    def __init__(
+        self,
+        parser: DocumentParser,
+        generator: QuestionGenerator,
+        queue: JobQueue,
+        concurrency: int = 4,
+        chunker: Optional[TextChunker] = None,
+        poll_interval: float = 0.5
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.parser = parser
+        self.generator = generator
+        self.queue = queue
+        self.concurrency = concurrency
+        self.chunker = chunker
+        self.poll_interval = poll_interval
+        self.stats = {"completed": 0, "failed": 0}
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._stats_lock = threading.Lock()
+
+    def stop(self) -> None:
+        """Stop claiming jobs; serve() returns once running jobs finish."""
+        self._stop.set()
+        self._wake.set()
+
+    def notify(self) -> None:
+        """Wake the worker to claim new jobs now instead of at the next poll."""
+        self._wake.set()
+
+    def serve(self, drain: bool = False) -> Dict[str, int]:
+        """
+        Claim and run jobs until stop() is called.
+
+        Args:
+            drain: Return as soon as the queue is empty and no job is running
+
+        Returns:
+            Counts of completed and failed jobs
+        """
+        running: Set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as executor:
+            while not self._stop.is_set():
+                running = {future for future in running if not future.done()}
+
+                job = self.queue.claim() if len(running) < self.concurrency else None
+                if job is not None:
+                    future = executor.submit(contextvars.copy_context().run, self._process, job)
+                    future.add_done_callback(lambda _: self._wake.set())
+                    running.add(future)
+                    continue
+
+                if drain and not running:
+                    break
+
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+        return dict(self.stats)
+
+    def _process(self, job: QueuedJob) -> None:
+        started = time.perf_counter()
+        try:
+            result = self.run_job(job.kind, job.params)
+            # Inside the try: a result that cannot be stored fails the job
+            # instead of leaving it running forever
+            self.queue.complete(job.id, result)
+        except Exception as e:
+            self._count("failed")
+            logger.error(f"✗ Job {job.id} ({job.kind}) failed: {e}")
+            try:
+                self.queue.fail(job.id, e)
+            except Exception as fail_error:
+                logger.error(f"Could not record failure of job {job.id}: {fail_error}")
+            return
+
+        self._count("completed")
+        logger.info(f"✓ Job {job.id} ({job.kind}) done in {time.perf_counter() - started:.2f}s")
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def run_job(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one job in the calling thread.
+
+        Returns:
+            The job result (see the class docstring)
+
+        Raises:
+            ValueError: If the kind is unknown or a required parameter is missing
+        """
+        if kind == "extract":
+            return self._extract(params)
+        if kind not in ("generate", "pipeline"):
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        for name in ("skill_id", "difficulty"):
+            if not params.get(name):
+                raise ValueError(f"{kind} job requires '{name}'")
+        distribution = coerce_distribution(params["difficulty"])
+
+        with collect(PipelineMetrics()) as metrics:
+            if kind == "pipeline":
+                response = run_pipeline(
+                    self.parser,
+                    self.generator,
+                    _required(params, "input"),
+                    skill_id=params["skill_id"],
+                    difficulty_distribution=distribution,
+                    custom_instructions=params.get("instructions"),
+                    chunker=self.chunker
+                )
+                metadata = {
+                    "source_file": params["input"],
+                    "source_metadata": self.parser.get_metadata(params["input"], self.parser.cache),
+                }
+            else:
+                text = params.get("text")
+                if text is None:
+                    text = Path(_required(params, "input")).read_text(encoding="utf-8")
+                response = self._generate(text, params["skill_id"], distribution, params.get("instructions"))
+                metadata = {}
+
+            output_data = build_output_data(
+                response,
+                **metadata,
+                skill_id=params["skill_id"],
+                metrics=metrics.summary()
+            )
+
+            if not params.get("output"):
+                return output_data
+
+            with timed("output_write"):
+                _write_atomic(params["output"], json.dumps(output_data, indent=2))
+
+        return {"output": params["output"], "total_generated": response.total_generated}
+
+    def _generate(self, text: str, skill_id: str, distribution, instructions: Optional[str]):
+        if self.chunker is not None:
+            return self.generator.generate_chunked(
+                text=text,
+                skill_id=skill_id,
+                difficulty_distribution=distribution,
+                custom_instructions=instructions,
+                chunker=self.chunker
+            )
+        return self.generator.generate(
+            text=text,
+            skill_id=skill_id,
+            difficulty_distribution=distribution,
+            custom_instructions=instructions
+        )
+
+    def _extract(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        input_path = _required(params, "input")
+        text = self.parser.parse(input_path)
+        metadata = self.parser.get_metadata(input_path, self.parser.cache)
+
+        if not params.get("output"):
+            return {"text": text, "metadata": metadata}
+
+        _write_atomic(params["output"], text)
+        return {"output": params["output"], "characters": len(text), "metadata": metadata}
+
+
+def _required(params: Dict[str, Any], name: str) -> Any:
+    if not params.get(name):
+        raise ValueError(f"Job requires '{name}'")
+    return params[name]
+
+
+def _write_atomic(path: str, content: str) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    tmp.write_text(content, encoding="utf-8")
+    tmp.replace(target)
+
+
+def make_http_server(worker: Worker, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """
+    HTTP front-end for a worker's queue.
+
+    Routes:
+        POST /jobs        {"kind": ..., "params": {...}} -> 202 {"id": ...}
+        GET  /jobs/<id>   Job status, result and timings
+        GET  /health      Queue counts and worker stats
+
+    The server binds to localhost by default and has no authentication;
+    put it behind the admin backend rather than exposing it directly.
+    Call serve_forever() (typically on a thread) to start it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                return self._send(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                job_id = worker.queue.submit(body.get("kind"), body.get("params") or {})
+            except (ValueError, AttributeError) as e:
+                return self._send(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            worker.notify()
+            self._send(HTTPStatus.ACCEPTED, {"id": job_id})
+
+        def do_GET(self):
+            path = self.path.rstrip("/")
+            if path == "/health":
+                return self._send(HTTPStatus.OK, {"queue": worker.queue.counts(), "worker": dict(worker.stats)})
+            if path.startswith("/jobs/") and path[len("/jobs/"):].isdigit():
+                job = worker.queue.get(int(path[len("/jobs/"):]))
+                if job is not None:
+                    return self._send(HTTPStatus.OK, job)
+            self._send(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+        def _send(self, status: HTTPStatus, payload: Dict[str, Any]) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return ThreadingHTTPServer((host, port), Handler)
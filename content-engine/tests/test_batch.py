@@ -0,0 +1,72 @@
+import json
+
+from docx import Document
+
+from src.batch import BatchRunner, BatchState, load_jobs
+from src.generators.question_generator import QuestionGenerator
+from src.parsers.document_parser import DocumentParser
+
+SKILL = "11111111-1111-1111-1111-111111111111"
+OTHER_SKILL = "22222222-2222-2222-2222-222222222222"
+TEXT = "Photosynthesis converts light energy into chemical energy stored in glucose molecules."
+
+
+def test_resume_skips_done_jobs_until_their_settings_change(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a", "b"):
+        document = Document()
+        document.add_paragraph(f"{TEXT} Lesson {name}.")
+        document.save(docs / f"{name}.docx")
+
+    out = tmp_path / "out"
+    state_path = str(out / "state.json")
+
+    def run(jobs, model="mock", temperature=0.7):
+        generator = QuestionGenerator(model=model, temperature=temperature)
+        runner = BatchRunner(DocumentParser(), generator, BatchState(state_path), concurrency=2)
+        return runner.run(jobs)
+
+    def jobs(skill_id=SKILL, difficulty="easy:2", output_dir=out):
+        return load_jobs(str(docs), str(output_dir), skill_id=skill_id, difficulty=difficulty)
+
+    # Interrupted after the first document
+    assert run(jobs()[:1]) == {"completed": 1, "skipped": 0, "failed": 0}
+    assert run(jobs()) == {"completed": 1, "skipped": 1, "failed": 0}
+    assert run(jobs()) == {"completed": 0, "skipped": 2, "failed": 0}
+
+    assert run(jobs(difficulty="easy:3")) == {"completed": 2, "skipped": 0, "failed": 0}
+    assert run(jobs(skill_id=OTHER_SKILL)) == {"completed": 2, "skipped": 0, "failed": 0}
+    assert run(jobs(output_dir=tmp_path / "elsewhere")) == {"completed": 2, "skipped": 0, "failed": 0}
+    assert run(jobs(), model="mock:seed=1") == {"completed": 2, "skipped": 0, "failed": 0}
+    assert run(jobs(), temperature=0.2) == {"completed": 2, "skipped": 0, "failed": 0}
+    # Earlier settings are still recorded as done
+    assert run(jobs(difficulty="easy:3")) == {"completed": 0, "skipped": 2, "failed": 0}
+
+    # A missing output is regenerated even when the settings match
+    (out / "a.json").unlink()
+    assert run(jobs(difficulty="easy:3")) == {"completed": 1, "skipped": 1, "failed": 0}
+
+
+def test_edited_input_is_regenerated(tmp_path):
+    def write_source(*paragraphs):
+        document = Document()
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+        document.save(tmp_path / "lesson.docx")
+
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(json.dumps([{"input": "lesson.docx"}]), encoding="utf-8")
+    state_path = str(tmp_path / "out" / "state.json")
+
+    def run():
+        jobs = load_jobs(str(manifest), str(tmp_path / "out"), skill_id=SKILL, difficulty="easy:2")
+        runner = BatchRunner(DocumentParser(), QuestionGenerator(model="mock"), BatchState(state_path))
+        return runner.run(jobs)
+
+    write_source(TEXT)
+    assert run() == {"completed": 1, "skipped": 0, "failed": 0}
+    assert run() == {"completed": 0, "skipped": 1, "failed": 0}
+
+    write_source(TEXT, "Chlorophyll absorbs mostly blue and red light.")
+    assert run() == {"completed": 1, "skipped": 0, "failed": 0}
@@ -0,0 +1,54 @@
+from src.validators.batch_validator import check_questions, iter_check_questions, validate_questions
+from src.validators.question_schema import QuestionSchema, QuestionType
+
+
+def _mcq(answer="a"):
+    return {
+        "content": "Which option is correct here?",
+        "type": "multiple_choice",
+        "options": {"options": [{"id": "a", "text": "A"}, {"id": "b", "text": "B"}]},
+        "solution": {"correct_option_id": answer},
+    }
+
+
+ITEMS = [
+    _mcq(),
+    _mcq(answer="z"),  # answer is not an option
+    {"content": "Water boils at 100C at sea level.", "type": "boolean", "solution": {"correct_value": True}},
+    {"content": "Too short", "type": "boolean", "solution": {"correct_value": True}},
+    {
+        "content": "Put the steps in order please.",
+        "type": "reorder_steps",
+        "options": {"steps": [{"id": "1", "text": "x"}, {"id": "2", "text": "y"}]},
+        "solution": {"correct_order": ["2", "1"]},
+    },
+    "not a question",
+]
+
+
+def test_validate_questions_reports_errors_per_item():
+    result = validate_questions(ITEMS)
+
+    assert result.valid_indices == [0, 2, 4]
+    assert [q.type for q in result.valid] == [
+        QuestionType.MULTIPLE_CHOICE, QuestionType.BOOLEAN, QuestionType.REORDER_STEPS
+    ]
+    assert [e.index for e in result.errors] == [1, 3, 5]
+    assert "correct_option_id" in result.errors[0].message
+
+
+def test_check_questions_matches_model_validation():
+    assert [e.index for e in check_questions(ITEMS)] == [1, 3, 5]
+    assert [e.index for e in iter_check_questions(ITEMS, batch_size=4)] == [1, 3, 5]
+    assert check_questions([_mcq()]) == []
+
+
+def test_type_fields_are_stored_as_validated():
+    question = QuestionSchema(
+        content="Water boils at 100C at sea level.", type="boolean",
+        solution={"correct_value": "yes", "note": "kept"},
+    )
+    assert question.solution == {"correct_value": True, "note": "kept"}
+    assert validate_questions([{**ITEMS[2], "solution": {"correct_value": "no"}}]).valid[0].solution == {
+        "correct_value": False
+    }
@@ -0,0 +1,137 @@
+"""
+Throughput benchmarks for the generation pipeline on the offline mock provider.
+
+Covers everything but the network: prompt building, JSON parsing, validation,
+chunking, document extraction and output. Run with `pytest tests/test_benchmark.py -s`
+to see the report. Set BENCHMARK_REPORT=<path> to append results as JSON lines
+and BENCHMARK_MIN_QPS to fail when a path drops below a throughput floor.
+"""
+
+import os
+import json
+import time
+import tracemalloc
+
+import pytest
+from docx import Document
+
+from src.batch import BatchRunner, BatchState, load_jobs
+from src.generators.question_generator import QuestionGenerator
+from src.parsers.document_parser import DocumentParser
+from src.utils.chunking import TextChunker
+from src.validators.question_schema import DifficultyLevel
+
+SKILL = "11111111-1111-1111-1111-111111111111"
+DISTRIBUTION = {DifficultyLevel.EASY: 4, DifficultyLevel.MEDIUM: 4, DifficultyLevel.HARD: 2}
+PARAGRAPH = (
+    "Photosynthesis converts light energy into chemical energy. Chlorophyll in the "
+    "chloroplasts absorbs red and blue light, and the Calvin cycle fixes carbon "
+    "dioxide into sugars such as glucose (C6H12O6) at a rate near 3 umol/m^2/s."
+)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _benchmark(name, generator, run):
+    """
+    Run `run()` -> question count, timing every generate() call.
+    Peak memory is taken from a second, traced run so tracing does not skew timings.
+    """
+    latencies = []
+    generate = generator.generate
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return generate(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    generator.generate = timed
+    try:
+        start = time.perf_counter()
+        questions = run()
+        elapsed = time.perf_counter() - start
+    finally:
+        generator.generate = generate
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    report = {
+        "path": name,
+        "questions": questions,
+        "calls": len(latencies),
+        "questions_per_sec": round(questions / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "peak_memory_mb": round(peak / 1_048_576, 2),
+    }
+    print(f"\n{json.dumps(report)}")
+
+    if os.getenv("BENCHMARK_REPORT"):
+        with open(os.environ["BENCHMARK_REPORT"], "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+
+    min_qps = float(os.getenv("BENCHMARK_MIN_QPS", "0"))
+    assert report["questions_per_sec"] >= min_qps, f"{name} below {min_qps} questions/sec"
+    return report
+
+
+@pytest.fixture
+def generator():
+    return QuestionGenerator(model="mock")
+
+
+def test_single(generator):
+    text = PARAGRAPH * 10
+
+    def run():
+        return sum(generator.generate(text + str(i), SKILL, DISTRIBUTION).total_generated for i in range(50))
+
+    report = _benchmark("single", generator, run)
+    assert report["questions"] == 500
+
+
+def test_chunked(generator):
+    text = "\n\n".join(f"{PARAGRAPH} Section {i}." for i in range(400))
+    chunker = TextChunker(max_tokens=1000, overlap_tokens=100, token_counter=generator.token_counter)
+    distribution = {level: count * 20 for level, count in DISTRIBUTION.items()}
+
+    def run():
+        return generator.generate_chunked(text, SKILL, distribution, chunker=chunker, collect=False).total_generated
+
+    report = _benchmark("chunked", generator, run)
+    assert report["questions"] == 200
+    assert report["calls"] > 1
+
+
+def test_batch(generator, tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(8):
+        document = Document()
+        for j in range(30):
+            document.add_paragraph(f"{PARAGRAPH} Document {i}, paragraph {j}.")
+        document.save(docs / f"lesson_{i}.docx")
+
+    chunker = TextChunker(max_tokens=500, overlap_tokens=50, token_counter=generator.token_counter)
+    runs = iter(range(2))
+
+    def run():
+        out = tmp_path / f"out{next(runs)}"
+        jobs = load_jobs(str(docs), str(out), skill_id=SKILL, difficulty="easy:4,medium:4,hard:2")
+        runner = BatchRunner(DocumentParser(), generator, BatchState(str(out / "state.json")),
+                             concurrency=4, chunker=chunker)
+        assert runner.run(jobs)["failed"] == 0
+        return sum(json.loads(p.read_text())["metadata"]["total_generated"] for p in out.glob("lesson_*.json"))
+
+    report = _benchmark("batch", generator, run)
+    assert report["questions"] == 80
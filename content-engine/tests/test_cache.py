@@ -0,0 +1,80 @@
+import os
+import json
+import time
+
+import pytest
+
+from src.generators.mock_provider import MockProvider
+from src.generators.question_generator import QuestionGenerator
+from src.utils.cache import DiskCache, GenerationCache, make_key
+from src.validators.question_schema import DifficultyLevel
+
+TEXT = "Photosynthesis converts light energy into chemical energy stored in glucose molecules."
+QUESTION = {"content": "Is glucose made by photosynthesis?", "type": "boolean", "solution": {"correct_value": True}}
+
+
+def test_round_trip_and_expiry(tmp_path):
+    cache = DiskCache(tmp_path, max_age_seconds=60)
+    key = make_key("prompt", "gemini", 0.7)
+    assert cache.get(key) is None
+
+    cache.put(key, {"raw_response": "[]"})
+    assert cache.get(key) == {"raw_response": "[]"}
+
+    path = tmp_path / key[:2] / f"{key}.json"
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert cache.get(key) is None
+    assert not path.exists()
+
+
+def test_size_eviction_keeps_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=2500, max_age_seconds=None)
+    keys = [make_key(i) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, {"payload": "x" * 900})
+        path = tmp_path / key[:2] / f"{key}.json"
+        os.utime(path, (1000 + i, 1000 + i))
+        if i == 1:
+            cache.get(keys[0])  # touch: keys[0] becomes most recently used
+
+    assert cache.get(keys[-1]) is not None
+    assert cache.get(keys[1]) is None
+
+
+
+def test_unreadable_entry_is_removed_from_size_total(tmp_path):
+    cache = DiskCache(tmp_path, max_age_seconds=None)
+    key = make_key("corrupt")
+    cache.put(key, {"payload": "x" * 100})
+    assert cache._size > 0
+
+    path = tmp_path / key[:2] / f"{key}.json"
+    path.write_bytes(b"\0" * path.stat().st_size)  # Same size, unreadable
+    assert cache.get(key) is None
+    assert not path.exists()
+    assert cache._size == 0
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("reply", [
+    json.dumps([QUESTION, QUESTION])[:-30],  # Cut off mid-array
+    "[]",
+    json.dumps([{"content": "bad"}]),  # Nothing valid
+], ids=["truncated", "empty", "invalid"])
+def test_incomplete_replies_are_not_cached(tmp_path, stream, reply):
+    generator = QuestionGenerator(model="mock", cache=GenerationCache(tmp_path), stream=stream)
+    generator.client = MockProvider(responses=[reply])
+
+    for _ in range(2):
+        generator.generate(TEXT, "skill", {DifficultyLevel.EASY: 2})
+    assert generator.client.calls == 2
+
+
+def test_complete_replies_are_cached(tmp_path):
+    generator = QuestionGenerator(model="mock", cache=GenerationCache(tmp_path))
+    generator.client = MockProvider(responses=[json.dumps([QUESTION])])
+
+    first = generator.generate(TEXT, "skill", {DifficultyLevel.EASY: 1})
+    second = generator.generate(TEXT, "skill", {DifficultyLevel.EASY: 1})
+    assert generator.client.calls == 1
+    assert second.cache_hit and second.questions == first.questions
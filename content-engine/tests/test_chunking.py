@@ -0,0 +1,105 @@
+from src.utils.chunking import TextChunker
+from src.generators.question_generator import allocate_distribution
+from src.validators.question_schema import DifficultyLevel
+
+
+def test_chunks_cover_text_within_budget():
+    text = "\n\n".join(f"Paragraph {i}. " + "word " * 50 for i in range(40))
+    chunker = TextChunker(max_tokens=200, overlap_tokens=80)
+    chunks = chunker.split(text)
+
+    assert len(chunks) > 1
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(text)
+    assert chunks[-1].progress == 1.0
+    for prev, cur in zip(chunks, chunks[1:]):
+        assert not text[prev.end:cur.start].strip()  # nothing skipped between chunks
+        assert cur.start > prev.start
+    assert any(cur.start < prev.end for prev, cur in zip(chunks, chunks[1:]))
+    assert all(c.token_count <= 200 for c in chunks)
+
+
+def test_oversized_paragraph_is_split():
+    text = "x" * 10_000
+    chunks = TextChunker(max_tokens=500, overlap_tokens=0).split(text)
+    assert "".join(c.text for c in chunks) == text
+
+
+def test_distribution_allocation_sums_to_total():
+    distribution = {DifficultyLevel.EASY: 7, DifficultyLevel.HARD: 3}
+    bounds = [0.0, 0.13, 0.4, 0.41, 0.9, 1.0]
+    totals = {level: 0 for level in distribution}
+    for start, end in zip(bounds, bounds[1:]):
+        for level, count in allocate_distribution(distribution, start, end).items():
+            assert count >= 0
+            totals[level] += count
+    assert totals == distribution
+
+
+def test_streamed_sections_match_joined_document():
+    from src.parsers.document_parser import SECTION_SEPARATOR, DocumentSection
+
+    pages = [f"Page {i}. " + "lorem ipsum " * 40 for i in range(12)]
+    sections, offset = [], 0
+    for i, page in enumerate(pages):
+        sections.append(DocumentSection(index=i, text=page, offset=offset, total=len(pages)))
+        offset += len(page) + len(SECTION_SEPARATOR)
+    joined = SECTION_SEPARATOR.join(pages)
+
+    chunks = list(TextChunker(max_tokens=300, overlap_tokens=60).iter_chunks(iter(sections)))
+
+    assert len(chunks) > 1
+    assert all(joined[c.start:c.end] == c.text for c in chunks)
+    assert [c.progress for c in chunks] == sorted(c.progress for c in chunks)
+    assert chunks[-1].progress == 1.0
+
+
+def test_semantic_chunks_align_with_docx_headings(tmp_path):
+    from docx import Document
+    from src.parsers.document_parser import DocumentParser
+    from src.utils.chunking import SemanticChunker
+
+    document = Document()
+    for chapter in ("Forces", "Energy"):
+        document.add_heading(chapter, level=1)
+        for topic in ("Definitions", "Examples"):
+            document.add_heading(f"{chapter} {topic}", level=2)
+            for i in range(3):
+                document.add_paragraph(f"{chapter} {topic.lower()} paragraph {i}. " + "detail " * 30)
+    document.add_paragraph("Push or pull", style="List Bullet")
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text, table.cell(0, 1).text = "Quantity", "Unit"
+    table.cell(1, 0).text, table.cell(1, 1).text = "Force", "newton"
+    document.save(tmp_path / "lesson.docx")
+
+    parser = DocumentParser()
+    text = parser.parse(str(tmp_path / "lesson.docx"))
+    assert "- Push or pull" in text
+    assert "Quantity | Unit\nForce | newton" in text
+
+    chunks = list(SemanticChunker(max_tokens=300, overlap_tokens=50).iter_chunks(
+        parser.iter_sections(str(tmp_path / "lesson.docx"))
+    ))
+    assert len(chunks) > 2
+    assert all(c.token_count <= 300 and text[c.start:c.end] == c.text for c in chunks)
+    assert chunks[0].title == "Forces"
+    # Chunks begin at headings, titled with the enclosing chapter and topic
+    assert any(c.title == "Energy > Energy Examples" and c.text.startswith("Energy Examples") for c in chunks)
+    assert not any(c.text.rstrip().endswith(("Definitions", "Examples")) for c in chunks)
+
+
+def test_semantic_chunker_infers_headings_from_page_layout():
+    from src.utils.chunking import SemanticChunker
+
+    page = (
+        "CHAPTER 2 PHOTOSYNTHESIS\n"
+        "Plants convert light energy into chemical energy in a process that takes place\n"
+        "in the chloroplasts of leaf cells, using water and carbon dioxide as inputs.\n"
+        "2.1 The Light Reactions\n"
+        "Chlorophyll absorbs red and blue light and passes the energy along a chain of\n"
+        "carriers that split water and release oxygen as a by-product of the reaction.\n"
+    )
+    chunks = SemanticChunker(max_tokens=60, overlap_tokens=5).split(page)
+
+    assert [c.title for c in chunks] == ["CHAPTER 2 PHOTOSYNTHESIS", "CHAPTER 2 PHOTOSYNTHESIS > 2.1 The Light Reactions"]
+    assert chunks[1].text.startswith("2.1 The Light Reactions")
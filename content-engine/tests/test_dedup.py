@@ -0,0 +1,74 @@
+import pytest
+
+from src.generators.question_generator import QuestionGenerator
+from src.utils.cache import GenerationCache
+from src.utils.dedup import DedupIndex
+from src.validators.question_schema import DifficultyLevel
+from src.validators.question_schema import QuestionSchema
+
+SKILL = "11111111-1111-1111-1111-111111111111"
+
+
+def _mcq(content, options):
+    return QuestionSchema(
+        content=content,
+        options={"options": [{"id": chr(97 + i), "text": t} for i, t in enumerate(options)]},
+        solution={"correct_option_id": "a"},
+    )
+
+
+ORIGINAL = _mcq("Which organelle is known as the powerhouse of the cell?",
+                ["Mitochondria", "Nucleus", "Ribosome", "Golgi apparatus"])
+REWORDED = _mcq("Which organelle is known as the powerhouse of a cell?",
+                ["Mitochondria", "Nucleus", "Ribosome", "Golgi apparatus"])
+DIFFERENT = _mcq("What gas do plants absorb from the atmosphere during photosynthesis?",
+                 ["Carbon dioxide", "Oxygen", "Nitrogen", "Hydrogen"])
+
+
+def test_drops_near_duplicates_within_batch(tmp_path):
+    index = DedupIndex(tmp_path / "dedup.sqlite3")
+    kept, duplicates = index.screen([ORIGINAL, REWORDED, DIFFERENT], SKILL)
+    assert kept == [ORIGINAL, DIFFERENT]
+    assert duplicates == 1
+
+
+def test_flags_against_previous_runs_per_skill(tmp_path):
+    path = tmp_path / "dedup.sqlite3"
+    first = DedupIndex(path)
+    first.screen([ORIGINAL], SKILL)
+    first.close()
+
+    index = DedupIndex(path)
+    kept, duplicates = index.screen([REWORDED], SKILL, mode="flag")
+    assert duplicates == 1
+    assert kept[0].duplicate_of is not None
+
+    kept, duplicates = index.screen([REWORDED], "22222222-2222-2222-2222-222222222222")
+    assert duplicates == 0
+    assert index.count(SKILL) == 1
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_cached_rerun_is_not_deduped_against_itself(tmp_path, stream):
+    generator = QuestionGenerator(
+        model="mock",
+        cache=GenerationCache(tmp_path / "cache"),
+        dedup=DedupIndex(tmp_path / "dedup.sqlite3"),
+        stream=stream,
+    )
+    text = "Photosynthesis converts light energy into chemical energy stored in glucose."
+    distribution = {DifficultyLevel.EASY: 3}
+
+    first = generator.generate(text, SKILL, distribution)
+    second = generator.generate(text, SKILL, distribution)
+    assert len(first.questions) == 3
+    assert second.questions == first.questions
+    assert generator.dedup.count(SKILL) == 3
+
+
+def test_already_screened_batch_still_drops_repeats(tmp_path):
+    index = DedupIndex(tmp_path / "dedup.sqlite3")
+    index.screen([ORIGINAL], SKILL)
+    kept, duplicates = index.screen([ORIGINAL, ORIGINAL, REWORDED], SKILL, already_screened=True)
+    assert kept == [ORIGINAL]
+    assert duplicates == 2
@@ -0,0 +1,30 @@
+import json
+import random
+
+from src.utils.json_stream import JsonArrayStream
+
+QUESTIONS = [
+    {"content": f'Tricky "quote" \\ and [brackets] {{braces}} #{i}', "options": {"options": [{"id": "a", "text": "]}"}]}}
+    for i in range(20)
+]
+
+
+def test_elements_survive_arbitrary_splits():
+    raw = "```json\n" + json.dumps(QUESTIONS, indent=2) + "\n```"
+    rng = random.Random(0)
+    for _ in range(50):
+        stream, items, pos = JsonArrayStream(), [], 0
+        while pos < len(raw):
+            step = rng.randint(1, 30)
+            items += stream.feed(raw[pos:pos + step])
+            pos += step
+        assert items == QUESTIONS
+        assert stream.finished and not stream.truncated
+
+
+def test_truncated_array_keeps_complete_elements():
+    raw = json.dumps(QUESTIONS)
+    cut = raw.index('"content"', raw.index("#12"))  # inside element 13
+    stream = JsonArrayStream()
+    assert stream.feed(raw[:cut]) == QUESTIONS[:13]
+    assert stream.truncated
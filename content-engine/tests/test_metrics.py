@@ -0,0 +1,43 @@
+import json
+
+from src.generators.question_generator import QuestionGenerator
+from src.utils.metrics import PipelineMetrics, collect, count, timed
+from src.validators.question_schema import DifficultyLevel
+
+TEXT = "Photosynthesis converts light energy into chemical energy stored in glucose molecules."
+
+
+def test_nested_collectors_share_events():
+    run, job = PipelineMetrics(), PipelineMetrics()
+    with timed("ignored"):
+        count("ignored")
+
+    with collect(run):
+        count("retries")
+        with collect(job):
+            with timed("provider"):
+                count("retries", 2)
+
+    assert run.summary()["counters"] == {"retries": 3}
+    assert job.summary()["counters"] == {"retries": 2}
+    assert run.summary()["stages"]["provider"]["count"] == 1
+    assert "ignored" not in run.summary()["stages"]
+
+
+def test_generation_records_stages(tmp_path):
+    generator = QuestionGenerator(model="mock")
+    with collect(PipelineMetrics()) as metrics:
+        generator.generate(TEXT, "skill", {DifficultyLevel.EASY: 3})
+
+    summary = metrics.summary()
+    for stage in ("prompt_build", "provider", "json_decode", "validation"):
+        assert summary["stages"][stage]["count"] >= 1
+    assert summary["counters"]["questions_valid"] == 3
+
+    metrics.write(str(tmp_path / "metrics.json"))
+    assert json.loads((tmp_path / "metrics.json").read_text())["counters"]["questions_valid"] == 3
+
+    metrics.write(str(tmp_path / "metrics.prom"))
+    prom = (tmp_path / "metrics.prom").read_text()
+    assert 'content_engine_stage_seconds_count{stage="provider"} 1' in prom
+    assert 'content_engine_events_total{event="questions_valid"} 3' in prom
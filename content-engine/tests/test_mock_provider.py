@@ -0,0 +1,97 @@
+import json
+import asyncio
+
+import pytest
+
+from src.generators.mock_provider import MockProvider, MockProviderError, prompt_hash
+from src.generators.question_generator import QuestionGenerator
+from src.validators.question_schema import DifficultyLevel, GenerationRequest
+
+TEXT = "Photosynthesis converts light energy into chemical energy stored in glucose molecules."
+
+
+def test_synthetic_replies_are_deterministic_and_valid():
+    generator = QuestionGenerator(model="mock")
+    first = generator.generate(TEXT, "skill", {DifficultyLevel.EASY: 3, DifficultyLevel.HARD: 2})
+    second = generator.generate(TEXT, "skill", {DifficultyLevel.EASY: 3, DifficultyLevel.HARD: 2})
+    assert first.total_generated == 5
+    assert [q.difficulty.value for q in first.questions] == ["easy"] * 3 + ["hard"] * 2
+    assert first.questions == second.questions
+
+
+def test_replay_prefers_prompt_match(tmp_path):
+    recording = tmp_path / "replies.jsonl"
+    recording.write_text("\n".join(json.dumps(r) for r in [
+        {"response": "[]"},
+        {"response": '["matched"]', "prompt_sha256": prompt_hash("known prompt")},
+    ]))
+    provider = MockProvider.from_model(f"replay:{recording},latency=0")
+    assert provider.complete("known prompt") == '["matched"]'
+    assert provider.complete("other prompt") in ("[]", '["matched"]')
+
+
+def test_error_injection_is_retryable():
+    provider = MockProvider.from_model("mock:error_rate=1")
+    with pytest.raises(MockProviderError) as error:
+        provider.complete("prompt")
+    assert error.value.status_code == 503
+
+
+def test_streaming_and_batch_validation_agree():
+    reply = json.dumps([
+        {"content": "Is glucose made by photosynthesis?", "type": "boolean", "solution": {"correct_value": "yes"}},
+        {"content": "Too short", "type": "boolean", "solution": {"correct_value": True}},
+        "not a question",
+        {"content": "Which gas do plants absorb?", "options": {"options": [{"id": "a", "text": "CO2"},
+         {"id": "b", "text": "O2"}]}, "solution": {"correct_option_id": "c"}},
+        {"content": "Which gas do plants release?", "options": {"options": [{"id": "a", "text": "CO2"},
+         {"id": "b", "text": "O2"}]}, "solution": {"correct_option_id": "b"}},
+    ])
+    results = []
+    for stream in (False, True):
+        generator = QuestionGenerator(model="mock", stream=stream)
+        generator.client = MockProvider(responses=[reply], chunk_chars=7)
+        results.append(generator.generate(TEXT, "skill", {DifficultyLevel.EASY: 5}).questions)
+
+    assert results[0] == results[1]
+    assert [q.solution for q in results[1]] == [{"correct_value": True}, {"correct_option_id": "b"}]
+
+
+def test_generate_many_caps_concurrency_and_isolates_failures():
+    generator = QuestionGenerator(model="mock")
+    provider = generator.client
+    in_flight = []
+    peak = []
+
+    async def acomplete(prompt):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        try:
+            await asyncio.sleep(0.01)
+            if "Broken lesson" in prompt:
+                raise ValueError("provider rejected the prompt")
+            return provider.reply(prompt)
+        finally:
+            in_flight.pop()
+
+    provider.acomplete = acomplete
+    requests = [
+        GenerationRequest(text=f"{TEXT} {'Broken' if i == 3 else 'Plain'} lesson {i}.", skill_id="skill",
+                          difficulty_distribution={DifficultyLevel.EASY: i + 1})
+        for i in range(8)
+    ]
+    requests.append(GenerationRequest(text=TEXT * 2, skill_id="skill", difficulty_distribution={"easy": 1},
+                                      temperature=0.1))
+
+    async def run():
+        return [item async for item in generator.generate_many(requests, concurrency=3)]
+
+    results = dict(asyncio.run(run()))
+
+    assert sorted(results) == list(range(9))
+    assert max(peak) == 3
+    assert isinstance(results[3], ValueError)
+    assert "temperature" in str(results[8])
+    assert {i: r.total_generated for i, r in results.items() if i not in (3, 8)} == {
+        i: i + 1 for i in range(8) if i != 3
+    }
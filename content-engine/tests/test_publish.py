@@ -0,0 +1,139 @@
+import io
+import os
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+from src.publish import QuestionPublisher, iter_question_file, question_content_hash
+from src.utils.output import JsonlQuestionWriter
+from src.validators.question_schema import QuestionSchema
+
+SKILL = "11111111-1111-1111-1111-111111111111"
+
+# Postgres for the upsert test, e.g. a local `supabase start` database. It must
+# be disposable: the test creates and deletes its own skill and questions.
+TEST_DB_URL = os.getenv("PUBLISH_TEST_DB_URL")
+MIGRATION = Path(__file__).resolve().parents[2] / "supabase" / "migrations" / "20260207000001_question_content_hash.sql"
+
+# Stand-ins for the baseline tables, used when the database has no Supabase schema
+_MINIMAL_SCHEMA = """
+DO $$ BEGIN
+  CREATE TYPE question_type AS ENUM ('multiple_choice', 'mcq_multi', 'text_input', 'boolean', 'reorder_steps');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+CREATE TABLE IF NOT EXISTS public.skills (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  slug TEXT NOT NULL UNIQUE,
+  name TEXT NOT NULL,
+  app_id UUID
+);
+CREATE TABLE IF NOT EXISTS public.questions (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  skill_id UUID REFERENCES public.skills(id) ON DELETE CASCADE,
+  type question_type NOT NULL,
+  content JSONB NOT NULL,
+  options JSONB,
+  solution JSONB NOT NULL,
+  explanation TEXT,
+  points INTEGER DEFAULT 1,
+  app_id UUID,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+
+def _question(content="What is two plus two?", explanation=None):
+    return QuestionSchema(
+        content=content,
+        type="boolean",
+        solution={"correct_value": True},
+        explanation=explanation,
+    )
+
+
+def test_content_hash_ignores_presentation_fields():
+    base = question_content_hash(_question(), SKILL)
+    assert question_content_hash(_question(explanation="Because."), SKILL) == base
+    assert question_content_hash(_question("What is three plus three?"), SKILL) != base
+    assert question_content_hash(_question(), "22222222-2222-2222-2222-222222222222") != base
+
+
+def test_reads_json_and_jsonl_output(tmp_path):
+    questions = [_question(), _question("What is three plus three?")]
+
+    json_path = tmp_path / "out.json"
+    json_path.write_text(json.dumps({
+        "metadata": {"skill_id": SKILL},
+        "questions": [q.model_dump(mode="json") for q in questions] + [{"content": "bad"}],
+    }))
+    metadata = {}
+    assert list(iter_question_file(str(json_path), metadata)) == questions
+    assert metadata["skill_id"] == SKILL
+
+    buffer = io.StringIO()
+    writer = JsonlQuestionWriter(buffer)
+    for q in questions:
+        writer.write_question(q)
+    writer.write_metadata({"total_generated": 2})
+    jsonl_path = tmp_path / "out.jsonl"
+    jsonl_path.write_text(buffer.getvalue())
+
+    metadata = {}
+    assert list(iter_question_file(str(jsonl_path), metadata)) == questions
+    assert metadata == {"total_generated": 2}
+
+
+@pytest.fixture
+def database():
+    if not TEST_DB_URL:
+        pytest.skip("set PUBLISH_TEST_DB_URL to run against Postgres")
+    psycopg2 = pytest.importorskip("psycopg2")
+
+    conn = psycopg2.connect(TEST_DB_URL)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('public.questions')")
+        if cur.fetchone()[0] is None:
+            cur.execute(_MINIMAL_SCHEMA)
+        cur.execute(MIGRATION.read_text(encoding="utf-8"))
+        slug = f"publish-test-{uuid.uuid4().hex[:12]}"
+        cur.execute("INSERT INTO public.skills (slug, name) VALUES (%s, %s) RETURNING id", (slug, slug))
+        skill_id = str(cur.fetchone()[0])
+    try:
+        yield conn, skill_id
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM public.questions WHERE skill_id = %s", (skill_id,))
+            cur.execute("DELETE FROM public.skills WHERE id = %s", (skill_id,))
+        conn.close()
+
+
+def test_upsert_counts_and_republish(database):
+    conn, skill_id = database
+    questions = [_question(), _question("What is three plus three?"), _question("What is four plus four?")]
+
+    def publish(batch, batch_size=2):
+        with QuestionPublisher(TEST_DB_URL, skill_id=skill_id, batch_size=batch_size) as publisher:
+            return publisher.publish(batch)
+
+    assert publish(questions) == {"inserted": 3, "updated": 0, "unchanged": 0}
+    # Identical content again: matched by content_hash, rows left untouched
+    assert publish(questions) == {"inserted": 0, "updated": 0, "unchanged": 3}
+
+    changed = [_question(explanation="Two and two make four."), questions[1], _question("What is five plus five?")]
+    assert publish(changed, batch_size=10) == {"inserted": 1, "updated": 1, "unchanged": 1}
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT count(*), count(DISTINCT content_hash), count(*) FILTER (WHERE explanation IS NOT NULL) "
+            "FROM public.questions WHERE skill_id = %s",
+            (skill_id,),
+        )
+        assert cur.fetchone() == (4, 4, 1)
+        cur.execute(
+            "SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_questions_content_hash'"
+        )
+        assert "UNIQUE" in cur.fetchone()[0]
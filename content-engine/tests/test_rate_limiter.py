@@ -0,0 +1,146 @@
+import asyncio
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import rate_limiter
+from src.utils.rate_limiter import RateLimiter, TokenBucket, aretry_call, get_retry_after, retry_call
+
+
+class FakeTime:
+    """Stands in for the time module: sleeping advances the clock instantly."""
+
+    def __init__(self):
+        self.now = 1_000.0
+        self.epoch = 1_700_000_000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.epoch + self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+
+    async def async_sleep(seconds):
+        fake.sleep(seconds)
+
+    monkeypatch.setattr(rate_limiter, "time", fake)
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(sleep=async_sleep))
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: 0.0)  # No jitter
+    return fake
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def flaky(failures, result="ok"):
+    """A call that raises the given errors in turn, then returns `result`."""
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return result
+
+    call.calls = calls
+    return call
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)  # One token per second
+
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)  # One token in debt
+    assert bucket.reserve(5) == pytest.approx(3.0)  # Capped at a full bucket
+
+    clock.now += 10
+    assert bucket.reserve(2) == 0.0  # Refilled, but never beyond capacity
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_limiter_backs_off_after_throttle_and_recovers(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1_000_000)
+    full_rate = limiter._requests.rate
+
+    limiter.penalize(retry_after=10)
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(10.0)]  # Every caller waits out the Retry-After
+    assert limiter._requests.rate == pytest.approx(full_rate * RateLimiter.BACKOFF_FACTOR)
+
+    for _ in range(10):
+        limiter.penalize(retry_after=0)
+    assert limiter._requests.rate == pytest.approx(full_rate * RateLimiter.MIN_RATE_FACTOR)
+
+    for _ in range(100):
+        limiter.record_success()
+    assert limiter._requests.rate == pytest.approx(full_rate)
+
+
+def test_retry_after_seconds_milliseconds_and_http_date(clock):
+    assert get_retry_after(ProviderError(429, {"retry-after": "7"})) == 7.0
+    assert get_retry_after(ProviderError(429, {"retry-after-ms": "1500"})) == 1.5
+    http_date = formatdate(clock.time() + 30, usegmt=True)
+    assert get_retry_after(ProviderError(503, {"retry-after": http_date})) == pytest.approx(30.0)
+    past = formatdate(clock.time() - 30, usegmt=True)
+    assert get_retry_after(ProviderError(503, {"retry-after": past})) == 0.0
+    assert get_retry_after(Exception("Quota exceeded, retry in 12.5s")) == 12.5
+    assert get_retry_after(ProviderError(500)) is None
+
+
+def test_retry_call_honors_retry_after_and_records_success(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1_000_000)
+    call = flaky([ProviderError(429, {"retry-after": "2"}), ProviderError(503)])
+
+    assert retry_call(call, limiter, base_delay=1.0) == "ok"
+    assert len(call.calls) == 3
+    # Retry-After 2s (sleep plus the limiter pause it set), then 0s of zero-jitter backoff
+    assert sum(clock.sleeps) == pytest.approx(2.0)
+    assert limiter._rate_factor == pytest.approx(RateLimiter.BACKOFF_FACTOR * RateLimiter.RECOVERY_FACTOR)
+
+
+def test_retry_call_gives_up_after_max_retries(clock):
+    call = flaky([ProviderError(503)] * 10)
+    with pytest.raises(ProviderError):
+        retry_call(call, max_retries=3)
+    assert len(call.calls) == 4 and len(clock.sleeps) == 3
+
+    call = flaky([ValueError("bad request")])
+    with pytest.raises(ValueError):
+        retry_call(call, max_retries=3)
+    assert len(call.calls) == 1  # Not retryable
+
+
+def test_aretry_call_retries_and_gives_up(clock):
+    def make(failures):
+        sync = flaky(failures)
+
+        async def call():
+            return sync()
+
+        call.calls = sync.calls
+        return call
+
+    call = make([ProviderError(429, {"retry-after": "4"})])
+    assert asyncio.run(aretry_call(call, max_retries=2)) == "ok"
+    assert clock.sleeps == [4.0]
+
+    call = make([ProviderError(500)] * 5)
+    with pytest.raises(ProviderError):
+        asyncio.run(aretry_call(call, max_retries=2))
+    assert len(call.calls) == 3
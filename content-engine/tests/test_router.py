@@ -0,0 +1,52 @@
+import asyncio
+
+from src.generators.router import MIN_LATENCY_SAMPLES, RouterGenerator
+from src.validators.question_schema import DifficultyLevel
+
+TEXT = "Photosynthesis converts light energy into chemical energy stored in glucose molecules."
+DISTRIBUTION = {DifficultyLevel.MEDIUM: 3}
+
+
+def test_fails_over_to_next_backend():
+    router = RouterGenerator(["mock:error_rate=1", "mock:seed=1"], backend_retries=0, failure_threshold=2)
+
+    for i in range(3):
+        response = router.generate(f"{TEXT} {i}", "skill", DISTRIBUTION)
+        assert response.total_generated == 3
+        assert response.model_used == "mock:seed=1"
+
+    failing, healthy = router.backends
+    assert failing.failures == 1  # ranked behind the healthy backend after its first failure
+    assert [stats["model"] for stats in router.backend_stats()] == ["mock:seed=1", "mock:error_rate=1"]
+
+
+def test_hedges_slow_calls():
+    router = RouterGenerator(["mock:latency=0.5", "mock:latency=0.01"], hedge=True, hedge_after=0.05)
+
+    response = router.generate(TEXT, "skill", DISTRIBUTION)
+    assert response.model_used == "mock:latency=0.01"
+    assert response.generation_time_ms < 400
+
+    async_response = asyncio.run(router.agenerate(TEXT + " async", "skill", DISTRIBUTION))
+    assert async_response.model_used == "mock:latency=0.01"
+
+
+
+def test_hedge_after_failover_uses_fallback_latency():
+    def router():
+        router = RouterGenerator(
+            ["mock:error_rate=1", "mock:latency=0.5", "mock:latency=0.01"],
+            hedge=True, backend_retries=0,
+        )
+        failing, slow, fast = router.backends
+        # Ranked failing, slow, fast; only the slow fallback has a latency history
+        slow.latency, fast.latency = 0.02, 0.03
+        slow._latencies.extend([0.05] * MIN_LATENCY_SAMPLES)
+        return router
+
+    response = router().generate(TEXT, "skill", DISTRIBUTION)
+    assert response.model_used == "mock:latency=0.01"
+    assert response.generation_time_ms < 400
+
+    async_response = asyncio.run(router().agenerate(TEXT, "skill", DISTRIBUTION))
+    assert async_response.model_used == "mock:latency=0.01"
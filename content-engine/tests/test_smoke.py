@@ -3,8 +3,19 @@ import importlib
 def test_core_modules_importable():
     modules = [
         'src.generators.question_generator',
+        'src.generators.mock_provider',
+        'src.generators.router',
         'src.parsers.document_parser',
         'src.validators.question_schema',
+        'src.validators.batch_validator',
+        'src.utils.chunking',
+        'src.utils.output',
+        'src.utils.dedup',
+        'src.utils.metrics',
+        'src.pipeline',
+        'src.batch',
+        'src.publish',
+        'src.worker',
     ]
     for mod in modules:
         importlib.import_module(mod)
@@ -0,0 +1,59 @@
+"""
+Startup cost of the package and the CLI.
+
+Provider SDKs and document backends must not load until a code path uses
+them. Run with `pytest tests/test_startup.py -s` to see timings; set
+STARTUP_MAX_MS to fail when `extract --help` gets slower than that.
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["google.generativeai", "openai", "tiktoken", "PyPDF2", "docx", "PIL", "psycopg2"]
+
+# Runs the CLI, then reports which heavy modules it imported on the last stderr line
+PROBE = """
+import sys, json, runpy
+sys.argv = {argv!r}
+try:
+    runpy.run_module("src", run_name="__main__")
+except SystemExit:
+    pass
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]), file=sys.stderr)
+"""
+
+
+def _loaded_after(argv):
+    """Run the CLI in a fresh interpreter; return (seconds, heavy modules it loaded)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(argv=argv, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def test_package_import_is_lazy():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, src; print(sorted(m for m in sys.modules if m.startswith('src.')))"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+    import src
+    assert src.QuestionGenerator.__name__ == "QuestionGenerator"
+
+
+def test_cli_startup_skips_backends():
+    elapsed, loaded = _loaded_after(["src", "extract", "--help"])
+    print(f"\nextract --help: {elapsed * 1000:.0f}ms")
+    assert loaded == []
+
+    max_ms = float(os.getenv("STARTUP_MAX_MS", "0"))
+    assert not max_ms or elapsed * 1000 <= max_ms, f"CLI startup took {elapsed * 1000:.0f}ms"
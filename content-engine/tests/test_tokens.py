@@ -0,0 +1,50 @@
+from src.utils.tokens import (
+    HeuristicTokenCounter,
+    TokenCounter,
+    context_window,
+    estimate_cost,
+    get_token_counter,
+)
+
+PROSE = "The mitochondria is the powerhouse of the cell."
+MATH = "Solve 3x^2 + 12x - 15 = 0 for x, given f(x) = (x+5)(x-1)."
+
+
+def test_heuristic_counts_math_densely():
+    counter = HeuristicTokenCounter()
+    # Symbols and digits cost far more per character than prose
+    assert counter.count(MATH) / len(MATH) > counter.count(PROSE) / len(PROSE)
+    assert counter.count(MATH) > len(MATH.split()) * 1.5
+    assert counter.count("") == 0
+
+
+def test_gemini_profile_splits_digits():
+    gemini = get_token_counter("gemini", "gemini-1.5-flash")
+    openai = HeuristicTokenCounter(digits_per_token=3)
+    assert gemini.count("123456") == 6
+    assert openai.count("123456") == 2
+
+
+def test_truncate_fits_budget():
+    for counter in (TokenCounter(), HeuristicTokenCounter()):
+        text = MATH * 20
+        cut = counter.truncate(text, 50)
+        assert counter.count(cut) <= 50
+        assert text.startswith(cut)
+        assert counter.count(text[:len(cut) + 1]) > 50
+
+
+def test_observe_calibrates_scale():
+    counter = HeuristicTokenCounter()
+    estimate = counter.count(PROSE * 10)
+    counter.observe(estimate, int(estimate * 1.2))
+    assert abs(counter.count(PROSE * 10) - estimate * 1.2) <= 1
+    counter.observe(10, 1_000_000)
+    assert counter.scale == 2.0
+
+
+def test_pricing_and_context_by_prefix():
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0) == 0.15
+    assert estimate_cost("gpt-4o", 0, 1_000_000) == 10.0
+    assert estimate_cost("unknown-model", 10, 10) is None
+    assert context_window("gemini-1.5-flash-002") == 1_048_576
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+import threading
+import urllib.request
+
+from docx import Document
+
+from src.generators.question_generator import QuestionGenerator
+from src.parsers.document_parser import DocumentParser
+from src.worker import JobQueue, Worker, make_http_server
+
+SKILL = "11111111-1111-1111-1111-111111111111"
+TEXT = "Photosynthesis converts light energy into chemical energy stored in glucose molecules."
+
+
+def test_worker_drains_queue(tmp_path):
+    document = Document()
+    document.add_paragraph(TEXT)
+    document.save(tmp_path / "lesson.docx")
+
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    extract = queue.submit("extract", {"input": str(tmp_path / "lesson.docx")})
+    generate = queue.submit("generate", {"text": TEXT, "skill_id": SKILL, "difficulty": {"easy": 2}})
+    pipeline = queue.submit("pipeline", {
+        "input": str(tmp_path / "lesson.docx"), "skill_id": SKILL, "difficulty": "medium:3",
+        "output": str(tmp_path / "out" / "lesson.json"),
+    })
+    broken = queue.submit("pipeline", {"input": str(tmp_path / "lesson.docx")})
+
+    worker = Worker(DocumentParser(), QuestionGenerator(model="mock"), queue, concurrency=2, poll_interval=0.01)
+    assert worker.serve(drain=True) == {"completed": 3, "failed": 1}
+
+    assert queue.get(extract)["result"]["text"] == TEXT
+    assert queue.get(generate)["result"]["metadata"]["total_generated"] == 2
+    assert queue.get(pipeline)["result"]["total_generated"] == 3
+    assert json.loads((tmp_path / "out" / "lesson.json").read_text())["metadata"]["skill_id"] == SKILL
+    assert "skill_id" in queue.get(broken)["error"]
+    assert queue.counts() == {"queued": 0, "running": 0, "done": 3, "failed": 1}
+
+
+def test_job_fails_when_its_result_cannot_be_stored(tmp_path, monkeypatch):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job_id = queue.submit("generate", {"text": TEXT, "skill_id": SKILL, "difficulty": {"easy": 1}})
+
+    def locked(job_id, result):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(queue, "complete", locked)
+    worker = Worker(DocumentParser(), QuestionGenerator(model="mock"), queue, poll_interval=0.01)
+    assert worker.serve(drain=True) == {"completed": 0, "failed": 1}
+
+    job = queue.get(job_id)
+    assert job["status"] == "failed" and "database is locked" in job["error"]
+
+
+def test_http_front_end(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    worker = Worker(DocumentParser(), QuestionGenerator(model="mock"), queue, poll_interval=0.01)
+    server = make_http_server(worker, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    serving = threading.Thread(target=worker.serve)
+    serving.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        request = urllib.request.Request(
+            f"{url}/jobs", method="POST",
+            data=json.dumps({"kind": "generate", "params": {"text": TEXT, "skill_id": SKILL, "difficulty": "hard:1"}}).encode()
+        )
+        job_id = json.load(urllib.request.urlopen(request))["id"]
+        job = queue.wait(job_id, timeout=10, poll_interval=0.01)
+        assert job["status"] == "done"
+        assert json.load(urllib.request.urlopen(f"{url}/jobs/{job_id}"))["result"]["metadata"]["total_generated"] == 1
+        assert json.load(urllib.request.urlopen(f"{url}/health"))["queue"]["done"] == 1
+    finally:
+        worker.stop()
+        serving.join()
+        server.shutdown()
@@ -6,16 +6,73 @@ Executes commands from JSON manifest files without user interaction.
 USAGE:
   python ops_runner.py <tasks.json>     # Execute a specific manifest
   python ops_runner.py --watch [dir]    # Watch directory for tasks.json files
+  python ops_runner.py --report [N]     # Show the N slowest tasks from the run history
+
+OPTIONS:
+  -j, --jobs N      Run up to N independent tasks at once (default: 1)
+  --fail-fast       Stop all tasks at the first failure
+  --cache-dir DIR   Task result cache (default: $OPS_RUNNER_CACHE_DIR or .ops_cache)
+  --no-cache        Always run every task
+  --log-dir DIR     Task logs and run history (default: $OPS_RUNNER_LOG_DIR or .ops_logs)
+  --no-log          Do not write task logs or history
+  --debounce SEC    Watch mode: wait for SEC seconds of quiet before running (default: 0.5)
+  --include PATH    Watch mode: only watch PATH under the watch directory (repeatable)
+  --exclude PATTERN Watch mode: gitignore-style pattern to ignore (repeatable)
+  --poll [SEC]      Watch mode: poll every SEC seconds (default: 1) instead of
+                    using OS notifications
+
+Tasks may declare an "id" and "depends_on": ["other-id", ...]; a task starts
+once its dependencies have succeeded. Output lines are prefixed with the task id.
+
+Tasks that declare "inputs" (globs, relative to the task cwd) are skipped when
+the command, cwd and input files match an earlier successful run; files
+matching their "outputs" globs are saved with the result and restored if
+missing or changed.
+
+Each task's output is also written to <log-dir>/runs/<run-id>/<task-id>.log
+as it arrives, and one JSON line per task (status, exit code, wall time, CPU
+time and peak RSS) is appended to <log-dir>/history.jsonl.
+
+In watch mode, bursts of writes to a tasks.json are coalesced into one run,
+a manifest is only run once per distinct content, and a newer version of a
+manifest stops the run of the older one. Directories matching the exclude
+patterns (built-in defaults such as .git/ and node_modules/, a .opsignore file
+in the watch directory, and --exclude) are never watched, and their events are
+dropped before they reach the handler. If OS notifications are unavailable,
+watch mode falls back to polling.
 
 The AI agent writes tasks.json, this script executes them automatically.
 """
 
+import argparse
+import glob
+import hashlib
 import json
+import os
+import re
 import shlex
+import shutil
 import subprocess
 import sys
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+DEFAULT_CACHE_DIR = Path(os.getenv('OPS_RUNNER_CACHE_DIR', '.ops_cache'))
+DEFAULT_LOG_DIR = Path(os.getenv('OPS_RUNNER_LOG_DIR', '.ops_logs'))
+
+# Never worth watching; extended by .opsignore in the watch directory and --exclude
+DEFAULT_WATCH_EXCLUDES = [
+    '.git/', 'node_modules/', '.dart_tool/', 'build/', 'dist/',
+    '__pycache__/', '.venv/', 'venv/', '.ops_cache/', '.ops_logs/',
+]
+IGNORE_FILE = '.opsignore'
+DEFAULT_POLL_INTERVAL = 1.0
+PROCESSED_HASHES_PER_FILE = 32  # Recent manifest versions remembered per tasks.json
 
 # Fix Windows console encoding for Unicode
 if sys.platform == 'win32':
@@ -24,161 +81,1019 @@ if sys.platform == 'win32':
 
 try:
     from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
     from watchdog.events import FileSystemEventHandler
 except ImportError:
     print("Warning: watchdog not installed. Watch mode will not work.")
     print("Install with: pip install watchdog")
     Observer = None
+    PollingObserver = None
     FileSystemEventHandler = object  # Fallback for class inheritance
 
 
-def execute_manifest(manifest_path: str) -> bool:
+@dataclass
+class Task:
+    """One manifest entry, normalized."""
+    id: str
+    description: str
+    command: Union[str, List[str]]
+    cwd: Optional[str]
+    depends_on: List[str]
+    position: int  # 1-based position in the manifest
+    inputs: List[str] = field(default_factory=list)   # Globs the result depends on
+    outputs: List[str] = field(default_factory=list)  # Globs of files the task produces
+
+
+def load_manifest(manifest_path: str) -> Optional[List[Task]]:
     """
-    Execute commands from a JSON manifest file.
+    Read and validate a JSON manifest.
+    
+    Each task needs a `command`; `description`, `cwd`, `id`, `depends_on`
+    (a list of other task ids), `inputs` and `outputs` (lists of globs) are
+    optional. Tasks without an id get "task-<position>".
     
     Args:
         manifest_path: Path to the JSON file containing commands
         
     Returns:
-        True if all commands executed successfully, False otherwise
+        The runnable tasks, or None if the manifest is invalid
     """
     try:
         with open(manifest_path, 'r', encoding='utf-8') as f:
             manifest = json.load(f)
     except FileNotFoundError:
         print(f"Error: Manifest file not found: {manifest_path}")
-        return False
+        return None
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON in manifest file: {e}")
-        return False
+        return None
     
     if not isinstance(manifest, list):
         print("Error: Manifest must be a JSON array of command objects")
-        return False
+        return None
     
-    success = True
-    for idx, task in enumerate(manifest, 1):
-        if not isinstance(task, dict):
+    tasks: List[Task] = []
+    for idx, entry in enumerate(manifest, 1):
+        if not isinstance(entry, dict):
             print(f"Warning: Task {idx} is not a dictionary, skipping")
             continue
         
-        command = task.get('command')
-        cwd = task.get('cwd')
-        description = task.get('description', f'Task {idx}')
-        
-        if not command:
+        if not entry.get('command'):
             print(f"Warning: Task {idx} missing 'command' field, skipping")
             continue
         
-        print(f"\n[{idx}/{len(manifest)}] {description}")
-        print(f"  Executing: {command}")
-        if cwd:
-            print(f"  Working directory: {cwd}")
+        tasks.append(Task(
+            id=str(entry.get('id') or f'task-{idx}'),
+            description=entry.get('description', f'Task {idx}'),
+            command=entry['command'],
+            cwd=entry.get('cwd'),
+            depends_on=_string_list(entry.get('depends_on')),
+            position=idx,
+            inputs=_string_list(entry.get('inputs')),
+            outputs=_string_list(entry.get('outputs')),
+        ))
+    
+    ids = [task.id for task in tasks]
+    duplicates = sorted({task_id for task_id in ids if ids.count(task_id) > 1})
+    if duplicates:
+        print(f"Error: Duplicate task ids: {', '.join(duplicates)}")
+        return None
+    
+    for task in tasks:
+        unknown = [dep for dep in task.depends_on if dep not in ids]
+        if unknown:
+            print(f"Error: Task '{task.id}' depends on unknown task(s): {', '.join(unknown)}")
+            return None
+    
+    cycle = _find_cycle(tasks)
+    if cycle:
+        print(f"Error: Dependency cycle: {' -> '.join(cycle)}")
+        return None
+    
+    return tasks
+
+
+def _string_list(value) -> List[str]:
+    """A manifest field that may be one string or a list of strings."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(item) for item in value]
+
+
+def _find_cycle(tasks: List[Task]) -> Optional[List[str]]:
+    """Task ids forming a dependency cycle, or None."""
+    graph = {task.id: task.depends_on for task in tasks}
+    state: Dict[str, int] = {}  # 1 = on the current path, 2 = finished
+    
+    def visit(task_id: str, path: List[str]) -> Optional[List[str]]:
+        state[task_id] = 1
+        for dep in graph[task_id]:
+            if state.get(dep) == 1:
+                return path[path.index(dep):] + [dep]
+            if dep not in state:
+                found = visit(dep, path + [dep])
+                if found:
+                    return found
+        state[task_id] = 2
+        return None
+    
+    for task_id in graph:
+        if task_id not in state:
+            found = visit(task_id, [task_id])
+            if found:
+                return found
+    return None
+
+
+def build_command(command: Union[str, List[str]]) -> List[str]:
+    """
+    Turn a manifest command into an argument list for subprocess.
+    
+    Raises:
+        ValueError: If the command is neither a string nor a list
+    """
+    # SECURITY: Commands always run with shell=False to prevent shell injection attacks.
+    # This prevents malicious commands like: "npm install; rm -rf /"
+    if isinstance(command, str):
+        # On Windows, shlex.split() doesn't handle paths with backslashes well,
+        # so the string is handed to PowerShell as a single argument
+        if sys.platform == 'win32':
+            return ['powershell.exe', '-NoProfile', '-Command', command]
+        # On Unix, use shlex for safe parsing
+        return shlex.split(command)
+    if isinstance(command, list):
+        # Already a list of arguments (safest form)
+        return [str(arg) for arg in command]
+    raise ValueError(f"Invalid command type: {type(command)}")
+
+
+class TaskCache:
+    """
+    Results of successful tasks, keyed by a fingerprint of their inputs.
+    
+    The fingerprint covers the command, the resolved cwd and the path and
+    content of every file matched by the task's `inputs` globs. File
+    digests are remembered by (size, mtime), so unchanged files are not
+    re-read. Files matching `outputs` are copied into the entry, so a hit
+    can put back outputs that were deleted or modified since.
+    """
+    
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR):
+        self.root = Path(root)
+        self._digests_path = self.root / 'digests.json'
+        self._digests: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        
+        try:
+            self._digests = json.loads(self._digests_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            pass
+    
+    def fingerprint(self, task: Task) -> Optional[str]:
+        """Fingerprint of a task's command, cwd and inputs, or None if it declares no inputs."""
+        if not task.inputs:
+            return None
         
+        base = _task_dir(task)
+        h = hashlib.sha256()
+        h.update(json.dumps([task.command, str(base)]).encode('utf-8'))
+        for relative in _expand(base, task.inputs):
+            h.update(f"\0{relative}\0{self._digest(base / relative)}".encode('utf-8'))
+        return h.hexdigest()
+    
+    def restore(self, task: Task, fingerprint: str) -> bool:
+        """
+        Look up a successful run with this fingerprint.
+        
+        Returns:
+            True on a hit, after restoring any missing or changed outputs
+        """
+        entry = self.root / 'tasks' / fingerprint
         try:
-            # SECURITY: Use shell=False to prevent shell injection attacks
-            # Parse command string into arguments safely using shlex
-            # This prevents malicious commands like: "npm install; rm -rf /"
-            if isinstance(command, str):
-                # Parse string command into argument list
-                # On Windows, shlex.split() doesn't handle paths with backslashes well
-                # So we use platform-specific parsing
-                if sys.platform == 'win32':
-                    # On Windows, keep as string but use shell=False with PowerShell
-                    cmd_args = ['powershell.exe', '-NoProfile', '-Command', command]
-                else:
-                    # On Unix, use shlex for safe parsing
-                    cmd_args = shlex.split(command)
-            elif isinstance(command, list):
-                # Already a list of arguments (safest form)
-                cmd_args = command
-            else:
-                print(f"  ✗ Invalid command type: {type(command)}")
-                success = False
+            record = json.loads((entry / 'record.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+        
+        base = _task_dir(task)
+        stored = entry / 'outputs'
+        # A hit is only usable if every recorded output can be put back
+        if not all((stored / relative).is_file() for relative in record['outputs']):
+            return False
+        
+        for relative in record['outputs']:
+            target = base / relative
+            source = stored / relative
+            if target.is_file() and self._digest(target) == self._digest(source):
                 continue
-            
-            subprocess.run(
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+        return True
+    
+    def store(self, task: Task, fingerprint: str) -> None:
+        """Record a successful run and save copies of its outputs."""
+        base = _task_dir(task)
+        entry = self.root / 'tasks' / fingerprint
+        tmp = entry.with_name(f"{fingerprint}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        
+        outputs = _expand(base, task.outputs)
+        for relative in outputs:
+            target = tmp / 'outputs' / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(base / relative, target)
+        
+        tmp.mkdir(parents=True, exist_ok=True)
+        (tmp / 'record.json').write_text(json.dumps({
+            'task': task.id,
+            'command': task.command,
+            'cwd': str(base),
+            'outputs': outputs,
+            'finished_at': time.time(),
+        }, indent=2), encoding='utf-8')
+        
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+    
+    def save(self) -> None:
+        """Persist the file digest index for the next run."""
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self._digests_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(self._digests), encoding='utf-8')
+            os.replace(tmp, self._digests_path)
+    
+    def _digest(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            known = self._digests.get(key)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self._digests[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+
+def _task_dir(task: Task) -> Path:
+    return Path(task.cwd).resolve() if task.cwd else Path.cwd()
+
+
+def _expand(base: Path, patterns: List[str]) -> List[str]:
+    """Sorted files (as paths relative to `base`) matching any of the globs."""
+    files = set()
+    for pattern in patterns:
+        for match in glob.glob(pattern, root_dir=base, recursive=True):
+            if (base / match).is_file():
+                files.add(Path(match).as_posix())
+    return sorted(files)
+
+
+class RunLog:
+    """
+    Per-task log files and the append-only task history for one manifest run.
+    
+    Logs go to `root`/runs/<run id>/<task id>.log and are written line by
+    line as output arrives. Every task, including skipped and cached ones,
+    adds one JSON line to `root`/history.jsonl.
+    """
+    
+    def __init__(self, root: Path, manifest_path: str):
+        self.root = Path(root)
+        self.manifest = str(Path(manifest_path).resolve())
+        self.run_id = time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}-{threading.get_ident() % 10000:04d}'
+        self.history_path = self.root / 'history.jsonl'
+        self._lock = threading.Lock()
+    
+    def open_task_log(self, task: Task):
+        """A line-buffered text file for the task's output."""
+        path = self.root / 'runs' / self.run_id / f"{re.sub(r'[^A-Za-z0-9._-]', '_', task.id)}.log"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        log_file = open(path, 'w', encoding='utf-8', buffering=1)
+        log_file.write(f"# {task.description}\n# command: {task.command}\n")
+        if task.cwd:
+            log_file.write(f"# cwd: {task.cwd}\n")
+        return log_file
+    
+    def record(self, task: Task, status: str, **details) -> None:
+        """Append one task outcome ("ok", "failed", "cached" or "skipped") to the history."""
+        entry = {
+            'run_id': self.run_id,
+            'manifest': self.manifest,
+            'task': task.id,
+            'description': task.description,
+            'status': status,
+            'finished_at': round(time.time(), 3),
+            **details,
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.history_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+def _wait_with_usage(process: subprocess.Popen) -> Tuple[int, Dict]:
+    """
+    Wait for a process, returning its exit code and resource usage.
+    
+    Usage covers the process and every descendant it waited for, so
+    commands run through a shell are measured fully. It is empty where
+    os.wait4 is unavailable (Windows).
+    """
+    if not hasattr(os, 'wait4'):
+        return process.wait(), {}
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:  # Already reaped
+        return process.wait(), {}
+    
+    process.returncode = os.waitstatus_to_exitcode(status)
+    max_rss = usage.ru_maxrss // 1024 if sys.platform == 'darwin' else usage.ru_maxrss  # bytes on macOS
+    return process.returncode, {
+        'cpu_user_s': round(usage.ru_utime, 3),
+        'cpu_system_s': round(usage.ru_stime, 3),
+        'max_rss_kb': max_rss,
+    }
+
+
+class ManifestRunner:
+    """
+    Runs manifest tasks as a dependency graph.
+    
+    A task starts once everything in its `depends_on` has succeeded, with
+    up to `jobs` tasks running at once; jobs=1 runs them one at a time in
+    manifest order. Task output is streamed line by line, prefixed with the
+    task id. When a task fails, its dependents are skipped; with fail_fast,
+    running tasks are also stopped and nothing new is started.
+    With a cache, tasks that declare inputs are skipped when unchanged;
+    with a run log, output and timings of every task are recorded.
+    """
+    
+    def __init__(
+        self,
+        tasks: List[Task],
+        jobs: int = 1,
+        fail_fast: bool = False,
+        cache: Optional[TaskCache] = None,
+        log: Optional[RunLog] = None
+    ):
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        
+        self.tasks = tasks
+        self.jobs = jobs
+        self.fail_fast = fail_fast
+        self.cache = cache
+        self.log = log
+        self.results: Dict[str, str] = {}  # task id -> "ok", "failed" or "skipped"
+        
+        self._print_lock = threading.Lock()
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._processes_lock = threading.Lock()
+        self._aborted = threading.Event()
+        self.stop_reason: Optional[str] = None
+    
+    def run(self) -> bool:
+        """
+        Run every task whose dependencies succeed.
+        
+        Returns:
+            True if all tasks executed successfully, False otherwise
+        """
+        pending = list(self.tasks)
+        running: Dict[Future, Task] = {}
+        
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                if not self._aborted.is_set():
+                    for task in self._ready(pending):
+                        if len(running) >= self.jobs:
+                            break
+                        pending.remove(task)
+                        running[executor.submit(self._run_task, task)] = task
+                
+                if not running:
+                    # Nothing can start: every remaining task waits on a failure
+                    for task in pending:
+                        self._skip(task)
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    ok = future.result()
+                    self.results[task.id] = "ok" if ok else "failed"
+                    if not ok and self.fail_fast and not self._aborted.is_set():
+                        self.stop("fail-fast")
+        
+        if self.cache is not None:
+            try:
+                self.cache.save()
+            except OSError as e:
+                self._print(f"Warning: Could not save task cache: {e}")
+        
+        return all(result == "ok" for result in self.results.values())
+    
+    def _ready(self, pending: List[Task]) -> List[Task]:
+        """Pending tasks whose dependencies all succeeded, skipping those that can never run."""
+        ready = []
+        for task in list(pending):
+            states = [self.results.get(dep) for dep in task.depends_on]
+            if any(state in ("failed", "skipped") for state in states):
+                pending.remove(task)
+                self._skip(task)
+            elif all(state == "ok" for state in states):
+                ready.append(task)
+        return ready
+    
+    def _skip(self, task: Task) -> None:
+        self.results[task.id] = "skipped"
+        self._record(task, "skipped")
+        self._print(f"\n[{task.position}/{len(self.tasks)}] {task.description}\n  ⏭ Skipped (dependency failed or run aborted)")
+    
+    def stop(self, reason: str) -> None:
+        """Terminate running tasks and start no more. Safe to call from any thread."""
+        with self._processes_lock:
+            if self._aborted.is_set():
+                return
+            self.stop_reason = reason
+            self._aborted.set()
+            self._print(f"\n⛔ Stopping remaining tasks ({reason})")
+            for process in self._processes.values():
+                process.terminate()
+    
+    def _run_task(self, task: Task) -> bool:
+        lines = [f"\n[{task.position}/{len(self.tasks)}] {task.description}", f"  Executing: {task.command}"]
+        if task.cwd:
+            lines.append(f"  Working directory: {task.cwd}")
+        self._print("\n".join(lines))
+        
+        try:
+            cmd_args = build_command(task.command)
+        except ValueError as e:
+            self._print(f"[{task.id}] ✗ {e}")
+            self._record(task, "failed", error=str(e))
+            return False
+        
+        fingerprint = self._cached(task)
+        if fingerprint is True:
+            self._record(task, "cached")
+            return True
+        
+        log_file = None
+        if self.log is not None:
+            try:
+                log_file = self.log.open_task_log(task)
+            except OSError as e:
+                self._print(f"[{task.id}] Warning: Could not open task log: {e}")
+        
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(
                 cmd_args,
                 shell=False,  # SECURITY: Never use shell=True
-                cwd=cwd if cwd else None,
-                check=True,
-                capture_output=False,
-                text=True
+                cwd=task.cwd if task.cwd else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding='utf-8',
+                errors='replace',
+                bufsize=1
             )
-            print("  ✓ Completed successfully")
-        except subprocess.CalledProcessError as e:
-            print(f"  ✗ Failed with exit code {e.returncode}")
-            success = False
         except Exception as e:
-            print(f"  ✗ Error executing command: {e}")
-            success = False
+            self._print(f"[{task.id}] ✗ Error executing command: {e}")
+            if log_file:
+                log_file.close()
+            self._record(task, "failed", error=str(e))
+            return False
+        
+        with self._processes_lock:
+            self._processes[task.id] = process
+            if self._aborted.is_set():
+                process.terminate()
+        try:
+            for line in process.stdout:
+                self._print(f"[{task.id}] {line.rstrip()}")
+                if log_file:
+                    log_file.write(line)
+            returncode, usage = _wait_with_usage(process)
+        finally:
+            with self._processes_lock:
+                self._processes.pop(task.id, None)
+            if log_file:
+                log_file.close()
+        
+        self._record(
+            task,
+            "ok" if returncode == 0 else "failed",
+            started_at=round(started, 3),
+            wall_s=round(time.perf_counter() - start, 3),
+            exit_code=returncode,
+            log=log_file.name if log_file else None,
+            **usage
+        )
+        
+        if returncode == 0:
+            self._print(f"[{task.id}] ✓ Completed successfully")
+            if fingerprint:
+                try:
+                    self.cache.store(task, fingerprint)
+                except OSError as e:
+                    self._print(f"[{task.id}] Warning: Could not cache result: {e}")
+            return True
+        self._print(f"[{task.id}] ✗ Failed with exit code {returncode}")
+        return False
+    
+    def _cached(self, task: Task) -> Union[str, bool, None]:
+        """
+        True when the task's cached result was restored; otherwise the
+        fingerprint to store after a successful run (None when not cacheable).
+        """
+        if self.cache is None or not task.inputs:
+            return None
+        try:
+            fingerprint = self.cache.fingerprint(task)
+            if self.cache.restore(task, fingerprint):
+                self._print(f"[{task.id}] ⚡ Cached (inputs unchanged)")
+                return True
+            return fingerprint
+        except OSError as e:
+            self._print(f"[{task.id}] Warning: Task cache unavailable: {e}")
+            return None
+    
+    def _record(self, task: Task, status: str, **details) -> None:
+        if self.log is None:
+            return
+        try:
+            self.log.record(task, status, **details)
+        except OSError as e:
+            self._print(f"[{task.id}] Warning: Could not write run history: {e}")
+    
+    def _print(self, message: str) -> None:
+        # Whole lines only, so concurrent tasks never interleave mid-line
+        with self._print_lock:
+            print(message, flush=True)
+
+
+def execute_manifest(
+    manifest_path: str,
+    jobs: int = 1,
+    fail_fast: bool = False,
+    cache: Optional[TaskCache] = None,
+    log_dir: Optional[Path] = None
+) -> bool:
+    """
+    Execute commands from a JSON manifest file.
+    
+    Args:
+        manifest_path: Path to the JSON file containing commands
+        jobs: Maximum number of tasks running at once
+        fail_fast: Stop everything at the first failure instead of
+            running all tasks that do not depend on it
+        cache: Skip tasks whose declared inputs are unchanged
+        log_dir: Where to write task logs and the run history
+        
+    Returns:
+        True if all commands executed successfully, False otherwise
+    """
+    tasks = load_manifest(manifest_path)
+    if tasks is None:
+        return False
     
-    return success
+    log = RunLog(log_dir, manifest_path) if log_dir is not None else None
+    return ManifestRunner(tasks, jobs=jobs, fail_fast=fail_fast, cache=cache, log=log).run()
 
 
 class TaskFileHandler(FileSystemEventHandler):
-    """Handler for detecting new tasks.json files."""
+    """
+    Handler for detecting new tasks.json files.
+    
+    Events only (re)start a per-file debounce timer, so the observer thread
+    never blocks. Once a file has been quiet for `debounce` seconds it is
+    hashed; content that already ran to completion (one of the last
+    PROCESSED_HASHES_PER_FILE versions of that file) is ignored, otherwise the
+    run is handed to a single background worker. A newer version of a manifest
+    stops the in-flight run of the older one, and queued runs of stale
+    content are dropped.
+    """
     
-    def __init__(self, watch_dir: Path):
+    def __init__(
+        self,
+        watch_dir: Path,
+        jobs: int = 1,
+        fail_fast: bool = False,
+        cache: Optional[TaskCache] = None,
+        debounce: float = 0.5,
+        log_dir: Optional[Path] = None
+    ):
         self.watch_dir = watch_dir
-        self.processed_files = {}  # Track file path -> last modified time
+        self.jobs = jobs
+        self.fail_fast = fail_fast
+        self.cache = cache
+        self.log_dir = log_dir
+        self.debounce = debounce
+        self.processed_files: Dict[Path, OrderedDict] = {}  # file path -> recently completed content hashes
+        
+        self._lock = threading.Lock()
+        self._timers: Dict[Path, threading.Timer] = {}
+        self._latest: Dict[Path, str] = {}  # file path -> newest content hash seen
+        self._running: Dict[Path, ManifestRunner] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ops-runner')
     
     def on_created(self, event):
         """Handle file creation events."""
-        if event.is_directory:
-            return
-        
-        file_path = Path(event.src_path)
-        if file_path.name == 'tasks.json':
-            time.sleep(0.5)  # Ensure file is fully written
-            self.process_file(file_path)
+        if not event.is_directory:
+            self.schedule(Path(event.src_path))
     
     def on_modified(self, event):
         """Handle file modification events."""
-        if event.is_directory:
+        if not event.is_directory:
+            self.schedule(Path(event.src_path))
+    
+    def on_moved(self, event):
+        """Handle editors that save by renaming a temporary file into place."""
+        if not event.is_directory:
+            self.schedule(Path(event.dest_path))
+    
+    def schedule(self, file_path: Path):
+        """Restart the debounce timer for a tasks.json file."""
+        if file_path.name != 'tasks.json':
+            return
+        
+        abs_path = file_path.resolve()
+        with self._lock:
+            timer = self._timers.get(abs_path)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.debounce, self._settled, args=(abs_path,))
+            timer.daemon = True
+            self._timers[abs_path] = timer
+            timer.start()
+    
+    def _settled(self, abs_path: Path):
+        """The file has been quiet for the debounce window: queue a run if its content is new."""
+        with self._lock:
+            self._timers.pop(abs_path, None)
+        
+        try:
+            digest = hashlib.sha256(abs_path.read_bytes()).hexdigest()
+        except OSError:
             return
         
-        file_path = Path(event.src_path)
-        if file_path.name == 'tasks.json':
-            time.sleep(0.5)
-            self.process_file(file_path)
+        with self._lock:
+            if self._latest.get(abs_path) == digest:
+                return
+            # Recorded even for content that already ran, so queued runs of an
+            # edit that was since reverted are dropped
+            self._latest[abs_path] = digest
+            runner = self._running.get(abs_path)
+            already_run = digest in self.processed_files.get(abs_path, ())
+        
+        if runner is not None:
+            runner.stop("superseded by a newer tasks.json")
+        if not already_run:
+            self._executor.submit(self.process_file, abs_path, digest)
     
-    def process_file(self, file_path: Path):
-        """Process a tasks.json file if it's new or modified."""
+    def process_file(self, file_path: Path, digest: Optional[str] = None):
+        """
+        Run a tasks.json file unless this content was already run.
+        
+        Args:
+            file_path: Manifest to run
+            digest: Content hash seen when the run was queued; the run is
+                dropped if the file has changed since
+        """
         abs_path = file_path.resolve()
         
         try:
-            current_mtime = abs_path.stat().st_mtime
-        except FileNotFoundError:
+            content = abs_path.read_bytes()
+        except OSError:
             return
+        current = hashlib.sha256(content).hexdigest()
         
-        # Skip if already processed with same modification time
-        if abs_path in self.processed_files:
-            if self.processed_files[abs_path] == current_mtime:
+        with self._lock:
+            if digest is not None and current != self._latest.get(abs_path, digest):
+                return  # A newer version is already queued
+            seen = self.processed_files.setdefault(abs_path, OrderedDict())
+            if current in seen:
+                seen.move_to_end(current)
                 return
         
         print(f"\n{'='*60}")
         print(f"🚀 Detected tasks.json: {abs_path}")
         print(f"{'='*60}")
         
-        success = execute_manifest(str(abs_path))
+        tasks = load_manifest(str(abs_path))
+        runner = None
+        success = False
+        if tasks is not None:
+            log = RunLog(self.log_dir, str(abs_path)) if self.log_dir is not None else None
+            runner = ManifestRunner(tasks, jobs=self.jobs, fail_fast=self.fail_fast, cache=self.cache, log=log)
+            with self._lock:
+                self._running[abs_path] = runner
+            try:
+                success = runner.run()
+            finally:
+                with self._lock:
+                    self._running.pop(abs_path, None)
+        
+        # Recorded only once the run has finished, so content whose run was
+        # stopped by a newer edit runs again if that edit is reverted
+        if runner is None or runner.stop_reason in (None, "fail-fast"):
+            with self._lock:
+                seen[current] = None
+                if len(seen) > PROCESSED_HASHES_PER_FILE:
+                    seen.popitem(last=False)
         
         if success:
             print("\n✅ All tasks completed successfully")
+        elif runner is not None and runner.stop_reason and runner.stop_reason != "fail-fast":
+            print(f"\n⏹ Run stopped: {runner.stop_reason}")
         else:
             print("\n❌ Some tasks failed")
-        
-        # Mark as processed with current modification time
-        self.processed_files[abs_path] = current_mtime
         print(f"{'='*60}\n")
+    
+    def close(self):
+        """Drop pending events, stop the current run and wait for the worker to exit."""
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            runners = list(self._running.values())
+        
+        for runner in runners:
+            runner.stop("watcher stopped")
+        self._executor.shutdown(wait=True, cancel_futures=True)
 
 
-def watch_mode(watch_dir: str = '.'):
+class IgnoreRules:
+    """
+    Gitignore-style path patterns.
+    
+    Patterns match paths relative to the watch directory. A trailing "/"
+    matches directories only; a pattern containing another "/" is anchored
+    to the watch directory, otherwise it matches a name at any depth. "*",
+    "?", "[...]" and "**" work as in .gitignore, "!" re-includes, the last
+    matching pattern wins, and nothing below an ignored directory is seen.
+    """
+    
+    def __init__(self, patterns: List[str]):
+        self._rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negated, directories only)
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern or pattern.startswith('#'):
+                continue
+            negated = pattern.startswith('!')
+            pattern = pattern.lstrip('!')
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            anchored = '/' in pattern
+            regex = _glob_to_regex(pattern.lstrip('/'))
+            if not anchored:
+                regex = f'(?:.*/)?{regex}'
+            self._rules.append((re.compile(f'^{regex}$'), negated, dir_only))
+    
+    @classmethod
+    def for_directory(cls, root: Path, extra: Optional[List[str]] = None) -> 'IgnoreRules':
+        """Built-in excludes, then `root`/.opsignore, then `extra`."""
+        patterns = list(DEFAULT_WATCH_EXCLUDES)
+        try:
+            patterns += (root / IGNORE_FILE).read_text(encoding='utf-8').splitlines()
+        except OSError:
+            pass
+        return cls(patterns + list(extra or []))
+    
+    def matches(self, relative: str, is_dir: bool) -> bool:
+        """Whether a path (relative, "/"-separated) or any directory above it is ignored."""
+        parts = relative.split('/')
+        for depth in range(1, len(parts) + 1):
+            is_parent = depth < len(parts)
+            if self._match('/'.join(parts[:depth]), is_dir or is_parent):
+                return True
+        return False
+    
+    def _match(self, relative: str, is_dir: bool) -> bool:
+        ignored = False
+        for regex, negated, dir_only in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(relative):
+                ignored = not negated
+        return ignored
+
+
+def _glob_to_regex(pattern: str) -> str:
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 1:]:
+            end = pattern.index(']', i + 1)
+            body = pattern[i + 1:end].replace('\\', '\\\\')
+            parts.append('[' + ('^' + body[1:] if body.startswith('!') else body) + ']')
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(parts)
+
+
+class ScopedWatcher(FileSystemEventHandler):
+    """
+    Watches include directories without descending into ignored ones.
+    
+    Each include root is split into the fewest watches that never cover an
+    ignored directory: subtrees free of ignored directories get one
+    recursive watch, directories containing one get a non-recursive watch
+    and are split further. Events for ignored paths are dropped here
+    before they reach `handler`; directories created or removed later are
+    watched or unwatched as they come and go, and a recursive watch that an
+    ignored directory appears under is split again.
+    
+    Uses the platform's native observer unless `poll_interval` is given,
+    and falls back to polling if native notifications cannot be set up
+    (for example an exhausted inotify watch limit or a network filesystem).
+    """
+    
+    def __init__(
+        self,
+        handler,
+        root: Path,
+        includes: List[Path],
+        ignore: IgnoreRules,
+        poll_interval: Optional[float] = None
+    ):
+        self.handler = handler
+        self.root = root
+        self.includes = includes
+        self.ignore = ignore
+        self.poll_interval = poll_interval
+        self.observer = None
+        self._watches: Dict[Path, Tuple[object, bool]] = {}  # directory -> (watch, recursive)
+        self._lock = threading.Lock()
+    
+    def start(self) -> None:
+        if self.poll_interval is None:
+            try:
+                self._start(Observer())
+                return
+            except OSError as e:
+                print(f"⚠️  File notifications unavailable ({e}); polling every {DEFAULT_POLL_INTERVAL}s instead")
+                self.poll_interval = DEFAULT_POLL_INTERVAL
+        self._start(PollingObserver(timeout=self.poll_interval))
+    
+    def _start(self, observer) -> None:
+        self.observer = observer
+        self._watches.clear()
+        try:
+            for include in self.includes:
+                self._watch_tree(include)
+            observer.start()
+        except OSError:
+            observer.stop()
+            raise
+    
+    def stop(self) -> None:
+        self.observer.stop()
+        self.observer.join()
+    
+    @property
+    def watch_count(self) -> int:
+        return len(self._watches)
+    
+    def dispatch(self, event) -> None:
+        """Filter and forward an observer event."""
+        paths = [Path(event.src_path)]
+        if getattr(event, 'dest_path', ''):
+            paths.append(Path(event.dest_path))
+        
+        visible = [path for path in paths if not self.is_ignored(path, event.is_directory)]
+        if event.is_directory:
+            if event.event_type in ('deleted', 'moved'):
+                self._unwatch(paths[0])
+            if event.event_type in ('created', 'moved'):
+                if self.is_ignored(paths[-1], True):
+                    self._exclude_new(paths[-1])
+                else:
+                    self._watch_new(paths[-1])
+        
+        if visible:
+            self.handler.dispatch(event)
+    
+    def is_ignored(self, path: Path, is_dir: bool) -> bool:
+        try:
+            relative = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return True
+        return relative != '.' and self.ignore.matches(relative, is_dir)
+    
+    def _plan(self, directory: Path) -> List[Tuple[Path, bool]]:
+        """(directory, recursive) watches covering `directory` minus ignored subtrees."""
+        try:
+            children = [Path(entry.path) for entry in os.scandir(directory)
+                        if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
+        
+        kept = [child for child in children if not self.is_ignored(child, True)]
+        plans = [self._plan(child) for child in kept]
+        if len(kept) == len(children) and all(plan == [(child, True)] for child, plan in zip(kept, plans)):
+            return [(directory, True)]
+        return [(directory, False)] + [watch for plan in plans for watch in plan]
+    
+    def _watch_tree(self, directory: Path) -> List[Tuple[Path, bool]]:
+        plan = self._plan(directory)
+        for path, recursive in plan:
+            watch = self.observer.schedule(self, str(path), recursive=recursive)
+            with self._lock:
+                self._watches[path] = (watch, recursive)
+        return plan
+    
+    def _watch_new(self, directory: Path) -> None:
+        with self._lock:
+            # Already covered by a recursive watch above it, or by its own
+            if any(path == directory or (recursive and directory.is_relative_to(path))
+                   for path, (_, recursive) in self._watches.items()):
+                return
+        try:
+            self._watch_tree(directory)
+        except OSError as e:
+            print(f"⚠️  Could not watch {directory}: {e}")
+    
+    def _exclude_new(self, directory: Path) -> None:
+        """An ignored directory appeared: re-plan the recursive watch covering it."""
+        with self._lock:
+            covering = [(path, watch) for path, (watch, recursive) in self._watches.items()
+                        if recursive and path != directory and directory.is_relative_to(path)]
+        
+        for path, old_watch in covering:
+            # Schedule the split watches before dropping the old one, so no events are missed
+            try:
+                plan = self._watch_tree(path)
+            except OSError as e:
+                print(f"⚠️  Could not re-plan watches for {path}: {e}")
+                continue
+            if (path, True) not in plan:
+                try:
+                    self.observer.unschedule(old_watch)
+                except KeyError:
+                    pass
+    
+    def _unwatch(self, directory: Path) -> None:
+        with self._lock:
+            gone = [path for path in self._watches if path == directory or path.is_relative_to(directory)]
+            watches = [self._watches.pop(path)[0] for path in gone]
+        for watch in watches:
+            try:
+                self.observer.unschedule(watch)
+            except KeyError:
+                pass
+
+
+def watch_mode(
+    watch_dir: str = '.',
+    jobs: int = 1,
+    fail_fast: bool = False,
+    cache: Optional[TaskCache] = None,
+    debounce: float = 0.5,
+    includes: Optional[List[str]] = None,
+    excludes: Optional[List[str]] = None,
+    poll_interval: Optional[float] = None,
+    log_dir: Optional[Path] = None
+):
     """
     Watch a directory for new tasks.json files and execute them automatically.
     
     Args:
         watch_dir: Directory to watch for tasks.json files
+        jobs: Maximum number of tasks running at once
+        fail_fast: Stop a manifest at its first failure
+        cache: Skip tasks whose declared inputs are unchanged
+        debounce: Seconds a tasks.json must stay unchanged before it runs
+        includes: Directories (relative to watch_dir) to watch instead of all of it
+        excludes: Extra gitignore-style patterns to ignore
+        poll_interval: Poll every this many seconds instead of using OS notifications
+        log_dir: Where to write task logs and the run history
     """
     if Observer is None:
         print("Error: Watch mode requires the 'watchdog' library.")
@@ -195,40 +1110,179 @@ def watch_mode(watch_dir: str = '.'):
         print(f"Error: Watch path is not a directory: {watch_path}")
         sys.exit(1)
     
-    print(f"👁️  Watching directory: {watch_path}")
-    print("⏳ Waiting for tasks.json files... (Press Ctrl+C to stop)\n")
+    include_paths = [(watch_path / include).resolve() for include in includes or ['.']]
+    for include in include_paths:
+        if not include.is_dir() or not include.is_relative_to(watch_path):
+            print(f"Error: Include path is not a directory inside {watch_path}: {include}")
+            sys.exit(1)
+    
+    event_handler = TaskFileHandler(
+        watch_path,
+        jobs=jobs,
+        fail_fast=fail_fast,
+        cache=cache,
+        debounce=debounce,
+        log_dir=log_dir
+    )
+    watcher = ScopedWatcher(
+        event_handler,
+        watch_path,
+        include_paths,
+        IgnoreRules.for_directory(watch_path, excludes),
+        poll_interval=poll_interval
+    )
+    watcher.start()
     
-    event_handler = TaskFileHandler(watch_path)
-    observer = Observer()
-    observer.schedule(event_handler, str(watch_path), recursive=True)
-    observer.start()
+    mode = f"polling every {watcher.poll_interval}s" if watcher.poll_interval else "native notifications"
+    print(f"👁️  Watching directory: {watch_path} ({watcher.watch_count} watches, {mode})")
+    if includes:
+        print(f"   Including: {', '.join(str(path.relative_to(watch_path)) for path in include_paths)}")
+    print("⏳ Waiting for tasks.json files... (Press Ctrl+C to stop)\n")
     
     try:
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
         print("\n\n🛑 Stopping watcher...")
-        observer.stop()
     
-    observer.join()
+    watcher.stop()
+    event_handler.close()
     print("Watcher stopped.")
 
 
+def show_report(log_dir: Path, limit: int = 10, window: int = 5) -> bool:
+    """
+    Print the slowest tasks in the run history.
+    
+    Tasks are identified by manifest and task id and ranked by mean wall
+    time over the runs that executed (cached and skipped runs are left
+    out). The trend compares the mean of the latest `window` runs with the
+    `window` runs before them.
+    
+    Returns:
+        False if there is no history to report on
+    """
+    history_path = Path(log_dir) / 'history.jsonl'
+    runs: Dict[Tuple[str, str], List[dict]] = {}
+    try:
+        with open(history_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by an interrupted write
+                if entry.get('wall_s') is not None:
+                    runs.setdefault((entry['manifest'], entry['task']), []).append(entry)
+    except FileNotFoundError:
+        pass
+    
+    if not runs:
+        print(f"No task history in {history_path}")
+        return False
+    
+    rows = []
+    for (manifest, task_id), entries in runs.items():
+        walls = [entry['wall_s'] for entry in entries]
+        recent, previous = walls[-window:], walls[-2 * window:-window]
+        trend = '-'
+        if previous and sum(previous) > 0:
+            change = (sum(recent) / len(recent)) / (sum(previous) / len(previous)) - 1
+            trend = f"{change:+.0%}"
+        last = entries[-1]
+        cpu = (last.get('cpu_user_s') or 0) + (last.get('cpu_system_s') or 0) if 'cpu_user_s' in last else None
+        try:
+            manifest = str(Path(manifest).relative_to(Path.cwd()))
+        except ValueError:
+            pass
+        rows.append((
+            sum(walls) / len(walls),
+            f"{task_id} ({manifest})",
+            len(walls),
+            walls[-1],
+            max(walls),
+            cpu,
+            last.get('max_rss_kb'),
+            sum(1 for entry in entries if entry['status'] == 'failed'),
+            trend,
+        ))
+    rows.sort(key=lambda row: row[0], reverse=True)
+    rows = rows[:limit]
+    
+    width = max(len('TASK'), *(len(row[1]) for row in rows))
+    print(f"📊 Slowest tasks ({history_path})\n")
+    print(f"{'TASK':<{width}}  {'RUNS':>5}  {'MEAN':>8}  {'LAST':>8}  {'MAX':>8}  {'CPU':>8}  {'PEAK RSS':>9}  {'FAILS':>5}  TREND")
+    for mean, label, count, last_wall, max_wall, cpu, rss, fails, trend in rows:
+        cpu_text = f"{cpu:.2f}s" if cpu is not None else '-'
+        rss_text = f"{rss / 1024:.1f}MB" if rss is not None else '-'
+        print(f"{label:<{width}}  {count:>5}  {mean:>7.2f}s  {last_wall:>7.2f}s  {max_wall:>7.2f}s  "
+              f"{cpu_text:>8}  {rss_text:>9}  {fails:>5}  {trend}")
+    return True
+
+
 def main():
     """Main entry point."""
-    if len(sys.argv) < 2:
-        print("Usage:")
+    parser = argparse.ArgumentParser(description="Local DevOps pipeline runner for Questerix")
+    parser.add_argument('manifest', nargs='?', help='Manifest to execute (e.g. tasks.json)')
+    parser.add_argument('--watch', nargs='?', const='.', metavar='DIR',
+                        help='Watch DIR (default: .) for tasks.json files')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Run up to N independent tasks at once')
+    parser.add_argument('--fail-fast', action='store_true', help='Stop all tasks at the first failure')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help='Cache of task results for tasks that declare inputs')
+    parser.add_argument('--no-cache', action='store_true', help='Always run every task')
+    parser.add_argument('--log-dir', default=str(DEFAULT_LOG_DIR), help='Task logs and run history')
+    parser.add_argument('--no-log', action='store_true', help='Do not write task logs or history')
+    parser.add_argument('--report', nargs='?', type=int, const=10, metavar='N',
+                        help='Show the N slowest tasks (default: 10) from the run history and exit')
+    parser.add_argument('--debounce', type=float, default=0.5, metavar='SECONDS',
+                        help='Watch mode: quiet period before a changed tasks.json runs')
+    parser.add_argument('--include', action='append', metavar='PATH',
+                        help='Watch mode: only watch PATH under the watch directory (repeatable)')
+    parser.add_argument('--exclude', action='append', metavar='PATTERN',
+                        help='Watch mode: gitignore-style pattern to ignore (repeatable)')
+    parser.add_argument('--poll', nargs='?', type=float, const=DEFAULT_POLL_INTERVAL, metavar='SECONDS',
+                        help='Watch mode: poll for changes instead of using OS notifications')
+    args = parser.parse_args()
+    
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.debounce < 0:
+        parser.error("--debounce must not be negative")
+    if args.poll is not None and args.poll <= 0:
+        parser.error("--poll interval must be positive")
+    
+    if args.report is not None:
+        sys.exit(0 if show_report(Path(args.log_dir), limit=max(args.report, 1)) else 1)
+    
+    cache = None if args.no_cache else TaskCache(Path(args.cache_dir))
+    log_dir = None if args.no_log else Path(args.log_dir)
+    
+    if args.watch is not None:
+        watch_mode(
+            args.watch,
+            jobs=args.jobs,
+            fail_fast=args.fail_fast,
+            cache=cache,
+            debounce=args.debounce,
+            includes=args.include,
+            excludes=args.exclude,
+            poll_interval=args.poll,
+            log_dir=log_dir
+        )
+    elif args.manifest:
+        success = execute_manifest(
+            args.manifest,
+            jobs=args.jobs,
+            fail_fast=args.fail_fast,
+            cache=cache,
+            log_dir=log_dir
+        )
+        sys.exit(0 if success else 1)
+    else:
+        parser.print_usage()
         print("  python ops_runner.py <tasks.json>     # Execute a specific manifest")
         print("  python ops_runner.py --watch [dir]    # Watch directory for tasks.json files")
         sys.exit(1)
-    
-    if sys.argv[1] == '--watch':
-        watch_dir = sys.argv[2] if len(sys.argv) > 2 else '.'
-        watch_mode(watch_dir)
-    else:
-        manifest_path = sys.argv[1]
-        success = execute_manifest(manifest_path)
-        sys.exit(0 if success else 1)
 
 
 if __name__ == '__main__':
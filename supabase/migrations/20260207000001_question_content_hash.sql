@@ -0,0 +1,29 @@
+-- ══════════════════════════════════════════════════════════════════════════════
+-- CONTENT ENGINE: IDEMPOTENT QUESTION PUBLISHING
+-- Migration: 20260207000001_question_content_hash.sql
+-- Priority: MEDIUM
+-- Purpose: Give every question a stable content hash so the content engine's
+--          publish stage can bulk-upsert generated questions without creating
+--          duplicates when a pipeline is re-run
+-- ══════════════════════════════════════════════════════════════════════════════
+
+-- ┌─────────────────────────────────────────────────────────────────────────────┐
+-- │ RATIONALE                                                                    │
+-- └─────────────────────────────────────────────────────────────────────────────┘
+-- The content engine computes content_hash as SHA-256 over the skill, question
+-- type, content, options and solution (see content-engine/src/publish.py).
+-- A unique index on it lets bulk loads use INSERT ... ON CONFLICT (content_hash),
+-- so publishing the same output twice updates rows in place instead of
+-- inserting copies.
+--
+-- Rows created by hand (admin panel, seed data) keep content_hash NULL; NULLs
+-- never conflict, so existing data is unaffected.
+
+ALTER TABLE public.questions
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_content_hash
+  ON public.questions(content_hash);
+
+COMMENT ON COLUMN public.questions.content_hash IS
+  'SHA-256 of skill/type/content/options/solution, set by the content engine publish stage';
@@ -0,0 +1,333 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import ops_runner
+from ops_runner import (
+    IgnoreRules,
+    ManifestRunner,
+    RunLog,
+    ScopedWatcher,
+    Task,
+    TaskCache,
+    TaskFileHandler,
+    load_manifest,
+    show_report,
+)
+
+try:
+    from watchdog import events as watchdog_events
+except ImportError:
+    watchdog_events = None
+
+requires_watchdog = pytest.mark.skipif(ops_runner.Observer is None, reason="watchdog not installed")
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def task(task_id, command, depends_on=(), position=1, **fields):
+    return Task(id=task_id, description=task_id, command=command, cwd=fields.pop("cwd", None),
+                depends_on=list(depends_on), position=position, **fields)
+
+
+def write_manifest(path, entries):
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
+
+
+def test_load_manifest_normalizes_tasks(tmp_path):
+    manifest = write_manifest(tmp_path / "tasks.json", [
+        {"id": "build", "command": "echo hi", "inputs": "src/*.py"},
+        {"command": ["echo", "done"], "depends_on": "build", "description": "Finish"},
+    ])
+
+    tasks = load_manifest(str(manifest))
+
+    assert [(t.id, t.depends_on, t.position) for t in tasks] == [("build", [], 1), ("task-2", ["build"], 2)]
+    assert tasks[0].inputs == ["src/*.py"] and tasks[1].description == "Finish"
+
+
+@pytest.mark.parametrize("entries, error", [
+    ([{"id": "a", "command": "x", "depends_on": ["b"]},
+      {"id": "b", "command": "x", "depends_on": ["a"]}], "Dependency cycle"),
+    ([{"id": "a", "command": "x", "depends_on": ["missing"]}], "unknown task(s): missing"),
+    ([{"id": "a", "command": "x"}, {"id": "a", "command": "y"}], "Duplicate task ids: a"),
+])
+def test_load_manifest_rejects_invalid_graphs(tmp_path, capsys, entries, error):
+    assert load_manifest(str(write_manifest(tmp_path / "tasks.json", entries))) is None
+    assert error in capsys.readouterr().out
+
+
+def test_failed_task_skips_its_dependents_only(tmp_path):
+    runner = ManifestRunner([
+        task("bad", python("raise SystemExit(3)"), position=1),
+        task("after-bad", python("pass"), ["bad"], position=2),
+        task("after-that", python("pass"), ["after-bad"], position=3),
+        task("independent", python("print('ok')"), position=4),
+    ], jobs=2)
+
+    assert runner.run() is False
+    assert runner.results == {"bad": "failed", "after-bad": "skipped", "after-that": "skipped", "independent": "ok"}
+
+
+def test_fail_fast_stops_running_tasks(tmp_path):
+    runner = ManifestRunner([
+        task("slow", python("import time; time.sleep(30)"), position=1),
+        task("bad", python("import time; time.sleep(0.2); raise SystemExit(1)"), position=2),
+        task("later", python("pass"), ["bad"], position=3),
+    ], jobs=2, fail_fast=True)
+
+    start = time.monotonic()
+    assert runner.run() is False
+    assert time.monotonic() - start < 10
+    assert runner.stop_reason == "fail-fast"
+    assert runner.results == {"slow": "failed", "bad": "failed", "later": "skipped"}
+
+
+def test_task_cache_restores_outputs_and_misses_on_changed_inputs(tmp_path):
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "a.txt").write_text("one")
+    build = task(
+        "build",
+        python("import pathlib; pathlib.Path('dist').mkdir(exist_ok=True);"
+               "pathlib.Path('dist/out.txt').write_text(pathlib.Path('src/a.txt').read_text().upper());"
+               "open('runs.log', 'a').write('x')"),
+        cwd=str(project), inputs=["src/**/*.txt"], outputs=["dist/*"],
+    )
+    cache = TaskCache(tmp_path / "cache")
+
+    def run():
+        assert ManifestRunner([build], cache=cache).run()
+        return (project / "runs.log").read_text().count("x")
+
+    assert run() == 1
+    assert run() == 1  # Hit: the command did not run
+
+    (project / "dist" / "out.txt").unlink()
+    assert run() == 1
+    assert (project / "dist" / "out.txt").read_text() == "ONE"  # Restored from the cache
+
+    (project / "src" / "a.txt").write_text("two")
+    assert run() == 2
+    assert (project / "dist" / "out.txt").read_text() == "TWO"
+
+    # Digests survive a restart of the runner
+    assert run() == 2 and TaskCache(tmp_path / "cache")._digests
+
+
+def test_task_cache_ignores_tasks_without_inputs(tmp_path):
+    assert TaskCache(tmp_path).fingerprint(task("plain", "echo hi")) is None
+
+
+def test_watch_handler_coalesces_bursts(tmp_path):
+    runs = tmp_path / "runs.log"
+    manifest = write_manifest(tmp_path / "tasks.json", [
+        {"command": python(f"open({str(runs)!r}, 'a').write('x')")},
+    ])
+    handler = TaskFileHandler(tmp_path, debounce=0.1)
+    try:
+        for _ in range(5):
+            handler.schedule(manifest)
+            time.sleep(0.01)
+        handler.schedule(tmp_path / "other.json")  # Not a manifest
+        time.sleep(0.5)
+
+        # Same content again: already run
+        write_manifest(manifest, json.loads(manifest.read_text()))
+        handler.schedule(manifest)
+        time.sleep(0.5)
+    finally:
+        handler.close()
+
+    assert runs.read_text() == "x"
+
+
+def test_watch_handler_skips_reverted_content(tmp_path):
+    runs = tmp_path / "runs.log"
+    versions = [
+        [{"command": python(f"open({str(runs)!r}, 'a').write({name!r})")}]
+        for name in ("a", "b")
+    ]
+    manifest = tmp_path / "tasks.json"
+    handler = TaskFileHandler(tmp_path, debounce=0.05)
+    try:
+        # A -> B -> A: the revert matches content that already ran
+        for version in (0, 1, 0):
+            write_manifest(manifest, versions[version])
+            handler.schedule(manifest)
+            time.sleep(0.5)
+    finally:
+        handler.close()
+
+    assert runs.read_text() == "ab"
+
+
+
+def test_watch_handler_reruns_content_interrupted_by_reverted_edit(tmp_path):
+    runs = tmp_path / "runs.log"
+    slow = [{"command": python(f"import time; time.sleep(0.6); open({str(runs)!r}, 'a').write('a')")}]
+    edit = [{"command": python(f"open({str(runs)!r}, 'a').write('b')")}]
+    manifest = tmp_path / "tasks.json"
+    handler = TaskFileHandler(tmp_path, debounce=0.05)
+    try:
+        # A starts, B stops it mid-run, then the edit is reverted to A
+        for version, wait in ((slow, 0.3), (edit, 0.3), (slow, 1.5)):
+            write_manifest(manifest, version)
+            handler.schedule(manifest)
+            time.sleep(wait)
+    finally:
+        handler.close()
+
+    assert runs.read_text() == "ba"
+
+
+def test_run_log_history_and_report(tmp_path, capsys):
+    manifest = tmp_path / "tasks.json"
+    for _ in range(2):
+        runner = ManifestRunner([
+            task("slow", python("import time; time.sleep(0.2); print('hello')"), position=1),
+            task("bad", python("raise SystemExit(2)"), position=2),
+            task("after", python("pass"), ["bad"], position=3),
+        ], log=RunLog(tmp_path / "logs", str(manifest)))
+        runner.run()
+
+    history = [json.loads(line) for line in (tmp_path / "logs" / "history.jsonl").read_text().splitlines()]
+    assert [(entry["task"], entry["status"]) for entry in history[:3]] == [
+        ("slow", "ok"), ("bad", "failed"), ("after", "skipped"),
+    ]
+    slow = history[0]
+    assert slow["exit_code"] == 0 and slow["wall_s"] >= 0.2
+    assert "hello" in Path(slow["log"]).read_text()
+    if hasattr(ops_runner.os, "wait4"):
+        assert slow["max_rss_kb"] > 0 and slow["cpu_user_s"] >= 0
+    assert history[1]["exit_code"] == 2
+
+    capsys.readouterr()
+    assert show_report(tmp_path / "logs", limit=5)
+    lines = capsys.readouterr().out.splitlines()
+    rows = [line for line in lines if "(" in line and "Slowest" not in line]
+    assert rows[0].startswith("slow ") and rows[0].split()[2] == "2"  # Two timed runs
+    assert not any(line.startswith("after ") for line in rows)  # Skipped runs are not timed
+
+
+def test_report_without_history(tmp_path, capsys):
+    assert show_report(tmp_path) is False
+    assert "No task history" in capsys.readouterr().out
+
+
+class FakeObserver:
+    """Records scheduled watches instead of talking to the OS."""
+
+    def __init__(self):
+        self.watches = set()
+
+    def schedule(self, handler, path, recursive=False):
+        watch = (Path(path), recursive)
+        self.watches.add(watch)
+        return watch
+
+    def unschedule(self, watch):
+        self.watches.remove(watch)
+
+    def start(self):
+        pass
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def dispatch(self, event):
+        self.events.append(event)
+
+
+def make_watcher(root, patterns=()):
+    watcher = ScopedWatcher(Recorder(), root, [root], IgnoreRules.for_directory(root, list(patterns)))
+    watcher._start(FakeObserver())
+    return watcher
+
+
+def test_ignore_rules_follow_gitignore_syntax():
+    rules = IgnoreRules(["node_modules/", "*.log", "!keep.log", "/top/", "docs/**/tmp", "[!a]x"])
+
+    assert rules.matches("node_modules", True)
+    assert not rules.matches("node_modules", False)  # Directory-only pattern
+    assert rules.matches("app/node_modules/pkg/tasks.json", False)  # Below an ignored directory
+    assert rules.matches("deep/debug.log", False)
+    assert not rules.matches("keep.log", False)
+    assert rules.matches("top", True)
+    assert not rules.matches("app/top", True)  # Anchored to the root
+    assert rules.matches("docs/a/b/tmp", True) and rules.matches("docs/tmp", True)
+    assert rules.matches("bx", False) and not rules.matches("ax", False)
+    assert not rules.matches("app/src/tasks.json", False)
+
+
+def test_ignore_rules_read_opsignore(tmp_path):
+    (tmp_path / ops_runner.IGNORE_FILE).write_text("# generated\ngenerated/\n")
+    rules = IgnoreRules.for_directory(tmp_path, ["*.tmp"])
+
+    assert rules.matches("generated", True)
+    assert rules.matches(".git", True)  # Built-in default
+    assert rules.matches("a.tmp", False)
+    assert not rules.matches("src", True)
+
+
+@requires_watchdog
+def test_plan_never_covers_ignored_directories(tmp_path):
+    for directory in ["app/src", "app/node_modules/pkg", "lib/a", "ops"]:
+        (tmp_path / directory).mkdir(parents=True)
+    watcher = make_watcher(tmp_path)
+
+    assert watcher.observer.watches == {
+        (tmp_path, False),
+        (tmp_path / "app", False),
+        (tmp_path / "app" / "src", True),
+        (tmp_path / "lib", True),
+        (tmp_path / "ops", True),
+    }
+
+
+@requires_watchdog
+def test_ignored_directory_created_later_splits_recursive_watch(tmp_path):
+    (tmp_path / "lib" / "a").mkdir(parents=True)
+    watcher = make_watcher(tmp_path)
+    assert watcher.observer.watches == {(tmp_path, True)}
+
+    (tmp_path / "lib" / "a" / "build").mkdir()
+    watcher.dispatch(watchdog_events.DirCreatedEvent(str(tmp_path / "lib" / "a" / "build")))
+
+    assert watcher.observer.watches == {
+        (tmp_path, False),
+        (tmp_path / "lib", False),
+        (tmp_path / "lib" / "a", False),
+    }
+    assert watcher.handler.events == []  # Dropped before dispatch
+
+    # Ordinary directories under a recursive watch need no new watch
+    (tmp_path / "src").mkdir()
+    watcher.dispatch(watchdog_events.DirCreatedEvent(str(tmp_path / "src")))
+    assert (tmp_path / "src", True) in watcher.observer.watches
+    (tmp_path / "src" / "pkg").mkdir()
+    watcher.dispatch(watchdog_events.DirCreatedEvent(str(tmp_path / "src" / "pkg")))
+    assert (tmp_path / "src" / "pkg", True) not in watcher.observer.watches
+
+    # Removing a directory drops the watches under it
+    watcher.dispatch(watchdog_events.DirDeletedEvent(str(tmp_path / "lib")))
+    assert watcher.observer.watches == {(tmp_path, False), (tmp_path / "src", True)}
+
+
+@requires_watchdog
+def test_events_for_ignored_paths_are_dropped(tmp_path):
+    (tmp_path / "node_modules").mkdir()
+    watcher = make_watcher(tmp_path)
+
+    watcher.dispatch(watchdog_events.FileModifiedEvent(str(tmp_path / "node_modules" / "tasks.json")))
+    watcher.dispatch(watchdog_events.FileModifiedEvent(str(tmp_path / "tasks.json")))
+
+    assert [event.src_path for event in watcher.handler.events] == [str(tmp_path / "tasks.json")]